@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+from app.core.dhan_client import get_dhan_client
+from app.core.metrics import timed
+
+ORDER_METHODS = {"place_order", "modify_order", "cancel_order", "place_slice_order"}
+REJECTED_STATUSES = {"REJECTED", "CANCELLED"}
+
+
+class BrokerTimeout(Exception):
+    """Raised when a broker call does not complete within its timeout."""
+
+
+class AsyncTokenBucket:
+    """Token bucket limiter: ``rate`` calls per second with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BrokerGateway:
+    """
+    Async access to the synchronous dhanhq client.
+
+    Calls run on a bounded thread pool so they never block the event loop,
+    are rate limited with separate token buckets for order and other
+    endpoints, and fail with BrokerTimeout after ``timeout`` seconds.
+    Read-only calls that fail are retried up to ``retries`` times with
+    exponential backoff.
+
+    Order calls are never retried nor abandoned by the timeout, as the
+    broker may still act on them; the client's own HTTP timeout bounds them
+    instead, and a failed placement is reconciled by its tag.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        max_workers: int,
+        timeout: float,
+        order_rate: float,
+        api_rate: float,
+        retries: int = 0,
+        retry_backoff: float = 0.5,
+    ):
+        self._client_factory = client_factory
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="broker")
+        self._order_limiter = AsyncTokenBucket(order_rate)
+        self._api_limiter = AsyncTokenBucket(api_rate)
+
+    @property
+    def client(self):
+        return self._client_factory()
+
+    async def _call_once(self, method: str, *args, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        limiter = self._order_limiter if method in ORDER_METHODS else self._api_limiter
+        await limiter.acquire()
+
+        loop = asyncio.get_running_loop()
+        func = timed("dhanhq", method)(partial(getattr(self.client, method), *args, **kwargs))
+        future = loop.run_in_executor(self._executor, func)
+        if method in ORDER_METHODS:
+            return await future
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        except asyncio.TimeoutError:
+            raise BrokerTimeout(f"Broker call {method} timed out after {timeout or self.timeout} seconds")
+
+    async def call(self, method: str, *args, timeout: Optional[float] = None, **kwargs) -> Dict[str, Any]:
+        """Call a dhanhq client method off the event loop, rate limited and with a timeout."""
+        retries = 0 if method in ORDER_METHODS else self.retries
+        for attempt in range(retries + 1):
+            try:
+                response = await self._call_once(method, *args, timeout=timeout, **kwargs)
+            except Exception as e:
+                if attempt == retries:
+                    raise
+                logging.warning(f"Broker call {method} failed, retrying: {e}")
+            else:
+                # dhanhq reports transport errors as failure responses
+                if attempt == retries or not isinstance(response, dict) or response.get("status") != "failure":
+                    return response
+                logging.warning(f"Broker call {method} failed, retrying: {response.get('remarks')}")
+            await asyncio.sleep(self.retry_backoff * 2**attempt)
+
+    async def find_order_by_tag(self, tag: str) -> Optional[Dict[str, Any]]:
+        """Return the order placed with the given tag (correlation id), or None."""
+        response = await self.call("get_order_by_correlationID", tag)
+        data = response.get("data") if isinstance(response, dict) and response.get("status") == "success" else None
+        if isinstance(data, list):
+            data = data[0] if data else None
+        return data if isinstance(data, dict) and data.get("orderId") else None
+
+    async def get_fund_limits(self) -> Dict[str, Any]:
+        return await self.call("get_fund_limits")
+
+    async def get_positions(self) -> Dict[str, Any]:
+        return await self.call("get_positions")
+
+    async def get_holdings(self) -> Dict[str, Any]:
+        return await self.call("get_holdings")
+
+    async def place_order(self, **order) -> Dict[str, Any]:
+        """
+        Place an order. When the placement fails, e.g. because the HTTP
+        request timed out after the broker accepted it, the order is looked
+        up by its tag before the failure is reported.
+        """
+        response = await self.call("place_order", **order)
+        if response.get("status") == "success" or not order.get("tag"):
+            return response
+        try:
+            placed = await self.find_order_by_tag(order["tag"])
+        except Exception as e:
+            logging.error(f"Failed to reconcile order {order['tag']}: {e}")
+            return response
+        if placed is None or placed.get("orderStatus") in REJECTED_STATUSES:
+            return response
+        logging.warning(f"Order {order['tag']} reported {response.get('remarks')} but was placed as {placed['orderId']}")
+        return {"status": "success", "remarks": "reconciled by tag", "data": placed}
+
+    async def get_order_by_id(self, order_id) -> Dict[str, Any]:
+        return await self.call("get_order_by_id", order_id)
+
+    async def get_trade_book(self, order_id=None) -> Dict[str, Any]:
+        return await self.call("get_trade_book", order_id)
+
+    async def get_trade_history(self, from_date: str, to_date: str, page_number: int = 0) -> Dict[str, Any]:
+        return await self.call("get_trade_history", from_date, to_date, page_number)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+broker_gateway = BrokerGateway(
+    client_factory=get_dhan_client,
+    max_workers=settings.BROKER_MAX_WORKERS,
+    timeout=settings.BROKER_TIMEOUT_SECONDS,
+    order_rate=settings.BROKER_ORDER_RATE_PER_SEC,
+    api_rate=settings.BROKER_API_RATE_PER_SEC,
+    retries=settings.BROKER_RETRIES,
+    retry_backoff=settings.BROKER_RETRY_BACKOFF_SECONDS,
+)
@@ -0,0 +1,168 @@
+import logging
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from app.core.config import settings
+
+
+class BrowserPoolExhausted(Exception):
+    """Raised when no browser can be handed out within the wait limits."""
+
+
+class _PooledDriver:
+    __slots__ = ("driver", "pages")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class BrowserPool:
+    """
+    Pool of warm headless Chrome instances shared by every scrape.
+
+    Drivers are health-checked when handed out and recycled after
+    ``max_pages`` page loads or as soon as WebDriver reports an error.
+    Callers that cannot get a browser wait in a bounded queue.
+    """
+
+    def __init__(self, size: int, max_pages: int, acquire_timeout: float, max_waiters: int):
+        self.size = size
+        self.max_pages = max_pages
+        self.acquire_timeout = acquire_timeout
+        self.max_waiters = max_waiters
+        self._idle: "queue.LifoQueue[_PooledDriver]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._waiters = 0
+        self._lock = threading.Lock()
+        self._driver_path: Optional[str] = None
+        self._closed = False
+
+    def resolve_driver_path(self) -> str:
+        """Resolve the chromedriver binary once and reuse it for every launch."""
+        with self._lock:
+            if self._driver_path is None:
+                self._driver_path = settings.CHROMEDRIVER_PATH or ChromeDriverManager().install()
+                logging.info(f"Using chromedriver at {self._driver_path}")
+            return self._driver_path
+
+    def _launch(self) -> _PooledDriver:
+        chrome_options = Options()
+        chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--disable-gpu")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        if settings.CHROME_BINARY_PATH:
+            chrome_options.binary_location = settings.CHROME_BINARY_PATH
+
+        service = Service(self.resolve_driver_path())
+        return _PooledDriver(webdriver.Chrome(service=service, options=chrome_options))
+
+    @staticmethod
+    def _is_healthy(pooled: _PooledDriver) -> bool:
+        try:
+            pooled.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit(pooled: _PooledDriver) -> None:
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            logging.warning(f"Error closing browser: {e}")
+
+    def start(self) -> None:
+        """Resolve the driver binary and warm up the pool."""
+        self._closed = False
+        try:
+            self.resolve_driver_path()
+            for _ in range(self.size - self._idle.qsize()):
+                self._idle.put(self._launch())
+        except Exception as e:
+            logging.error(f"Failed to warm up browser pool: {e}")
+        logging.info(f"Browser pool started with {self._idle.qsize()} warm browser(s)")
+
+    def shutdown(self) -> None:
+        """Close every idle browser. Browsers in use are closed on release."""
+        self._closed = True
+        while True:
+            try:
+                self._quit(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def _acquire(self) -> _PooledDriver:
+        with self._lock:
+            if self._waiters >= self.max_waiters:
+                raise BrowserPoolExhausted("Too many scrapes waiting for a browser.")
+            self._waiters += 1
+        try:
+            if not self._slots.acquire(timeout=self.acquire_timeout):
+                raise BrowserPoolExhausted(
+                    f"No browser became available within {self.acquire_timeout} seconds."
+                )
+        finally:
+            with self._lock:
+                self._waiters -= 1
+
+        try:
+            while True:
+                try:
+                    pooled = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._launch()
+                if self._is_healthy(pooled):
+                    return pooled
+                logging.warning("Discarding unhealthy browser from pool.")
+                self._quit(pooled)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, pooled: _PooledDriver, failed: bool) -> None:
+        try:
+            pooled.pages += 1
+            if self._closed or failed or pooled.pages >= self.max_pages:
+                self._quit(pooled)
+                return
+            try:
+                # Drop the previous page so an idle browser does not hold its DOM
+                pooled.driver.get("about:blank")
+            except Exception:
+                self._quit(pooled)
+                return
+            self._idle.put(pooled)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self):
+        """Borrow a browser for the duration of the ``with`` block."""
+        pooled = self._acquire()
+        failed = False
+        try:
+            yield pooled.driver
+        except WebDriverException:
+            # The browser crashed or lost its session, so it is not reused
+            failed = True
+            raise
+        finally:
+            self._release(pooled, failed)
+
+
+browser_pool = BrowserPool(
+    size=settings.BROWSER_POOL_SIZE,
+    max_pages=settings.BROWSER_MAX_PAGES,
+    acquire_timeout=settings.BROWSER_ACQUIRE_TIMEOUT,
+    max_waiters=settings.BROWSER_MAX_WAITERS,
+)
@@ -11,7 +11,74 @@ class Settings:
     DOCS_URL: str = os.getenv("DOCS_URL")
     DHAN_CLIENT_ID: str = os.getenv("DHAN_CLIENT_ID")
     DHAN_ACCESS_TOKEN: str = os.getenv("DHAN_ACCESS_TOKEN")
+    DHAN_BASE_URL: str = os.getenv("DHAN_BASE_URL")
+    BROKER_MAX_WORKERS: int = int(os.getenv("BROKER_MAX_WORKERS", 4))
+    BROKER_TIMEOUT_SECONDS: float = float(os.getenv("BROKER_TIMEOUT_SECONDS", 10))
+    BROKER_ORDER_RATE_PER_SEC: float = float(os.getenv("BROKER_ORDER_RATE_PER_SEC", 25))
+    BROKER_API_RATE_PER_SEC: float = float(os.getenv("BROKER_API_RATE_PER_SEC", 20))
+    BROKER_RETRIES: int = int(os.getenv("BROKER_RETRIES", 2))
+    BROKER_RETRY_BACKOFF_SECONDS: float = float(os.getenv("BROKER_RETRY_BACKOFF_SECONDS", 0.5))
+    MARKET_FEED_URL: str = os.getenv("MARKET_FEED_URL", "wss://api-feed.dhan.co")
+    MARKET_FEED_MAX_TICK_AGE: float = float(os.getenv("MARKET_FEED_MAX_TICK_AGE", 60))
+    MARKET_FEED_BACKOFF_INITIAL: float = float(os.getenv("MARKET_FEED_BACKOFF_INITIAL", 1))
+    MARKET_FEED_BACKOFF_MAX: float = float(os.getenv("MARKET_FEED_BACKOFF_MAX", 30))
     MONGODB_URL: str = os.getenv("MONGODB_URL")
+    TRADE_SYNC_WINDOW_DAYS: int = int(os.getenv("TRADE_SYNC_WINDOW_DAYS", 30))
+    TRADE_SYNC_LOOKBACK_DAYS: int = int(os.getenv("TRADE_SYNC_LOOKBACK_DAYS", 365))
+    TRADE_SYNC_INTERVAL_MINUTES: int = int(os.getenv("TRADE_SYNC_INTERVAL_MINUTES", 15))
+    BASKET_SIZE: int = int(os.getenv("BASKET_SIZE", 1))
+    SCAN_RANK_BY: list = [column.strip() for column in os.getenv("SCAN_RANK_BY", "change,volume").split(",")]
+    SCAN_MIN_CHANGE: float = float(os.getenv("SCAN_MIN_CHANGE")) if os.getenv("SCAN_MIN_CHANGE") else None
+    SCAN_MIN_PRICE: float = float(os.getenv("SCAN_MIN_PRICE")) if os.getenv("SCAN_MIN_PRICE") else None
+    SCAN_MAX_PRICE: float = float(os.getenv("SCAN_MAX_PRICE")) if os.getenv("SCAN_MAX_PRICE") else None
+    SCAN_MIN_VOLUME: float = float(os.getenv("SCAN_MIN_VOLUME")) if os.getenv("SCAN_MIN_VOLUME") else None
+    SCANNERS_FILE: str = os.getenv("SCANNERS_FILE")
+    SCANNER_MAX_WORKERS: int = int(os.getenv("SCANNER_MAX_WORKERS", 4))
+    SCANNER_TIMEOUT_SECONDS: float = float(os.getenv("SCANNER_TIMEOUT_SECONDS", 120))
+    # Latest time of day (Asia/Kolkata) the scan-to-order pipeline may start placing orders
+    PIPELINE_ORDER_DEADLINE: str = os.getenv("PIPELINE_ORDER_DEADLINE", "15:20:00")
+    PIPELINE_MISFIRE_GRACE_SECONDS: int = int(os.getenv("PIPELINE_MISFIRE_GRACE_SECONDS", 60))
+    PIPELINE_LATENESS_WARNING_SECONDS: float = float(os.getenv("PIPELINE_LATENESS_WARNING_SECONDS", 5))
+    PIPELINE_HISTORY: int = int(os.getenv("PIPELINE_HISTORY", 50))
+    BASKET_MAX_PARALLEL_ORDERS: int = int(os.getenv("BASKET_MAX_PARALLEL_ORDERS", 5))
+    # How long a basket waits for each order to fill; unsettled orders are stored as pending
+    ORDER_CONFIRM_TIMEOUT_SECONDS: float = float(os.getenv("ORDER_CONFIRM_TIMEOUT_SECONDS", 30))
+    ORDER_CONFIRM_POLL_SECONDS: float = float(os.getenv("ORDER_CONFIRM_POLL_SECONDS", 0.5))
+    PORTFOLIO_TTL_SECONDS: float = float(os.getenv("PORTFOLIO_TTL_SECONDS", 5))
+    PORTFOLIO_MAX_STALE_SECONDS: float = float(os.getenv("PORTFOLIO_MAX_STALE_SECONDS", 60))
+    QUOTE_TTL_SECONDS: float = float(os.getenv("QUOTE_TTL_SECONDS", 15))
+    DAILY_BAR_TTL_SECONDS: float = float(os.getenv("DAILY_BAR_TTL_SECONDS", 300))
+    FUNDAMENTALS_TTL_SECONDS: float = float(os.getenv("FUNDAMENTALS_TTL_SECONDS", 3600))
+    QUOTE_CACHE_MAX_ENTRIES: int = int(os.getenv("QUOTE_CACHE_MAX_ENTRIES", 1024))
+    BAR_STORE_DIR: str = os.getenv("BAR_STORE_DIR", "bar_store")
+    BAR_STORE_MAX_SEGMENTS: int = int(os.getenv("BAR_STORE_MAX_SEGMENTS", 64))
+    LOG_FILE: str = os.getenv("LOG_FILE", "app_logs.jsonl")
+    LOG_MAX_BYTES: int = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+    LOG_BACKUP_COUNT: int = int(os.getenv("LOG_BACKUP_COUNT", 10))
+    LOG_ROTATE_WHEN: str = os.getenv("LOG_ROTATE_WHEN")
+    PROFILE_ENABLED: bool = os.getenv("PROFILE_ENABLED", "false").lower() in ("1", "true", "yes")
+    # Profile 1 in N requests; 0 profiles only requests sending the X-Profile header
+    PROFILE_SAMPLE_RATE: int = int(os.getenv("PROFILE_SAMPLE_RATE", 0))
+    # When set, the X-Profile header must carry this token; /admin/profiles always requires it as X-Profile-Token
+    PROFILE_TOKEN: str = os.getenv("PROFILE_TOKEN")
+    # Scheduled task functions to profile on every run, e.g. run_test_trade_pipeline,execute_trade
+    PROFILE_JOBS: list = [name.strip() for name in os.getenv("PROFILE_JOBS", "").split(",") if name.strip()]
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_MAX_REPORTS: int = int(os.getenv("PROFILE_MAX_REPORTS", 200))
+    MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", 50))
+    MONGO_MIN_POOL_SIZE: int = int(os.getenv("MONGO_MIN_POOL_SIZE", 2))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000))
+    MONGO_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5000))
+    MONGO_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 10000))
+    CHROMEDRIVER_PATH: str = os.getenv("CHROMEDRIVER_PATH")
+    CHROME_BINARY_PATH: str = os.getenv("CHROME_BINARY_PATH")
+    BROWSER_POOL_SIZE: int = int(os.getenv("BROWSER_POOL_SIZE", 2))
+    BROWSER_MAX_PAGES: int = int(os.getenv("BROWSER_MAX_PAGES", 50))
+    BROWSER_ACQUIRE_TIMEOUT: float = float(os.getenv("BROWSER_ACQUIRE_TIMEOUT", 60))
+    BROWSER_MAX_WAITERS: int = int(os.getenv("BROWSER_MAX_WAITERS", 8))
+    SCRAPE_BACKEND: str = os.getenv("SCRAPE_BACKEND", "http")
+    SCRAPE_HTTP_TIMEOUT: float = float(os.getenv("SCRAPE_HTTP_TIMEOUT", 10))
 
 
 settings = Settings()
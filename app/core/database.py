@@ -1,9 +1,22 @@
 from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
+from app.core.metrics import MongoCommandMetrics
 
-# Initialize MongoDB client
-client = AsyncIOMotorClient(settings.MONGODB_URL)
-db = client["portfolio"]
+PORTFOLIO_DB_NAME = "portfolio"
+STOCK_DB_NAME = "stock_database"
+
+# Initialize the single MongoDB client shared by every service and route
+client = AsyncIOMotorClient(
+    settings.MONGODB_URL,
+    maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+    minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+    serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+    socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+    event_listeners=[MongoCommandMetrics()],
+)
+db = client[PORTFOLIO_DB_NAME]
+stock_db = client[STOCK_DB_NAME]
 
 
 async def connect_to_db():
@@ -15,3 +28,8 @@ async def connect_to_db():
     except Exception as e:
         print(f"Failed to connect to MongoDB: {e}")
         return str(e)
+
+
+def close_db():
+    """Close the shared client and its connection pool."""
+    client.close()
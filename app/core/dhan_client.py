@@ -1,7 +1,20 @@
+from functools import lru_cache
+
 from dhanhq import dhanhq
 
 from app.core.config import settings
 
 
+@lru_cache(maxsize=None)
 def get_dhan_client():
-    return dhanhq(settings.DHAN_CLIENT_ID, settings.DHAN_ACCESS_TOKEN)
+    """Return the process-wide dhanhq client, whose HTTP session keeps its connections alive."""
+    client = dhanhq(
+        settings.DHAN_CLIENT_ID,
+        settings.DHAN_ACCESS_TOKEN,
+        pool={"pool_connections": settings.BROKER_MAX_WORKERS, "pool_maxsize": settings.BROKER_MAX_WORKERS},
+    )
+    client.timeout = settings.BROKER_TIMEOUT_SECONDS
+    if settings.DHAN_BASE_URL:
+        # e.g. a local fake broker
+        client.base_url = settings.DHAN_BASE_URL
+    return client
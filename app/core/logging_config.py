@@ -0,0 +1,121 @@
+import atexit
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+from typing import Optional
+
+from app.core.config import settings
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format records as single-line JSON objects with a fixed schema.
+
+    "timestamp" (UTC) is always the first key, so readers can pick it out
+    of a line without parsing the JSON.
+    """
+
+    converter = time.gmtime
+
+    def format(self, record: logging.LogRecord) -> str:
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        timestamp = f"{self.formatTime(record, '%Y-%m-%d %H:%M:%S')},{int(record.msecs):03d}"
+        return json.dumps(
+            {
+                "timestamp": timestamp,
+                "level": record.levelname,
+                "filename": record.filename,
+                "function": record.funcName,
+                "line": record.lineno,
+                "logger": record.name,
+                "message": record.getMessage(),
+                "exc_info": record.exc_text or None,
+            },
+            ensure_ascii=False,
+            default=str,
+        )
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that keeps the exception text separate from the message,
+    so the JSON formatter on the listener thread can store it in its own field.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now, since they may change before the listener runs
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _gzip_namer(name: str) -> str:
+    return name + ".gz"
+
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as source_file, gzip.open(dest, "wb") as dest_file:
+        shutil.copyfileobj(source_file, dest_file)
+    os.remove(source)
+
+
+def _build_file_handler() -> logging.Handler:
+    """Build the rotating file handler: by time when LOG_ROTATE_WHEN is set, otherwise by size."""
+    if settings.LOG_ROTATE_WHEN:
+        handler = logging.handlers.TimedRotatingFileHandler(
+            settings.LOG_FILE,
+            when=settings.LOG_ROTATE_WHEN,
+            backupCount=settings.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+            utc=True,
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            settings.LOG_FILE,
+            maxBytes=settings.LOG_MAX_BYTES,
+            backupCount=settings.LOG_BACKUP_COUNT,
+            encoding="utf-8",
+        )
+    handler.namer = _gzip_namer
+    handler.rotator = _gzip_rotator
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """
+    Route all logging through a queue to a background thread that writes
+    JSON lines to a rotating, gzip-archived log file.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, _build_file_handler(), respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_QueueHandler(log_queue))
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the background writer."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,269 @@
+import asyncio
+import functools
+import itertools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; the last bucket is +Inf
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, float("inf"))
+
+Labels = Tuple[str, ...]
+
+
+class Metric:
+    """
+    Base of the exported metrics.
+
+    Every thread updates its own shard of the values, so recording never
+    takes a lock; shards are only summed when the metrics are rendered.
+    A shard is registered once, the first time a thread records a value.
+    Shards of threads that have exited (idle pool workers do) are folded
+    into a retired total when the metrics are rendered.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shard_ids = itertools.count()
+        self._shards: Dict[int, Tuple[threading.Thread, Dict[Labels, List[float]]]] = {}
+        self._retired: Dict[Labels, List[float]] = {}
+        # Only taken while rendering, never when recording
+        self._collect_lock = threading.Lock()
+        registry.append(self)
+
+    def _new(self) -> List[float]:
+        return [0.0]
+
+    def _values(self, labels: Labels) -> List[float]:
+        try:
+            shard = self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            # next() on a count and a dict insert are atomic, so registering needs no lock either
+            self._shards[next(self._shard_ids)] = (threading.current_thread(), shard)
+        values = shard.get(labels)
+        if values is None:
+            values = shard[labels] = self._new()
+        return values
+
+    @staticmethod
+    def _add(total: Dict[Labels, List[float]], shard: Dict[Labels, List[float]]) -> None:
+        for labels, values in list(shard.items()):
+            current = total.get(labels)
+            if current is None:
+                total[labels] = list(values)
+            else:
+                for index, value in enumerate(values):
+                    current[index] += value
+
+    def merged(self) -> Dict[Labels, List[float]]:
+        """Sum the shards of every thread, per label set."""
+        with self._collect_lock:
+            merged: Dict[Labels, List[float]] = {}
+            for shard_id, (thread, shard) in list(self._shards.items()):
+                if thread.is_alive():
+                    self._add(merged, shard)
+                else:
+                    # The thread can no longer write to it
+                    self._add(self._retired, shard)
+                    del self._shards[shard_id]
+            self._add(merged, self._retired)
+            return merged
+
+    def _label_text(self, labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, labels))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+    def samples(self) -> Iterator[str]:
+        for labels, values in sorted(self.merged().items()):
+            yield f"{self.name}{self._label_text(labels)} {_number(values[0])}"
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values(labels)[0] += amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values(labels)[0] += amount
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values(labels)[0] -= amount
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new(self) -> List[float]:
+        # Count per bucket, then sum and count
+        return [0.0] * (len(self.buckets) + 2)
+
+    def observe(self, value: float, *labels: str) -> None:
+        values = self._values(labels)
+        values[bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def samples(self) -> Iterator[str]:
+        for labels, values in sorted(self.merged().items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                yield f"{self.name}_bucket{self._label_text(labels, ('le', le))} {_number(cumulative)}"
+            yield f"{self.name}_sum{self._label_text(labels)} {_number(values[-2])}"
+            yield f"{self.name}_count{self._label_text(labels)} {_number(values[-1])}"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry: List[Metric] = []
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route", "status")
+)
+http_requests_in_flight = Gauge("http_requests_in_flight", "HTTP requests being served.", ("method",))
+dependency_duration = Histogram(
+    "dependency_request_duration_seconds",
+    "Latency of calls to external dependencies.",
+    ("dependency", "operation"),
+)
+dependency_errors = Counter(
+    "dependency_errors_total", "Failed calls to external dependencies.", ("dependency", "operation")
+)
+dependency_in_flight = Gauge("dependency_calls_in_flight", "Calls to external dependencies in progress.", ("dependency",))
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in registry) + "\n"
+
+
+@contextmanager
+def track(dependency: str, operation: str) -> Iterator[None]:
+    """Time a call to an external dependency, counting it as failed when it raises."""
+    dependency_in_flight.inc(dependency)
+    started_at = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        dependency_errors.inc(dependency, operation)
+        raise
+    finally:
+        dependency_duration.observe(time.perf_counter() - started_at, dependency, operation)
+        dependency_in_flight.dec(dependency)
+
+
+def timed(dependency: str, operation: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorator form of :func:`track` for sync and async functions; the operation defaults to the function name."""
+
+    def decorator(func: Callable) -> Callable:
+        name = operation or getattr(func, "__name__", "call")
+
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with track(dependency, name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track(dependency, name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency and in-flight count of every HTTP
+    request. Requests are labelled with the route template, e.g.
+    ``/portfolio/trade_history``, so that path parameters do not multiply
+    the series.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc(method)
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # The router stores the matched route in the shared scope
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started_at,
+                method,
+                getattr(route, "path", "unmatched"),
+                str(status[0]),
+            )
+            http_requests_in_flight.dec(method)
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command the driver sends, by command name."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        dependency_duration.observe(event.duration_micros / 1e6, "mongodb", event.command_name)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        dependency_duration.observe(event.duration_micros / 1e6, "mongodb", event.command_name)
+        dependency_errors.inc("mongodb", event.command_name)
@@ -0,0 +1,242 @@
+import hmac
+import itertools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+PROFILE_HEADER = b"x-profile"
+REPORT_HEADER = "X-Profile-Report"
+REPORT_NAME_PATTERN = re.compile(r"^[\w.-]+$")
+# Leaf frames of threads that are only waiting for work
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+    ("handlers.py", "dequeue"),
+}
+
+
+def collapse(frame) -> Optional[str]:
+    """A frame's stack as "root;...;leaf" function names, or None when the thread is idle."""
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+        return None
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        # co_qualname is new in Python 3.11
+        name = getattr(code, "co_qualname", code.co_name)
+        names.append(f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """
+    Statistical profiler: a background thread samples the stacks of every
+    other busy thread at a fixed interval and counts them in the collapsed
+    stack format that flamegraph.pl and speedscope read.
+
+    Sampling covers the event loop thread as well as the worker threads
+    running yfinance, Mongo and broker calls, so concurrent requests show
+    up in each other's reports.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = collapse(frame)
+                if stack is not None:
+                    self.counts[f"{names.get(thread_id, thread_id)};{stack}"] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.counts
+
+
+class ProfileStore:
+    """
+    Profile reports on disk: ``<name>.collapsed`` holds the stack counts and
+    ``<name>.json`` what was profiled. Only the newest ``max_reports`` are kept.
+    """
+
+    def __init__(self, directory: str, max_reports: int):
+        self.directory = directory
+        self.max_reports = max_reports
+        self._sequence = itertools.count()
+
+    def path(self, name: str, extension: str) -> Optional[str]:
+        if not REPORT_NAME_PATTERN.match(name):
+            return None
+        return os.path.join(self.directory, f"{name}.{extension}")
+
+    def new_name(self, label: str) -> str:
+        """A unique, sortable report name for ``label``."""
+        slug = re.sub(r"[^\w-]+", "_", label).strip("_")[:60]
+        return f"{datetime.now():%Y%m%d-%H%M%S}-{next(self._sequence) % 1000:03d}-{slug}"
+
+    def save(self, name: str, label: str, counts: Counter, meta: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path(name, "collapsed"), "w") as file:
+            file.writelines(f"{stack} {count}\n" for stack, count in counts.most_common())
+        with open(self.path(name, "json"), "w") as file:
+            json.dump({"name": name, "label": label, **meta}, file)
+        self._prune()
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of the stored reports, newest first."""
+        reports = []
+        if not os.path.isdir(self.directory):
+            return reports
+        for file_name in sorted(os.listdir(self.directory), reverse=True):
+            if file_name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.directory, file_name)) as file:
+                        reports.append(json.load(file))
+                except (OSError, json.JSONDecodeError) as e:
+                    logging.warning(f"Unreadable profile report {file_name}: {e}")
+        return reports
+
+    def _prune(self) -> None:
+        names = sorted(file_name[:-5] for file_name in os.listdir(self.directory) if file_name.endswith(".json"))
+        for name in names[: max(len(names) - self.max_reports, 0)]:
+            for extension in ("json", "collapsed"):
+                try:
+                    os.remove(self.path(name, extension))
+                except OSError:
+                    pass
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_REPORTS)
+
+
+class ProfileSession:
+    """Name of the report and extra metadata to store with it."""
+
+    __slots__ = ("report", "meta")
+
+    def __init__(self, report: str, meta: Dict[str, Any]):
+        self.report = report
+        self.meta = meta
+
+
+@asynccontextmanager
+async def profile(label: str, trigger: str, **meta: Any) -> AsyncIterator[ProfileSession]:
+    """Sample the stacks while the block runs and store the report under ``label``."""
+    session = ProfileSession(profile_store.new_name(label), meta)
+    sampler = StackSampler(settings.PROFILE_INTERVAL_MS / 1000)
+    started_at = time.perf_counter()
+    sampler.start()
+    try:
+        yield session
+    finally:
+        counts = sampler.stop()
+        duration_ms = round((time.perf_counter() - started_at) * 1000, 3)
+        try:
+            await run_in_threadpool(
+                profile_store.save,
+                session.report,
+                label,
+                counts,
+                {
+                    "trigger": trigger,
+                    "created_at": datetime.now().isoformat(),
+                    "duration_ms": duration_ms,
+                    "samples": sampler.samples,
+                    "interval_ms": settings.PROFILE_INTERVAL_MS,
+                    **session.meta,
+                },
+            )
+            logging.info(f"Profiled {label} in {duration_ms} ms: report {session.report}")
+        except OSError as e:
+            logging.error(f"Failed to store the profile of {label}: {e}")
+
+
+def token_matches(token: Optional[str]) -> bool:
+    """Whether ``token`` is the configured PROFILE_TOKEN, compared in constant time."""
+    return token is not None and hmac.compare_digest(token.encode(), settings.PROFILE_TOKEN.encode())
+
+
+async def require_profile_token(x_profile_token: Optional[str] = Header(None)) -> None:
+    """Dependency guarding the profile reports with PROFILE_TOKEN, sent as the X-Profile-Token header."""
+    if not settings.PROFILE_TOKEN:
+        raise HTTPException(status_code=403, detail="Set PROFILE_TOKEN to access profile reports")
+    if not token_matches(x_profile_token):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Profile-Token")
+
+
+def job_trigger(name: str) -> Optional[str]:
+    """Why a scheduled task should be profiled, or None."""
+    if settings.PROFILE_ENABLED and (name in settings.PROFILE_JOBS or "*" in settings.PROFILE_JOBS):
+        return "job"
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling a request when PROFILE_ENABLED is set and the
+    request sends the X-Profile header (carrying PROFILE_TOKEN when one is
+    configured) or is the 1 in PROFILE_SAMPLE_RATE sampled request. The name
+    of the stored report is returned in the X-Profile-Report header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._requests = itertools.count(1)
+
+    def _trigger(self, scope) -> Optional[str]:
+        if not settings.PROFILE_ENABLED or scope["type"] != "http":
+            return None
+        header = dict(scope["headers"]).get(PROFILE_HEADER)
+        if header is not None and (not settings.PROFILE_TOKEN or token_matches(header.decode())):
+            return "header"
+        if settings.PROFILE_SAMPLE_RATE and next(self._requests) % settings.PROFILE_SAMPLE_RATE == 0:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope)
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        label = f"{scope['method']} {scope['path']}"
+        async with profile(label, trigger, method=scope["method"], path=scope["path"]) as session:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    session.meta["status"] = message["status"]
+                    message["headers"] = [*message.get("headers", []), (REPORT_HEADER.encode(), session.report.encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -1,8 +1,15 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from app.services.scrape_service import fetch_stock_data
+from apscheduler.triggers.interval import IntervalTrigger
+from app.core.config import settings
+from app.core.profiler import job_trigger, profile
+from app.services.scrape_service import refresh_scanner_bars
 from app.services.trade_service import execute_trade
 from app.services.test_trade_service import execute_test_trade
+from app.services.trade_pipeline import JOB_EVENTS, pipeline_monitor, run_test_trade_pipeline, run_trade_pipeline
+from app.services.trade_sync_service import sync_trade_history
+from app.services.bar_store import compact_bar_store
+from datetime import datetime
 import logging
 from pytz import timezone
 
@@ -15,31 +22,67 @@ scheduler = AsyncIOScheduler(timezone=ASIA_KOLKATA)
 
 async def schedule_async_task(task_func, *args):
     try:
-        await task_func(*args)
+        trigger = job_trigger(task_func.__name__)
+        if trigger is None:
+            await task_func(*args)
+            return
+        async with profile(" ".join([task_func.__name__, *map(str, args)]), trigger, job=task_func.__name__):
+            await task_func(*args)
     except Exception as e:
         logging.error(f"Error in scheduled task: {e}")
 
 
 def setup_scheduled_tasks(scheduler):
-    fetch_stock_trigger = CronTrigger(
+    # Scans, then buys as soon as the picks are sized, before PIPELINE_ORDER_DEADLINE
+    trade_pipeline_trigger = CronTrigger(
         second=0, minute=13, hour=15, day="*", month="*", day_of_week="0-4", timezone=ASIA_KOLKATA
     )
-    buy_trigger = CronTrigger(
-        second=5, minute=16, hour=15, day="*", month="*", day_of_week="0-4", timezone=ASIA_KOLKATA
+    # Ahead of the scan, so that local scanners read up to date bars
+    refresh_scanner_bars_trigger = CronTrigger(
+        second=0, minute=5, hour=15, day="*", month="*", day_of_week="0-4", timezone=ASIA_KOLKATA
     )
     sell_trigger = CronTrigger(
         second=5, minute=16, hour=9, day="*", month="*", day_of_week="0-4", timezone=ASIA_KOLKATA
     )
-    test_buy_trigger = CronTrigger(
-        second=5, minute=16, hour=15, day="*", month="*", day_of_week="0-4", timezone=ASIA_KOLKATA
-    )
     test_sell_trigger = CronTrigger(
         second=5, minute=16, hour=9, day="*", month="*", day_of_week="0-4", timezone=ASIA_KOLKATA
     )
+    # After the close, once the day's bars stopped changing
+    compact_bar_store_trigger = CronTrigger(
+        second=0, minute=0, hour=16, day="*", month="*", day_of_week="0-4", timezone=ASIA_KOLKATA
+    )
 
-    scheduler.add_job(schedule_async_task, fetch_stock_trigger, args=[fetch_stock_data])
-    # scheduler.add_job(schedule_async_task, buy_trigger, args=[execute_trade, "buy"])
-    # scheduler.add_job(schedule_async_task, sell_trigger, args=[execute_trade, "sell"])
-    scheduler.add_job(schedule_async_task, test_buy_trigger, args=[execute_test_trade, "buy"])
-    scheduler.add_job(schedule_async_task, test_sell_trigger, args=[execute_test_trade, "sell"])
+    scheduler.add_listener(pipeline_monitor.listener, JOB_EVENTS)
+    scheduler.add_job(
+        schedule_async_task, refresh_scanner_bars_trigger, args=[refresh_scanner_bars], id="refresh_scanner_bars"
+    )
+    # scheduler.add_job(
+    #     schedule_async_task,
+    #     trade_pipeline_trigger,
+    #     args=[run_trade_pipeline],
+    #     id="trade_pipeline",
+    #     max_instances=1,
+    #     misfire_grace_time=settings.PIPELINE_MISFIRE_GRACE_SECONDS,
+    # )
+    # scheduler.add_job(schedule_async_task, sell_trigger, args=[execute_trade, "sell"], id="sell")
+    scheduler.add_job(
+        schedule_async_task,
+        trade_pipeline_trigger,
+        args=[run_test_trade_pipeline],
+        id="test_trade_pipeline",
+        max_instances=1,
+        misfire_grace_time=settings.PIPELINE_MISFIRE_GRACE_SECONDS,
+    )
+    scheduler.add_job(schedule_async_task, test_sell_trigger, args=[execute_test_trade, "sell"], id="test_sell")
+    scheduler.add_job(schedule_async_task, compact_bar_store_trigger, args=[compact_bar_store], id="compact_bar_store")
+    # First sync at startup, then only the open window is refetched on each run
+    scheduler.add_job(
+        schedule_async_task,
+        IntervalTrigger(minutes=settings.TRADE_SYNC_INTERVAL_MINUTES, timezone=ASIA_KOLKATA),
+        args=[sync_trade_history],
+        id="sync_trade_history",
+        next_run_time=datetime.now(ASIA_KOLKATA),
+        max_instances=1,
+        coalesce=True,
+    )
 
@@ -1,23 +1,30 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from dotenv import load_dotenv
 from app.core.config import settings
-from app.core.database import connect_to_db
+from app.core.database import close_db, connect_to_db
+from app.core import metrics
+from app.core.profiler import REPORT_HEADER, ProfilingMiddleware
+from app.core.logging_config import setup_logging, stop_logging
+from app.core.browser_pool import browser_pool
+from app.core.broker_gateway import broker_gateway
+from app.services.fetch_backend import http_backend
+from app.services.market_feed import market_feed
+from app.services.basket_service import watch_held_stocks
+from app.services.scrape_service import scanner_executor
+from app.repositories.stock_repository import ensure_stock_indexes, stock_repository, test_stock_repository
+from app.repositories.trade_repository import trade_repository
 from app.core.scheduler import scheduler, setup_scheduled_tasks
-from app.routes import portfolio, market, scrape_table, screener, app_logs
+from app.routes import portfolio, market, scrape_table, screener, app_logs, pipeline, profiles
 import logging
 import os
 
 load_dotenv()
 
 # Configure logging
-logging.basicConfig(
-    filename="app_logs.txt",
-    filemode="a",
-    format="%(asctime)s - %(levelname)s - %(filename)s - %(funcName)s - %(message)s",
-    level=logging.INFO,
-)
+setup_logging(logging.INFO)
 logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
 logging.getLogger("logger.py").setLevel(logging.ERROR)
 
@@ -44,14 +51,20 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", REPORT_HEADER],
 )
 
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Include routers
 app.include_router(portfolio.router, prefix="/portfolio", tags=["Portfolio Management"])
 app.include_router(market.router, prefix="/market", tags=["Market"])
 app.include_router(scrape_table.router, prefix="/scrape", tags=["Scrape Table"])
 app.include_router(screener.router, prefix="/screener", tags=["Charlink Screener"])
 app.include_router(app_logs.router, prefix="/app_logs", tags=["App Logs"])
+app.include_router(pipeline.router, prefix="/pipeline", tags=["Trade Pipeline"])
+app.include_router(profiles.router, prefix="/admin/profiles", tags=["Admin"])
 
 # Setup scheduled tasks
 setup_scheduled_tasks(scheduler)
@@ -61,17 +74,40 @@ setup_scheduled_tasks(scheduler)
 async def startup_event():
     logging.info(f"Starting the scheduler on port {os.getenv('PORT')}")
     scheduler.start()
+    # Open the shared MongoDB pool before the first request or trade needs it
+    await connect_to_db()
+    await ensure_stock_indexes()
+    await trade_repository.ensure_indexes()
+    try:
+        await watch_held_stocks(stock_repository, test_stock_repository)
+    except Exception as e:
+        logging.error(f"Failed to load held stocks for the market feed: {e}")
+    market_feed.start()
+    if settings.SCRAPE_BACKEND == "selenium":
+        # With the HTTP backend Chrome is only launched on fallback
+        await run_in_threadpool(browser_pool.start)
 
 
 @app.on_event("shutdown")
-def shutdown_event():
+async def shutdown_event():
     logging.info("Shutting down the scheduler")
     scheduler.shutdown()
+    await market_feed.stop()
+    browser_pool.shutdown()
+    broker_gateway.shutdown()
+    scanner_executor.shutdown(wait=False, cancel_futures=True)
+    await http_backend.close()
+    close_db()
+    stop_logging()
 
 @app.get("/healthcheck")
 async def healthcheck():
     return {"status": "ok"}
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to the Stock Portfolio App"}
@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+# Define the data model to return market summary
+class MarketSummary(BaseModel):
+    index_name: str
+    current_price: float
+    open_price: float
+    high_price: float
+    low_price: float
+    previous_close: float
+    volume: int
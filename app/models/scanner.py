@@ -1,8 +1,26 @@
+from typing import List, Optional
+
 from pydantic import BaseModel
 
 
+class ScanCondition(BaseModel):
+    """One filter of a local scan, e.g. rsi(14) > 60 or close > sma(50)."""
+
+    indicator: str
+    period: Optional[int] = None
+    op: str = ">"
+    value: Optional[float] = None
+    compare_to: Optional[str] = None
+    compare_period: Optional[int] = None
+
+
 class ScannerItem(BaseModel):
     name: str
-    url: str
-    description: str
-    table_id: str
+    url: str = ""
+    description: str = ""
+    table_id: str = ""
+    # "chartink" scrapes ``url``; "local" evaluates ``conditions`` over the stored bars
+    source: str = "chartink"
+    conditions: List[ScanCondition] = []
+    interval: str = "1d"
+    bars: int = 120
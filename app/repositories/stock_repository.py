@@ -0,0 +1,225 @@
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorCursor
+from pymongo import ASCENDING, DESCENDING, DeleteMany, IndexModel, ReturnDocument, UpdateOne
+
+from app.core.database import stock_db
+from app.services.scan_normalizer import parse_indian_numbers
+
+STOCK_COLLECTION_NAME = "stock_data"
+TEST_STOCK_COLLECTION_NAME = "test_stock_data"
+
+STOCK_INDEXES = [
+    # One record per stock per scanner per day; also backs the per-(date, scanner, symbol) upsert
+    IndexModel(
+        [("date", ASCENDING), ("scanner", ASCENDING), ("symbol", ASCENDING)],
+        name="date_scanner_symbol_unique",
+        unique=True,
+    ),
+    # find_top_scanned ({date, status}), find_all_bought and find_pending ({status})
+    IndexModel([("status", ASCENDING), ("date", ASCENDING), ("change", DESCENDING)], name="status_date_change"),
+    # Newest-first keyset pagination on (date, _id)
+    IndexModel([("date", DESCENDING), ("_id", DESCENDING)], name="date_id_desc"),
+    # Order tag lookups when a trade is confirmed
+    IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    # Numeric range filters of the screener
+    IndexModel([("price", ASCENDING), ("date", DESCENDING)], name="price_date"),
+    IndexModel([("volume", DESCENDING), ("date", DESCENDING)], name="volume_date"),
+    IndexModel([("change", DESCENDING), ("date", DESCENDING)], name="change_date"),
+]
+
+# Legacy string prices/volumes such as "6,94,683" or "1.2 Cr", and how each is stored once parsed
+NUMERIC_FIELDS = {"price": float, "volume": round}
+# Set when a scanned stock is first stored and then owned by trading, so a rescan never resets them
+TRADE_FIELDS = ("id", "status", "quantity", "buy_price", "sell_price", "state")
+# Replaced when a day started holding a basket of stocks instead of one,
+# and when several scanners started storing their picks for the same day
+OBSOLETE_INDEXES = ["date_unique", "status_date", "date_symbol_unique"]
+
+
+def parse_numeric_strings(
+    documents: List[Dict[str, Any]], field: str, cast: Callable[[float], Any]
+) -> List[Tuple[ObjectId, str, Any]]:
+    """(_id, string, number) of every document whose ``field`` string parses as a number."""
+    if not documents:
+        return []
+    numbers = parse_indian_numbers(pd.Series([document[field] for document in documents]))
+    return [
+        (document["_id"], document[field], cast(float(number)))
+        for document, number in zip(documents, numbers)
+        if not pd.isna(number)
+    ]
+
+
+class StockRepository:
+    """Data access for the scanned/traded stock records of one collection."""
+
+    def __init__(self, collection: AsyncIOMotorCollection):
+        self.collection = collection
+
+    @property
+    def name(self) -> str:
+        return self.collection.name
+
+    async def ensure_indexes(self) -> None:
+        """Create the collection indexes. Existing identical indexes are left untouched."""
+        try:
+            existing = await self.collection.index_information()
+            for name in OBSOLETE_INDEXES:
+                if name in existing:
+                    await self.collection.drop_index(name)
+        except Exception as e:
+            logging.error(f"Failed to read or drop obsolete indexes on {self.name}: {e}")
+            return
+        for index in STOCK_INDEXES:
+            # One at a time, so e.g. duplicate legacy data only blocks its own unique index
+            try:
+                await self.collection.create_indexes([index])
+            except Exception as e:
+                logging.error(f"Failed to create index {index.document['name']} on {self.name}: {e}")
+
+    async def convert_numeric_fields(self) -> int:
+        """
+        Convert price and volume stored as formatted strings to numbers with
+        the scan parser; return how many records changed. Strings it cannot
+        parse are left as they are.
+        """
+        modified = 0
+        for field, cast in NUMERIC_FIELDS.items():
+            # The price/volume indexes serve the $type match, so only the legacy strings are read
+            documents = await self.collection.find({field: {"$type": "string"}}, {field: 1}).to_list(length=None)
+            operations = [
+                # Matching the old value too, so a record rewritten meanwhile is left alone
+                UpdateOne({"_id": _id, field: text}, {"$set": {field: number}})
+                for _id, text, number in parse_numeric_strings(documents, field, cast)
+            ]
+            if operations:
+                result = await self.collection.bulk_write(operations, ordered=False)
+                modified += result.modified_count
+        return modified
+
+    async def find_all(self) -> List[Dict[str, Any]]:
+        """Return every stock record."""
+        return await self.collection.find({}).to_list(length=None)
+
+    def find_page(
+        self,
+        query: Dict[str, Any],
+        after: Optional[Tuple[str, ObjectId]] = None,
+        limit: Optional[int] = None,
+        projection: Optional[Dict[str, int]] = None,
+    ) -> AsyncIOMotorCursor:
+        """
+        Return a cursor over records matching the query, newest first.
+
+        :param after: (date, _id) of the last record of the previous page.
+        :param limit: Maximum number of records, or None for all of them.
+        :param projection: Fields to return.
+        """
+        if after is not None:
+            after_date, after_id = after
+            query = {
+                "$and": [
+                    query,
+                    {"$or": [{"date": {"$lt": after_date}}, {"date": after_date, "_id": {"$lt": after_id}}]},
+                ]
+            }
+        cursor = self.collection.find(query, projection).sort([("date", DESCENDING), ("_id", DESCENDING)])
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    async def find_top_scanned(self, date: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Return up to ``limit`` stocks scanned on the given date and not yet
+        traded, highest change first. A stock picked by several scanners is
+        returned once.
+        """
+        cursor = self.collection.find({"date": date, "status": "scanned"}).sort("change", DESCENDING)
+        stocks, symbols = [], set()
+        async for stock in cursor:
+            if stock["symbol"] in symbols:
+                continue
+            symbols.add(stock["symbol"])
+            stocks.append(stock)
+            if len(stocks) == limit:
+                break
+        return stocks
+
+    async def find_all_bought(self) -> List[Dict[str, Any]]:
+        """Return every stock currently held."""
+        return await self.collection.find({"status": "bought"}).to_list(length=None)
+
+    async def find_pending(self) -> List[Dict[str, Any]]:
+        """Return every stock with an order submitted but not yet settled."""
+        return await self.collection.find({"status": "pending"}).to_list(length=None)
+
+    async def replace_scanned(self, date: str, results: Dict[Optional[str], List[Dict[str, Any]]]) -> None:
+        """
+        Make the given stocks the scanned stocks of each scanner for a date,
+        for every scanner in one bulk write.
+
+        Each stock is upserted by (date, scanner, symbol); earlier scanned
+        records of a scanner that are no longer in its list are removed.
+        The trade fields are only set on insert, so rescanning a stock that
+        is already bought or pending keeps its position. Records stored
+        before scanners were named use the scanner None.
+        """
+        operations = []
+        for scanner, stocks in results.items():
+            symbols = [stock["symbol"] for stock in stocks]
+            operations.append(
+                DeleteMany({"date": date, "scanner": scanner, "status": "scanned", "symbol": {"$nin": symbols}})
+            )
+            operations += [
+                UpdateOne(
+                    {"date": date, "scanner": scanner, "symbol": stock["symbol"]},
+                    {
+                        "$set": {
+                            **{field: value for field, value in stock.items() if field not in TRADE_FIELDS},
+                            "scanner": scanner,
+                        },
+                        "$setOnInsert": {field: stock[field] for field in TRADE_FIELDS if field in stock},
+                    },
+                    upsert=True,
+                )
+                for stock in stocks
+            ]
+        if operations:
+            await self.collection.bulk_write(operations, ordered=True)
+
+    async def replace_scanned_for_date(self, date: str, stocks: List[Dict[str, Any]]) -> None:
+        """Make ``stocks`` the scanned stocks of the given date, for the unnamed scanner."""
+        await self.replace_scanned(date, {None: stocks})
+
+    async def update_by_id(self, stock_id: str, fields: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Set fields on the stock record with the given id and return the updated record."""
+        return await self.collection.find_one_and_update(
+            {"id": stock_id}, {"$set": fields}, return_document=ReturnDocument.AFTER
+        )
+
+    async def bulk_update_by_id(self, updates: Dict[str, Dict[str, Any]]) -> None:
+        """Set fields on several stock records, keyed by id, in one bulk write."""
+        if not updates:
+            return
+        operations = [UpdateOne({"id": stock_id}, {"$set": fields}) for stock_id, fields in updates.items()]
+        await self.collection.bulk_write(operations, ordered=False)
+
+
+stock_repository = StockRepository(stock_db[STOCK_COLLECTION_NAME])
+test_stock_repository = StockRepository(stock_db[TEST_STOCK_COLLECTION_NAME])
+
+
+async def ensure_stock_indexes() -> None:
+    """Create the indexes of every stock collection and convert legacy string numbers."""
+    for repository in (stock_repository, test_stock_repository):
+        await repository.ensure_indexes()
+        try:
+            modified = await repository.convert_numeric_fields()
+            if modified:
+                logging.info(f"Converted numeric fields of {modified} records in {repository.name}")
+        except Exception as e:
+            logging.error(f"Failed to convert numeric fields in {repository.name}: {e}")
@@ -0,0 +1,107 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorCursor
+from pymongo import ASCENDING, DESCENDING, IndexModel, UpdateOne
+
+from app.core.database import db
+
+TRADE_COLLECTION_NAME = "trades"
+SYNC_STATE_COLLECTION_NAME = "sync_state"
+TRADE_SYNC_STATE_ID = "trade_history"
+
+TRADE_INDEXES = [
+    # One record per exchange trade; also backs the sync upsert
+    IndexModel([("orderId", ASCENDING), ("exchangeTradeId", ASCENDING)], name="order_trade_unique", unique=True),
+    # Date range queries with newest-first keyset pagination on (trade_time, _id)
+    IndexModel([("trade_time", DESCENDING), ("_id", DESCENDING)], name="trade_time_id_desc"),
+]
+
+
+def trade_key(trade: Dict[str, Any]) -> Dict[str, Any]:
+    return {"orderId": trade["orderId"], "exchangeTradeId": trade["exchangeTradeId"]}
+
+
+class TradeRepository:
+    """Local store of broker trades and the high-water mark of their sync."""
+
+    def __init__(self, collection: AsyncIOMotorCollection, state_collection: AsyncIOMotorCollection):
+        self.collection = collection
+        self.state_collection = state_collection
+
+    async def ensure_indexes(self) -> None:
+        """Create the collection indexes. Existing identical indexes are left untouched."""
+        for index in TRADE_INDEXES:
+            try:
+                await self.collection.create_indexes([index])
+            except Exception as e:
+                logging.error(f"Failed to create index {index.document['name']} on {self.collection.name}: {e}")
+
+    async def upsert_many(self, trades: List[Dict[str, Any]]) -> int:
+        """Insert or update trades keyed by (orderId, exchangeTradeId) in one bulk write."""
+        if not trades:
+            return 0
+        operations = [UpdateOne(trade_key(trade), {"$set": trade}, upsert=True) for trade in trades]
+        result = await self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    def find_page(
+        self,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        after: Optional[Tuple[str, ObjectId]] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIOMotorCursor:
+        """
+        Return a cursor over trades between two dates (inclusive), newest first.
+
+        :param after: (trade_time, _id) of the last trade of the previous page.
+        :param limit: Maximum number of trades, or None for all of them.
+        """
+        # trade_time is "YYYY-MM-DD HH:MM:SS", so string order is time order
+        time_range = {}
+        if date_from:
+            time_range["$gte"] = date_from
+        if date_to:
+            time_range["$lte"] = f"{date_to} 23:59:59"
+        query: Dict[str, Any] = {"trade_time": time_range} if time_range else {}
+        if after is not None:
+            after_time, after_id = after
+            query = {
+                "$and": [
+                    query,
+                    {"$or": [{"trade_time": {"$lt": after_time}}, {"trade_time": after_time, "_id": {"$lt": after_id}}]},
+                ]
+            }
+        cursor = self.collection.find(query).sort([("trade_time", DESCENDING), ("_id", DESCENDING)])
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    async def get_sync_state(self) -> Dict[str, Optional[str]]:
+        """
+        Return the high-water mark of the sync and when the last sync finished.
+
+        ``synced_through`` is the last date (YYYY-MM-DD) whose trade history is
+        fully stored; ``synced_at`` the ISO time of the last completed sync.
+        """
+        state = await self.state_collection.find_one({"_id": TRADE_SYNC_STATE_ID}) or {}
+        return {"synced_through": state.get("synced_through"), "synced_at": state.get("synced_at")}
+
+    async def get_synced_through(self) -> Optional[str]:
+        """Return the last date (YYYY-MM-DD) whose trade history is fully stored."""
+        return (await self.get_sync_state())["synced_through"]
+
+    async def set_synced_through(self, date: str) -> None:
+        await self.state_collection.update_one(
+            {"_id": TRADE_SYNC_STATE_ID}, {"$set": {"synced_through": date}}, upsert=True
+        )
+
+    async def set_synced_at(self, synced_at: str) -> None:
+        await self.state_collection.update_one(
+            {"_id": TRADE_SYNC_STATE_ID}, {"$set": {"synced_at": synced_at}}, upsert=True
+        )
+
+
+trade_repository = TradeRepository(db[TRADE_COLLECTION_NAME], db[SYNC_STATE_COLLECTION_NAME])
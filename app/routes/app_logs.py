@@ -1,54 +1,48 @@
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
-import re
 from datetime import datetime
-import pytz
+from typing import Optional
+
+from fastapi import APIRouter, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+
+from app.services.log_reader import log_reader
 
 router = APIRouter()
 
-log_file_path = "app_logs.txt"
-
-kolkata_timezone = pytz.timezone("Asia/Kolkata")
-
-def parse_log_line(line: str, exclude=[]):
-    log_pattern = r'(?P<timestamp>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - (?P<level>\w+) - (?P<filename>\S+) - (?P<function>\S+) - (?P<message>.*)'
-    
-    match = re.match(log_pattern, line)
-    if match:
-        utc_time = datetime.strptime(match.group("timestamp"), "%Y-%m-%d %H:%M:%S,%f")
-        local_time = utc_time.replace(tzinfo=pytz.utc).astimezone(kolkata_timezone)
-        if match.group("filename") in exclude:
-            return None
-        return {
-            "timestamp": local_time.strftime("%Y-%m-%d %H:%M:%S,%f"),  
-            "level": match.group("level"),
-            "filename": match.group("filename"),
-            "function": match.group("function"),
-            "message": match.group("message")
-        }
-    return None
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 5000
+EXCLUDED_FILES = ["base.py", "models.py", "logger.py"]
+
 
 # Endpoint to fetch logs from file and return them as JSON
 @router.get("/logs")
-async def get_logs():
-    logs = []
-    
-    # Read the log file and parse each line
+async def get_logs(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, ge=0),
+    level: Optional[str] = None,
+    filename: Optional[str] = None,
+    start_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+):
+    """
+    Return the newest log entries first.
+
+    Times are Asia/Kolkata unless they carry an offset. Older entries are
+    fetched by passing back the X-Next-Cursor header as ``cursor``.
+    """
     try:
-        with open(log_file_path, "r") as file:
-            for line in file:
-                log_entry = parse_log_line(line, ["base.py", "models.py", "logger.py"])
-                if log_entry:
-                    logs.append(log_entry)
+        logs, next_cursor = await run_in_threadpool(
+            log_reader.query,
+            limit,
+            before=cursor,
+            level=level.upper() if level else None,
+            filename=filename,
+            start_time=start_time,
+            end_time=end_time,
+            exclude=EXCLUDED_FILES,
+        )
     except FileNotFoundError:
         return JSONResponse(status_code=404, content={"error": "Log file not found."})
-    
-    # Sort logs in descending order of timestamp
-    sorted_logs = sorted(
-        logs,
-        key=lambda x: datetime.strptime(x["timestamp"], "%Y-%m-%d %H:%M:%S,%f"),
-        reverse=True
-    )
-    
-    # Return the sorted logs as a JSON response
-    return JSONResponse(content=sorted_logs)
+
+    headers = {"X-Next-Cursor": str(next_cursor)} if next_cursor is not None else {}
+    return JSONResponse(content=logs, headers=headers)
@@ -1,59 +1,24 @@
-import yfinance as yf
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import asyncio
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
 
-router = APIRouter()
+from app.models.market import MarketSummary
+from app.services.market_data_service import get_market_summaries
+from app.services.market_feed import market_feed
+from app.services.quote_cache import get_info, get_quote, quote_cache
 
+router = APIRouter()
 
-# Define the data model to return market summary
-class MarketSummary(BaseModel):
-    index_name: str
-    current_price: float
-    open_price: float
-    high_price: float
-    low_price: float
-    previous_close: float
-    volume: int
+DEFAULT_INDICES = {"nifty_50": "^NSEI", "sensex": "^BSESN"}
 
 
 def get_market_data(index_symbol: str) -> MarketSummary:
     try:
-        # Fetch daily data using yfinance
-        index = yf.Ticker(index_symbol)
-        data = index.history(period="1d")  # Get only the latest day's data
-
-        if data.empty:
+        summary = get_market_summaries([index_symbol])[index_symbol]
+        if summary is None:
             raise ValueError(f"No data returned for symbol: {index_symbol}")
-
-        # Get the latest row (today's data)
-        latest_data = data.iloc[-1]
-
-        # Current price is the close price of the latest data, rounded to 2 decimal places
-        current_price = round(latest_data["Close"], 2)
-
-        # Get the previous day's data (which is the second latest record)
-        previous_data = index.history(period="5d").iloc[-2]  # Fetch two days' data
-
-        # Previous close is rounded to 2 decimal places
-        previous_close = (
-            round(previous_data["Close"], 2)
-            if previous_data is not None
-            else current_price
-        )
-
-        # Check for volume (in case it's missing)
-        volume = latest_data.get("Volume", 0)
-
-        # Return the response as a Pydantic model
-        return MarketSummary(
-            index_name=index_symbol,
-            current_price=current_price,
-            open_price=round(latest_data["Open"], 2),
-            high_price=round(latest_data["High"], 2),
-            low_price=round(latest_data["Low"], 2),
-            previous_close=previous_close,
-            volume=volume,
-        )
+        return summary
     except ValueError as ve:
         raise HTTPException(
             status_code=500, detail=f"Error fetching market data: {str(ve)}"
@@ -76,14 +41,26 @@ def get_cap_category(market_cap):
 
 
 @router.get("/market-summary")
-async def get_market_summary():
+async def get_market_summary(
+    symbols: Optional[str] = Query(None, description="Comma separated watchlist, e.g. ^NSEI,^NSEBANK,RELIANCE.NS"),
+):
     try:
-        # Fetch market data for Nifty 50 and Sensex
-        nifty_data = get_market_data("^NSEI")  # Nifty 50
-        sensex_data = get_market_data("^BSESN")  # Sensex
+        if symbols:
+            # Fetch every symbol of the watchlist in one batched download
+            watchlist = [symbol.strip() for symbol in symbols.split(",") if symbol.strip()]
+            return await run_in_threadpool(get_market_summaries, watchlist)
+
+        # Fetch market data for Nifty 50 and Sensex in one batched download
+        summaries = await run_in_threadpool(get_market_summaries, list(DEFAULT_INDICES.values()))
+        missing = [symbol for symbol, summary in summaries.items() if summary is None]
+        if missing:
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error fetching market data: No data returned for symbol: {', '.join(missing)}",
+            )
 
         # Return data as a Pydantic model
-        return {"nifty_50": nifty_data, "sensex": sensex_data}
+        return {name: summaries[symbol] for name, symbol in DEFAULT_INDICES.items()}
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -95,9 +72,10 @@ async def get_stock_detail(index_symbol: str):
     try:
         index_symbol = f"{index_symbol.upper()}.NS"
 
-        # Fetch ticker data
-        ticker = yf.Ticker(index_symbol)
-        ticker_info = ticker.info
+        # Fundamentals change slowly and are cached for long; the price fields come from the short-lived quote
+        ticker_info, quote = await asyncio.gather(
+            run_in_threadpool(get_info, index_symbol), run_in_threadpool(get_quote, index_symbol)
+        )
 
         # Extract market cap
         market_cap_raw = ticker_info.get("marketCap")
@@ -116,11 +94,11 @@ async def get_stock_detail(index_symbol: str):
         sector = ticker_info.get("sector", "Unknown Sector")
         industry = ticker_info.get("industry", "Unknown Industry")
         pe_ratio = ticker_info.get("trailingPE", "N/A")
-        previous_close = ticker_info.get("previousClose", "N/A")
         week_52_range = f"{ticker_info.get('fiftyTwoWeekLow', 'N/A')} - {ticker_info.get('fiftyTwoWeekHigh', 'N/A')}"
-        current_price = ticker_info.get("currentPrice", "N/A")
-        open_price = ticker_info.get("open", "N/A")
-        volume = ticker_info.get("volume", "N/A")
+        previous_close = quote["previous_close"]
+        current_price = quote["current_price"]
+        open_price = quote["open"]
+        volume = quote["volume"]
         percent_change = (current_price - previous_close) / previous_close * 100
 
         return {
@@ -144,3 +122,13 @@ async def get_stock_detail(index_symbol: str):
         raise HTTPException(
             status_code=500, detail=f"Error fetching market data: {str(e)}"
         )
+
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    return quote_cache.stats()
+
+
+@router.get("/feed-stats")
+async def get_feed_stats():
+    return market_feed.stats()
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from app.services.trade_pipeline import pipeline_monitor
+
+router = APIRouter()
+
+
+@router.get("/stats")
+async def get_pipeline_stats():
+    """Recent scan-to-order runs with their stage timings, deadline misses and scheduler lateness per job."""
+    return pipeline_monitor.stats()
@@ -1,78 +1,133 @@
-from pydantic import BaseModel
-from typing import List, Optional
-from fastapi import APIRouter
-from app.core.dhan_client import get_dhan_client
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Query
+from app.repositories.trade_repository import trade_repository
+from app.services.portfolio_service import PortfolioUnavailable, portfolio_snapshot_service
+from app.services.trade_sync_service import ASIA_KOLKATA, trade_history_sync
 from fastapi.responses import JSONResponse
 
-class TradeHistory(BaseModel):
-    transactionType: str
-    tradedQuantity: int
-    tradedPrice: float
-    sebiTax: float
-    stt: float
-    brokerage: float
-    serviceTax: float
-    exchangeCharge: float
-    stampDuty: float
-    customSymbol: str
-    instrumentType: str
-
-class TradeBook(BaseModel):
-    orderId: int
-    exchangeTradeId: str
-    tradedQuantity: int
-    tradedPrice: float
-    transactionType: str
-    tradingSymbol: str
-    createTime: Optional[str]
-    updateTime: Optional[str]
-    exchangeTime: Optional[str]
-
-class CombinedResponse(BaseModel):
-    tradeHistory: List[TradeHistory]
-    tradeBook: List[TradeBook]
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
 router = APIRouter()
 
 
+def portfolio_unavailable(error: PortfolioUnavailable) -> JSONResponse:
+    return JSONResponse(content={"error": f"Portfolio unavailable: {error}"}, status_code=502)
+
+
 @router.get("/get_fund_limits")
 async def get_fund_limits():
-    dhan = get_dhan_client()
-    return JSONResponse(dhan.get_fund_limits())
+    try:
+        snapshot = await portfolio_snapshot_service.get()
+    except PortfolioUnavailable as e:
+        return portfolio_unavailable(e)
+    return JSONResponse(snapshot.funds)
 
 @router.get("/get_positions")
 async def get_positions():
-    dhan = get_dhan_client()
-    return JSONResponse(dhan.get_positions())
+    try:
+        snapshot = await portfolio_snapshot_service.get()
+    except PortfolioUnavailable as e:
+        return portfolio_unavailable(e)
+    return JSONResponse(snapshot.positions)
 
 @router.get("/get_holdings")
 async def get_holdings():
-    dhan = get_dhan_client()
-    return JSONResponse(dhan.get_holdings())
+    try:
+        snapshot = await portfolio_snapshot_service.get()
+    except PortfolioUnavailable as e:
+        return portfolio_unavailable(e)
+    return JSONResponse(snapshot.holdings)
+
+@router.get("/snapshot")
+async def get_portfolio_snapshot(refresh: bool = False):
+    """Funds, positions and holdings from one snapshot, with its version and age."""
+    try:
+        if refresh:
+            snapshot = await portfolio_snapshot_service.refresh()
+        else:
+            snapshot = await portfolio_snapshot_service.get()
+    except PortfolioUnavailable as e:
+        return portfolio_unavailable(e)
+    return JSONResponse(portfolio_snapshot_service.to_dict(snapshot))
+
+
+def encode_cursor(trade: Dict[str, Any]) -> str:
+    """Encode the (trade_time, _id) position of a trade as an opaque page cursor."""
+    raw = json.dumps([trade["trade_time"], str(trade["_id"])]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
 
 
-@router.get("/trade_history", response_model=CombinedResponse)
-def get_combined_trades():
-    # Fetch trade history and trade book
+def decode_cursor(cursor: str) -> Tuple[str, ObjectId]:
+    """Decode a page cursor back into its (trade_time, _id) position."""
     try:
-        from_date= "2025-02-01"
-        to_date = "2025-02-07"
-        dhan = get_dhan_client()
-        # Fetch trade history
-        trade_history_response = dhan.get_trade_history(from_date=from_date, to_date=to_date)
-        trade_history_data = trade_history_response.get("data", [])
+        trade_time, trade_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return trade_time, ObjectId(trade_id)
+    except (ValueError, TypeError, InvalidId):
+        raise ValueError("Invalid cursor")
+
+
+def validate_date(value: Optional[str]) -> Optional[str]:
+    if value is not None:
+        datetime.strptime(value, "%Y-%m-%d")
+    return value
+
 
-        # Fetch trade book
-        trade_book_response = dhan.get_trade_book()
-        trade_book_data = trade_book_response.get("data", [])
+def serialize_trade(trade):
+    trade["_id"] = str(trade["_id"])
+    return trade
+
+
+@router.get("/trade_history")
+async def get_combined_trades(
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    """
+    Trades between two dates (YYYY-MM-DD, inclusive) from the local trade
+    store, newest first, and today's trade book.
+
+    The store is kept up to date by the background trade history sync, so
+    both lists can be up to TRADE_SYNC_INTERVAL_MINUTES old: ``syncedAt``
+    is when the last sync finished and ``syncedThrough`` the last day whose
+    history is complete. Results are paginated with the opaque cursor
+    returned in the X-Next-Cursor header.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        validate_date(date_from)
+        validate_date(date_to)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    try:
+        trade_cursor = trade_repository.find_page(date_from, date_to, after, limit)
+        trade_history_data = await trade_cursor.to_list(length=limit)
+
+        today = datetime.now(ASIA_KOLKATA).strftime("%Y-%m-%d")
+        trade_book_data = await trade_repository.find_page(today, today).to_list(length=None)
+        sync_state = await trade_repository.get_sync_state()
+
+        headers = {}
+        if len(trade_history_data) == limit:
+            headers["X-Next-Cursor"] = encode_cursor(trade_history_data[-1])
 
         # Prepare combined response
         combined_response = {
-            "tradeHistory": trade_history_data,
-            "tradeBook": trade_book_data
+            "tradeHistory": [serialize_trade(trade) for trade in trade_history_data],
+            "tradeBook": [serialize_trade(trade) for trade in trade_book_data],
+            "syncedAt": sync_state["synced_at"],
+            "syncedThrough": sync_state["synced_through"],
         }
 
-        return JSONResponse(combined_response)
+        return JSONResponse(combined_response, headers=headers)
 
     except Exception as e:
         return JSONResponse(
@@ -80,3 +135,11 @@ def get_combined_trades():
             content={"error": f"An error occurred while fetching trades: {str(e)}"}
         )
 
+
+@router.post("/trade_history/sync")
+async def sync_trades():
+    """Sync the local trade store with the broker now."""
+    try:
+        return JSONResponse(await trade_history_sync.sync())
+    except Exception as e:
+        return JSONResponse(status_code=502, content={"error": f"Trade history sync failed: {str(e)}"})
@@ -0,0 +1,24 @@
+import os
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import FileResponse, JSONResponse
+
+from app.core.profiler import profile_store, require_profile_token
+
+# Reports expose code paths and request URLs, so every route needs PROFILE_TOKEN
+router = APIRouter(dependencies=[Depends(require_profile_token)])
+
+
+@router.get("")
+async def list_profiles():
+    """Stored profile reports, newest first."""
+    return profile_store.list()
+
+
+@router.get("/{name}")
+async def download_profile(name: str):
+    """Download a report as collapsed stacks, ready for flamegraph.pl or speedscope."""
+    path = profile_store.path(name, "collapsed")
+    if path is None or not os.path.exists(path):
+        return JSONResponse(content={"error": f"Profile report {name} not found"}, status_code=404)
+    return FileResponse(path, media_type="text/plain", filename=f"{name}.collapsed")
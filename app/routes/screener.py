@@ -1,22 +1,22 @@
-from fastapi import APIRouter
-from fastapi.responses import JSONResponse
-from motor.motor_asyncio import AsyncIOMotorClient
-from datetime import datetime
+import base64
+import json
+from typing import Any, Dict, Optional, Tuple
+
 from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from app.core.config import settings
+from app.models.scanner import ScannerItem
+from app.repositories.stock_repository import test_stock_repository
+from app.services.screener_engine import RSI_ABOVE_60_SCANNER, screener_engine
 
 router = APIRouter()
 
-# MongoDB Configuration
-MONGO_URI = settings.MONGODB_URL
-DB_NAME = "stock_database"
-COLLECTION_NAME = "test_stock_data"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
-# Initialize MongoDB client
-client = AsyncIOMotorClient(MONGO_URI)
-db = client[DB_NAME]
-collection = db[COLLECTION_NAME]
 
 def serialize_stock_data(stock):
     """
@@ -26,25 +26,132 @@ def serialize_stock_data(stock):
     stock["_id"] = str(stock["_id"])  # Convert ObjectId to string
     return stock
 
+
+def encode_cursor(stock: Dict[str, Any]) -> str:
+    """Encode the (date, _id) position of a record as an opaque page cursor."""
+    raw = json.dumps([stock["date"], str(stock["_id"])]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, ObjectId]:
+    """Decode a page cursor back into its (date, _id) position."""
+    try:
+        date, stock_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return date, ObjectId(stock_id)
+    except (ValueError, TypeError, InvalidId):
+        raise ValueError("Invalid cursor")
+
+
+def build_query(
+    date_from: Optional[str],
+    date_to: Optional[str],
+    status: Optional[str],
+    min_change: Optional[float] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_volume: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Build the MongoDB filter for the screener query parameters."""
+    query: Dict[str, Any] = {}
+    # Dates are stored as YYYY-MM-DD strings, so string order is date order
+    date_range = {}
+    if date_from:
+        date_range["$gte"] = date_from
+    if date_to:
+        date_range["$lte"] = date_to
+    if date_range:
+        query["date"] = date_range
+    if status:
+        query["status"] = status
+    # Numeric fields are stored as numbers, so these are index-backed range scans
+    if min_change is not None:
+        query["change"] = {"$gte": min_change}
+    price_range = {}
+    if min_price is not None:
+        price_range["$gte"] = min_price
+    if max_price is not None:
+        price_range["$lte"] = max_price
+    if price_range:
+        query["price"] = price_range
+    if min_volume is not None:
+        query["volume"] = {"$gte": min_volume}
+    return query
+
+
+def build_projection(fields: Optional[str]) -> Optional[Dict[str, int]]:
+    """Build a projection from a comma separated field list, keeping the cursor fields."""
+    if not fields:
+        return None
+    projection = {field.strip(): 1 for field in fields.split(",") if field.strip()}
+    projection["date"] = 1
+    return projection
+
+
+async def stream_ndjson(cursor):
+    """Yield one JSON document per line as the cursor produces them."""
+    async for stock in cursor:
+        yield json.dumps(serialize_stock_data(stock), default=str) + "\n"
+
+
 @router.get("/stocks")
-async def get_stock_screener_data():
+async def get_stock_screener_data(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    status: Optional[str] = None,
+    min_change: Optional[float] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_volume: Optional[float] = None,
+    fields: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
     """
-    Fetch stock screener data from MongoDB, sorted by date.
+    Fetch stock screener data from MongoDB, newest date first.
+
+    Results are paginated with the opaque cursor returned in the
+    X-Next-Cursor header. With format=ndjson the documents are streamed
+    as they are read, and every match is returned unless a limit is set.
     """
     try:
-        # Query MongoDB for all stock data
-        stock_data_cursor = collection.find({})
-        stock_data = await stock_data_cursor.to_list(length=None)
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
 
-        # Serialize and sort the data by date in descending order
-        serialized_data = [serialize_stock_data(stock) for stock in stock_data]
-        sorted_stock_data = sorted(
-            serialized_data,
-            key=lambda x: datetime.strptime(x["date"], "%Y-%m-%d"),
-            reverse=True
-        ) if serialized_data else []
+    try:
+        query = build_query(date_from, date_to, status, min_change, min_price, max_price, min_volume)
+        projection = build_projection(fields)
+
+        if format == "ndjson":
+            stock_cursor = test_stock_repository.find_page(query, after, limit, projection)
+            return StreamingResponse(stream_ndjson(stock_cursor), media_type="application/x-ndjson")
+
+        page_size = limit or DEFAULT_PAGE_SIZE
+        stock_cursor = test_stock_repository.find_page(query, after, page_size, projection)
+        stock_data = await stock_cursor.to_list(length=page_size)
+
+        headers = {}
+        if len(stock_data) == page_size:
+            headers["X-Next-Cursor"] = encode_cursor(stock_data[-1])
 
-        return JSONResponse(content=sorted_stock_data)
+        serialized_data = [serialize_stock_data(stock) for stock in stock_data]
+        return JSONResponse(content=serialized_data, headers=headers)
 
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
+
+
+@router.post("/scan")
+async def run_local_scan(scanner: Optional[ScannerItem] = None):
+    """
+    Run a local scan over the NSE equity universe using the stored bars,
+    RSI(14) > 60 by default. Rows have the same shape as the scraped table.
+    """
+    scanner = scanner or RSI_ABOVE_60_SCANNER
+    if scanner.source != "local":
+        return JSONResponse(content={"error": "Only local scanners can be run here"}, status_code=400)
+    try:
+        return await run_in_threadpool(screener_engine.run, scanner)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
@@ -0,0 +1,261 @@
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.services.test_trade_service import BALANCE
+
+TRADING_DAYS_PER_YEAR = 252
+# Balance kept aside by the live sizing rule, and the balance above which only half is used
+LIVE_RESERVE = 500
+LIVE_HALVING_THRESHOLD = 80000
+
+# Approximate delivery (CNC) charges per side: STT, stamp duty, exchange and SEBI fees
+DEFAULT_BUY_COST_RATE = 0.00118
+DEFAULT_SELL_COST_RATE = 0.00103
+
+
+def load_scans(records: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Build the scan table from scanned stock records (the ``stock_screener.json``
+    / ``test_stock_data`` shape): one row per (date, symbol) with its change.
+    """
+    scans = pd.DataFrame.from_records(list(records), columns=["date", "symbol", "change"])
+    scans["date"] = pd.to_datetime(scans["date"])
+    scans["change"] = pd.to_numeric(scans["change"], errors="coerce")
+    return scans.dropna().drop_duplicates(["date", "symbol"])
+
+
+def load_scans_file(path: str = "stock_screener.json") -> pd.DataFrame:
+    with open(path, "r") as file:
+        return load_scans(json.load(file))
+
+
+def bars_from_download(frame: pd.DataFrame, suffix: str = ".NS") -> pd.DataFrame:
+    """
+    Convert a grouped-by-ticker ``yf.download`` frame into the long bar table
+    used by the backtest: one row per (symbol, date) with open and close.
+    """
+    if not isinstance(frame.columns, pd.MultiIndex):
+        raise ValueError("Expected bars grouped by ticker")
+    bars = frame.stack(level=0, future_stack=True)[["Open", "Close"]].dropna()
+    bars.index.names = ["date", "symbol"]
+    bars = bars.reset_index().rename(columns={"Open": "open", "Close": "close"})
+    bars["symbol"] = bars["symbol"].str.removesuffix(suffix)
+    bars["date"] = pd.to_datetime(bars["date"]).dt.tz_localize(None).dt.normalize()
+    return bars
+
+
+def pick_entries(scans: pd.DataFrame, basket_size: int, min_change: float) -> pd.DataFrame:
+    """The ``basket_size`` highest-change scanned stocks of every day, as the 15:13 job picks them."""
+    picks = scans[scans["change"] >= min_change].sort_values(["date", "change"], ascending=[True, False])
+    return picks[picks.groupby("date").cumcount() < basket_size]
+
+
+def prepare_bars(bars: pd.DataFrame) -> pd.DataFrame:
+    """
+    Index the long bar table by (symbol, date) with the entry and exit
+    price of a trade entered on that bar.
+
+    With daily bars the 15:16 buy is taken at the scan day's close and the
+    09:16 sell at the next trading day's open. Preparing the bars once lets
+    every run of a sweep share the lookup index.
+    """
+    if "exit_price" in bars.columns:
+        return bars
+    bars = bars.sort_values(["symbol", "date"])
+    next_bar = bars.groupby("symbol", sort=False)[["date", "open"]].shift(-1)
+    prepared = pd.DataFrame(
+        {
+            "entry_price": bars["close"].to_numpy(),
+            "exit_date": next_bar["date"].to_numpy(),
+            "exit_price": next_bar["open"].to_numpy(),
+        },
+        index=pd.MultiIndex.from_arrays([bars["symbol"], bars["date"]]),
+    )
+    return prepared.dropna()
+
+
+def attach_prices(picks: pd.DataFrame, prepared_bars: pd.DataFrame) -> pd.DataFrame:
+    """Attach entry and exit prices to every pick, dropping picks without both bars."""
+    keys = pd.MultiIndex.from_arrays([picks["symbol"], picks["date"]])
+    prices = prepared_bars.reindex(keys)
+    trades = picks.reset_index(drop=True)
+    for column in prices.columns:
+        trades[column] = prices[column].to_numpy()
+    return trades.dropna(subset=["entry_price", "exit_price"])
+
+
+def fixed_budgets(trades: pd.DataFrame, balance: float) -> np.ndarray:
+    """Test trading sizing: the same balance every day, split evenly across the day's basket."""
+    basket = trades.groupby("date")["symbol"].transform("size").to_numpy()
+    return balance / basket
+
+
+def live_balance(equity):
+    """The live sizing rule applied to an available balance (scalar or array)."""
+    balance = np.asarray(equity, dtype=float) - LIVE_RESERVE
+    return np.where(balance > LIVE_HALVING_THRESHOLD, balance / 2, balance)
+
+
+def compounding_equity(
+    day_codes: np.ndarray,
+    entry: np.ndarray,
+    exit: np.ndarray,
+    basket: np.ndarray,
+    initial: float,
+    buy_cost_rate: float,
+    sell_cost_rate: float,
+):
+    """
+    Quantities and start-of-day equity when each day is sized from the
+    balance left by the previous one.
+
+    Integer quantities and the halving rule make each day depend on the
+    previous day's result, so this is a recurrence over trading days; every
+    per-trade quantity within a day is still computed as one array operation.
+    """
+    n_days = int(day_codes.max()) + 1 if len(day_codes) else 0
+    starts = np.searchsorted(day_codes, np.arange(n_days + 1))
+    quantity = np.zeros(len(entry))
+    equity = np.empty(n_days)
+    cash = float(initial)
+    for day in range(n_days):
+        lo, hi = starts[day], starts[day + 1]
+        equity[day] = cash
+        budget = max(float(live_balance(cash)), 0.0) / basket[lo]
+        q = np.floor(budget / entry[lo:hi])
+        quantity[lo:hi] = q
+        cash += float(np.sum(q * (exit[lo:hi] * (1 - sell_cost_rate) - entry[lo:hi] * (1 + buy_cost_rate))))
+    return quantity, equity
+
+
+def summarize(equity: pd.Series, trades: pd.DataFrame, initial: float) -> Dict[str, Any]:
+    """
+    Summary metrics of an equity curve. Daily returns are each day's P&L
+    over the equity it started with; a loss larger than that equity counts
+    as -100%, as does the drawdown.
+    """
+    if equity.empty:
+        return {"trades": 0, "final_equity": initial, "total_return": 0.0}
+    prior = equity.shift(1).fillna(initial)
+    daily_returns = ((equity - prior) / prior).clip(lower=-1.0)
+    drawdown = np.maximum(equity / np.maximum.accumulate(np.maximum(equity.to_numpy(), initial)) - 1, -1.0)
+    years = max((equity.index[-1] - equity.index[0]).days / 365.25, 1 / TRADING_DAYS_PER_YEAR)
+    std = daily_returns.std()
+    return {
+        "trades": int(len(trades)),
+        "win_rate": float((trades["pnl"] > 0).mean()),
+        "final_equity": float(equity.iloc[-1]),
+        "total_return": float(equity.iloc[-1] / initial - 1),
+        "cagr": float((equity.iloc[-1] / initial) ** (1 / years) - 1) if equity.iloc[-1] > 0 else -1.0,
+        "max_drawdown": float(drawdown.min()),
+        "sharpe": float(daily_returns.mean() / std * np.sqrt(TRADING_DAYS_PER_YEAR)) if std > 0 else 0.0,
+        "ruined": bool(equity.iloc[-1] <= 0),
+    }
+
+
+def stop_at_ruin(trades: pd.DataFrame, initial: float) -> pd.DataFrame:
+    """Drop the trades entered once the equity is used up; nothing is left to size them from."""
+    equity = initial + trades.groupby("exit_date")["pnl"].sum().cumsum()
+    ruined = equity[equity <= 0]
+    if ruined.empty:
+        return trades
+    return trades[trades["date"] < ruined.index[0]]
+
+
+def run_backtest(
+    scans: pd.DataFrame,
+    bars: pd.DataFrame,
+    basket_size: int = 1,
+    min_change: float = float("-inf"),
+    sizing: str = "fixed",
+    initial_balance: float = BALANCE,
+    buy_cost_rate: float = DEFAULT_BUY_COST_RATE,
+    sell_cost_rate: float = DEFAULT_SELL_COST_RATE,
+) -> Dict[str, Any]:
+    """
+    Backtest the scan-then-trade strategy: buy the top scanned stocks at
+    15:16 and sell them at 09:16 on the next trading day.
+
+    :param scans: Scan table from :func:`load_scans`.
+    :param bars: Long daily bar table (symbol, date, open, close), or the
+        output of :func:`prepare_bars`.
+    :param sizing: "fixed" sizes every day from ``initial_balance`` like test
+        trading; "live" sizes from the running equity with the live
+        reserve and halving rule. Either way no trade is entered once the
+        equity is used up.
+    :return: The trades, the equity curve (by exit date) and summary metrics.
+    """
+    trades = attach_prices(pick_entries(scans, basket_size, min_change), prepare_bars(bars))
+    trades = trades.sort_values(["date", "change"], ascending=[True, False]).reset_index(drop=True)
+    entry = trades["entry_price"].to_numpy(dtype=float)
+    exit = trades["exit_price"].to_numpy(dtype=float)
+
+    if sizing == "fixed":
+        quantity = np.floor(fixed_budgets(trades, initial_balance) / entry)
+    elif sizing == "live":
+        day_codes = trades["date"].factorize(sort=True)[0]
+        basket = trades.groupby("date")["symbol"].transform("size").to_numpy()
+        quantity, _ = compounding_equity(
+            day_codes, entry, exit, basket, initial_balance, buy_cost_rate, sell_cost_rate
+        )
+    else:
+        raise ValueError(f"Unknown sizing: {sizing}")
+
+    costs = quantity * (entry * buy_cost_rate + exit * sell_cost_rate)
+    trades["quantity"] = quantity.astype(int)
+    trades["costs"] = costs
+    trades["pnl"] = quantity * (exit - entry) - costs
+    trades = stop_at_ruin(trades[trades["quantity"] > 0], initial_balance)
+
+    daily_pnl = trades.groupby("exit_date")["pnl"].sum()
+    equity = initial_balance + daily_pnl.cumsum()
+    equity.name = "equity"
+    return {"trades": trades, "equity": equity, "summary": summarize(equity, trades, initial_balance)}
+
+
+# Per-process copies of the sweep inputs, sent once per worker rather than once per task
+_sweep_scans: Optional[pd.DataFrame] = None
+_sweep_bars: Optional[pd.DataFrame] = None
+
+
+def _init_sweep_worker(scans: pd.DataFrame, bars: pd.DataFrame) -> None:
+    global _sweep_scans, _sweep_bars
+    _sweep_scans, _sweep_bars = scans, bars
+
+
+def _run_sweep_task(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {**params, **run_backtest(_sweep_scans, _sweep_bars, **params)["summary"]}
+
+
+def parameter_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+def run_sweep(
+    scans: pd.DataFrame,
+    bars: pd.DataFrame,
+    grid: Dict[str, List[Any]],
+    max_workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Run a backtest for every combination of the parameter grid on a process
+    pool and return one row of parameters and summary metrics per run.
+
+    :param grid: Lists of values by :func:`run_backtest` keyword, e.g.
+        ``{"basket_size": [1, 2, 3], "min_change": [0, 2, 4]}``.
+    """
+    params = parameter_grid(grid)
+    bars = prepare_bars(bars)
+    max_workers = max_workers or min(len(params), os.cpu_count() or 1)
+    if max_workers <= 1:
+        _init_sweep_worker(scans, bars)
+        return pd.DataFrame([_run_sweep_task(p) for p in params])
+    with ProcessPoolExecutor(max_workers, initializer=_init_sweep_worker, initargs=(scans, bars)) as executor:
+        return pd.DataFrame(list(executor.map(_run_sweep_task, params)))
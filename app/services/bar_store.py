@@ -0,0 +1,288 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.services import quote_cache
+from app.services.quote_cache import INTRADAY_INTERVALS
+
+BAR_DTYPE = np.dtype(
+    [("ts", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"), ("volume", "<f8")]
+)
+COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "volume": "Volume"}
+DISPLAY_TIMEZONE = "Asia/Kolkata"
+# Sessions are split into days on the exchange's local date
+SESSION_OFFSET_NS = int(timedelta(hours=5, minutes=30).total_seconds() * 1e9)
+DAY_NS = 86400 * 10**9
+
+# How far back the first fetch of a symbol goes; yfinance serves 1m bars for about a week
+INITIAL_LOOKBACK = {"intraday": timedelta(days=5), "daily": timedelta(days=365)}
+PERIOD_PATTERN = re.compile(r"^(\d+)(d|wk|mo|y)$")
+
+Key = Tuple[str, str]
+
+
+def period_to_timedelta(period: str) -> Optional[timedelta]:
+    """Approximate length of a yfinance period string such as "5d", "1mo" or "2y"."""
+    match = PERIOD_PATTERN.match(period)
+    if not match:
+        return None
+    count, unit = int(match.group(1)), match.group(2)
+    return timedelta(days=count * {"d": 1, "wk": 7, "mo": 31, "y": 366}[unit])
+
+
+def frame_to_records(frame: Optional[pd.DataFrame]) -> np.ndarray:
+    """Convert a yfinance OHLCV frame into bar records, skipping bars without a close."""
+    if frame is None or frame.empty:
+        return np.empty(0, dtype=BAR_DTYPE)
+    frame = frame.dropna(subset=["Close"])
+    index = pd.DatetimeIndex(frame.index)
+    index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+    records = np.empty(len(frame), dtype=BAR_DTYPE)
+    records["ts"] = index.as_unit("ns").asi8
+    for field, column in COLUMNS.items():
+        records[field] = frame[column].to_numpy(dtype=float) if column in frame else np.nan
+    return records
+
+
+def records_to_frame(records: np.ndarray) -> pd.DataFrame:
+    """Convert bar records back into the yfinance frame shape."""
+    index = pd.DatetimeIndex(records["ts"].astype("datetime64[ns]"), tz="UTC").tz_convert(DISPLAY_TIMEZONE)
+    return pd.DataFrame({column: records[field] for field, column in COLUMNS.items()}, index=index)
+
+
+def _dedupe(records: np.ndarray) -> np.ndarray:
+    """Keep the last version of every bar; later segments rewrite the still-open last bar."""
+    ts = records["ts"]
+    if len(ts) < 2:
+        return records
+    keep = np.append(ts[1:] != ts[:-1], True)
+    return records if keep.all() else records[keep]
+
+
+class BarStore:
+    """
+    On-disk OHLCV bar store keyed by (symbol, interval).
+
+    Every key is a directory of immutable, time-ordered segment files of
+    fixed-width records, memory-mapped on first use. A refresh only fetches
+    the range after the last stored bar and writes it as a new segment; the
+    last stored bar is refetched too, since it may still have been open.
+    Compaction merges the segments of a key into one, after which range
+    reads are zero-copy views of the mapped file.
+    """
+
+    def __init__(self, root: str, max_segments: int):
+        self.root = root
+        self.max_segments = max_segments
+        self._segments: Dict[Key, List[Tuple[int, np.ndarray]]] = {}
+        self._refreshed_at: Dict[Key, float] = {}
+        self._locks: Dict[Key, threading.RLock] = defaultdict(threading.RLock)
+        self._locks_lock = threading.Lock()
+
+    def _key_dir(self, key: Key) -> str:
+        symbol, interval = key
+        return os.path.join(self.root, interval, symbol)
+
+    def _lock(self, key: Key) -> threading.RLock:
+        with self._locks_lock:
+            return self._locks[key]
+
+    def _load(self, key: Key) -> List[Tuple[int, np.ndarray]]:
+        segments = self._segments.get(key)
+        if segments is None:
+            segments = []
+            directory = self._key_dir(key)
+            if os.path.isdir(directory):
+                for name in sorted(os.listdir(directory)):
+                    if name.endswith(".npy"):
+                        path = os.path.join(directory, name)
+                        segments.append((int(name[:-4]), np.load(path, mmap_mode="r")))
+            self._segments[key] = segments
+        return segments
+
+    def _write_segment(self, key: Key, seq: int, records: np.ndarray) -> np.ndarray:
+        directory = self._key_dir(key)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{seq:08d}.npy")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as file:
+            np.save(file, records)
+        os.replace(tmp_path, path)
+        return np.load(path, mmap_mode="r")
+
+    def last_timestamp(self, symbol: str, interval: str) -> Optional[int]:
+        segments = self._load((symbol, interval))
+        return int(segments[-1][1]["ts"][-1]) if segments else None
+
+    def append(self, symbol: str, interval: str, records: np.ndarray) -> int:
+        """Store the bars from the last stored bar onwards as a new segment; return how many."""
+        key = (symbol, interval)
+        with self._lock(key):
+            segments = self._load(key)
+            if segments:
+                last = segments[-1][1][-1]
+                records = records[records["ts"] >= last["ts"]]
+                if len(records) == 1 and records[0].tobytes() == last.tobytes():
+                    return 0
+            if not len(records):
+                return 0
+            records = _dedupe(np.sort(records, order="ts"))
+            seq = segments[-1][0] + 1 if segments else 0
+            segments.append((seq, self._write_segment(key, seq, records)))
+            if len(segments) > self.max_segments:
+                self._compact(key)
+            return len(records)
+
+    def _compact(self, key: Key) -> None:
+        segments = self._load(key)
+        if len(segments) < 2:
+            return
+        merged = _dedupe(np.concatenate([records for _, records in segments]))
+        seq = segments[-1][0] + 1
+        self._segments[key] = [(seq, self._write_segment(key, seq, merged))]
+        # Readers holding the old maps keep them valid until they drop them
+        for old_seq, _ in segments:
+            os.remove(os.path.join(self._key_dir(key), f"{old_seq:08d}.npy"))
+
+    def compact(self) -> int:
+        """Merge the segments of every stored key; return how many keys were compacted."""
+        compacted = 0
+        if not os.path.isdir(self.root):
+            return 0
+        for interval in os.listdir(self.root):
+            for symbol in os.listdir(os.path.join(self.root, interval)):
+                key = (symbol, interval)
+                with self._lock(key):
+                    if len(self._load(key)) > 1:
+                        self._compact(key)
+                        compacted += 1
+        return compacted
+
+    def read(self, symbol: str, interval: str, start: Optional[int] = None, end: Optional[int] = None) -> np.ndarray:
+        """
+        Return the bars with start <= ts < end (nanoseconds since the epoch, UTC).
+
+        For a compacted key the result is a read-only view of the mapped file.
+        """
+        segments = list(self._load((symbol, interval)))
+        if not segments:
+            return np.empty(0, dtype=BAR_DTYPE)
+        records = segments[0][1] if len(segments) == 1 else _dedupe(np.concatenate([r for _, r in segments]))
+        ts = records["ts"]
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side="left"))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side="left"))
+        return records[lo:hi]
+
+    def read_period(self, symbol: str, interval: str, period: str) -> np.ndarray:
+        """
+        Return the bars of the last ``period`` as yfinance would: "Nd" is the
+        last N sessions stored, longer periods count back from the last bar.
+        """
+        records = self.read(symbol, interval)
+        if not len(records) or period == "max":
+            return records
+        ts = records["ts"]
+        match = PERIOD_PATTERN.match(period)
+        if match and match.group(2) == "d":
+            # Step back one session at a time with binary searches instead of scanning every bar
+            lo = len(ts)
+            for _ in range(int(match.group(1))):
+                if lo == 0:
+                    break
+                day_start = (int(ts[lo - 1]) + SESSION_OFFSET_NS) // DAY_NS * DAY_NS - SESSION_OFFSET_NS
+                lo = int(np.searchsorted(ts, day_start, side="left"))
+            return records[lo:]
+        length = period_to_timedelta(period)
+        if length is None:
+            raise ValueError(f"Unsupported period: {period}")
+        start = ts[-1] - int(length.total_seconds() * 1e9)
+        return records[int(np.searchsorted(ts, start, side="left")) :]
+
+    def _ttl(self, interval: str) -> float:
+        return settings.QUOTE_TTL_SECONDS if interval in INTRADAY_INTERVALS else settings.DAILY_BAR_TTL_SECONDS
+
+    def _fetch_start(self, key: Key, period: str) -> datetime:
+        last = self.last_timestamp(*key)
+        if last is not None:
+            return datetime.fromtimestamp(last / 1e9, tz=timezone.utc)
+        lookback = INITIAL_LOOKBACK["intraday" if key[1] in INTRADAY_INTERVALS else "daily"]
+        if key[1] not in INTRADAY_INTERVALS:
+            lookback = max(lookback, period_to_timedelta(period) or lookback)
+        return datetime.now(timezone.utc) - lookback
+
+    def _is_fresh(self, key: Key) -> bool:
+        refreshed_at = self._refreshed_at.get(key)
+        return refreshed_at is not None and time.monotonic() - refreshed_at < self._ttl(key[1])
+
+    def _mark_fresh(self, key: Key) -> None:
+        self._refreshed_at[key] = time.monotonic()
+
+    def _refresh(self, key: Key, period: str) -> None:
+        symbol, interval = key
+        try:
+            frame = quote_cache.provider.history_since(symbol, self._fetch_start(key, period), interval)
+            self.append(symbol, interval, frame_to_records(frame))
+            self._mark_fresh(key)
+        except Exception as e:
+            if self.last_timestamp(symbol, interval) is None:
+                raise
+            logging.warning(f"Serving stored bars for {symbol} {interval}, refresh failed: {e}")
+
+    def get_history(self, symbol: str, period: str, interval: str = "1d") -> pd.DataFrame:
+        """
+        Return price history for a symbol from the store, first fetching the
+        bars missing since the last refresh once the interval's TTL expired.
+
+        When the fetch fails, the stored bars are served if there are any.
+        """
+        key = (symbol, interval)
+        if not self._is_fresh(key):
+            # Held across the fetch so concurrent callers share one refresh
+            with self._lock(key):
+                if not self._is_fresh(key):
+                    self._refresh(key, period)
+        return records_to_frame(self.read_period(symbol, interval, period))
+
+    def get_batch_history(self, symbols: List[str], period: str, interval: str = "1d") -> Dict[str, pd.DataFrame]:
+        """
+        Return price history for several symbols from the store. Stale symbols
+        are refreshed together in one batched download starting at the
+        oldest of their last stored bars.
+        """
+        symbols = sorted(set(symbols))
+        stale = [symbol for symbol in symbols if not self._is_fresh((symbol, interval))]
+        if stale:
+            start = min(self._fetch_start((symbol, interval), period) for symbol in stale)
+            try:
+                data = quote_cache.provider.download_since(stale, start, interval)
+                for symbol in stale:
+                    if isinstance(data.columns, pd.MultiIndex):
+                        frame = data[symbol] if symbol in data.columns.get_level_values(0) else None
+                    else:
+                        frame = data if len(stale) == 1 else None
+                    self.append(symbol, interval, frame_to_records(frame))
+                    self._mark_fresh((symbol, interval))
+            except Exception as e:
+                if any(self.last_timestamp(symbol, interval) is None for symbol in stale):
+                    raise
+                logging.warning(f"Serving stored bars for {len(stale)} symbols, refresh failed: {e}")
+        return {symbol: records_to_frame(self.read_period(symbol, interval, period)) for symbol in symbols}
+
+
+bar_store = BarStore(settings.BAR_STORE_DIR, max_segments=settings.BAR_STORE_MAX_SEGMENTS)
+
+
+async def compact_bar_store() -> None:
+    started_at = time.perf_counter()
+    compacted = await run_in_threadpool(bar_store.compact)
+    logging.info(f"Compacted {compacted} bar series in {time.perf_counter() - started_at:.2f}s")
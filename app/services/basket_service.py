@@ -0,0 +1,332 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.repositories.stock_repository import StockRepository
+from app.services.market_feed import market_feed
+from app.utils.helper_function import get_current_price
+
+# Order statuses reported by Dhan that end an order
+FILLED_STATUS = "TRADED"
+FAILED_STATUSES = {"REJECTED", "CANCELLED", "EXPIRED"}
+
+
+class OrderResult:
+    """Outcome of one order of a basket."""
+
+    __slots__ = ("stock", "payload", "order_id", "order_status", "fill_price", "submitted_at", "filled_at", "error")
+
+    def __init__(self, stock: Dict[str, Any], payload: Dict[str, Any]):
+        self.stock = stock
+        self.payload = payload
+        self.order_id: Optional[str] = None
+        # Last status the broker reported for the order
+        self.order_status: Optional[str] = None
+        self.fill_price: Optional[float] = None
+        self.submitted_at: Optional[float] = None
+        self.filled_at: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def filled(self) -> bool:
+        return self.filled_at is not None
+
+    @property
+    def pending(self) -> bool:
+        """Submitted, but neither filled nor ended by the broker yet."""
+        return self.order_id is not None and not self.filled and self.order_status not in FAILED_STATUSES
+
+    @property
+    def latency_ms(self) -> Optional[float]:
+        """Time from order submission to confirmed fill."""
+        if self.submitted_at is None or self.filled_at is None:
+            return None
+        return round((self.filled_at - self.submitted_at) * 1000, 3)
+
+
+class OrderNotFilled(Exception):
+    """Raised by :meth:`OrderPlacer.confirm` when an order ended unfilled or did not fill in time."""
+
+    def __init__(self, message: str, status: Optional[str]):
+        super().__init__(message)
+        self.status = status
+
+
+class OrderPlacer(ABC):
+    """
+    How a basket places its orders; live and test trading each provide one.
+
+    :meth:`submit` returns the order id and raises on failure.
+    :meth:`order_status` reports where an order stands, which :meth:`confirm`
+    polls until the order fills.
+    """
+
+    @abstractmethod
+    async def available_balance(self) -> float:
+        """Funds available to split over a buy basket."""
+
+    @abstractmethod
+    async def sell_price(self, stock: Dict[str, Any]) -> float:
+        """Limit price to sell ``stock`` at, 0 for a market order."""
+
+    @abstractmethod
+    def create_payload(self, stock: Dict[str, Any], quantity: int, price: float, action: str) -> Dict[str, Any]:
+        """Order payload for ``submit``."""
+
+    @abstractmethod
+    async def submit(self, payload: Dict[str, Any]) -> str:
+        """Place the order and return its id."""
+
+    @abstractmethod
+    async def order_status(self, order_id: str) -> Tuple[str, Optional[float]]:
+        """The broker's status of an order, e.g. "TRADED", and its average fill price."""
+
+    async def confirm(self, order_id: str, timeout: Optional[float] = None) -> float:
+        """
+        Wait for an order to fill and return its fill price.
+
+        :param timeout: Seconds to wait, defaults to ORDER_CONFIRM_TIMEOUT_SECONDS.
+        :raises OrderNotFilled: When the order was rejected or cancelled, or is
+            still open after ``timeout`` seconds.
+        """
+        timeout = settings.ORDER_CONFIRM_TIMEOUT_SECONDS if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        status = None
+        while True:
+            try:
+                status, price = await self.order_status(order_id)
+            except Exception as e:
+                # Keep polling, the order itself may well fill
+                logging.warning(f"Failed to read the status of order {order_id}: {e}")
+            else:
+                if status == FILLED_STATUS:
+                    return price
+                if status in FAILED_STATUSES:
+                    raise OrderNotFilled(f"Order {order_id} {status.lower()}", status)
+            if time.monotonic() >= deadline:
+                raise OrderNotFilled(f"Order {order_id} still {status or 'unknown'} after {timeout}s", status)
+            await asyncio.sleep(settings.ORDER_CONFIRM_POLL_SECONDS)
+
+
+def serialize_document(doc):
+    """
+    Serialize a MongoDB document to ensure JSON compatibility.
+    Converts ObjectId to string.
+    """
+    if "_id" in doc:
+        doc["_id"] = str(doc["_id"])
+    return doc
+
+
+async def fetch_price(stock: Dict[str, Any]) -> float:
+    """
+    Return the current price of a stock from the market feed's last-tick
+    table, falling back to Yahoo Finance without a fresh tick.
+    """
+    price = market_feed.last_price(stock.get("security_id"))
+    if price is not None:
+        return price
+    return float(await run_in_threadpool(get_current_price, stock["symbol"]))
+
+
+async def watch_held_stocks(*repositories: StockRepository) -> None:
+    """Subscribe the market feed to every stock still held, so sells have live prices."""
+    for repository in repositories:
+        market_feed.watch(stock.get("security_id") for stock in await repository.find_all_bought())
+
+
+async def _execute_order(result: OrderResult, placer: OrderPlacer, semaphore: asyncio.Semaphore) -> OrderResult:
+    async with semaphore:
+        try:
+            result.submitted_at = time.perf_counter()
+            result.order_id = await placer.submit(result.payload)
+        except Exception as e:
+            result.error = str(e)
+            logging.error(f"Order for {result.stock.get('symbol')} failed: {e}")
+            return result
+        try:
+            result.fill_price = await placer.confirm(result.order_id)
+            result.order_status = FILLED_STATUS
+            result.filled_at = time.perf_counter()
+        except OrderNotFilled as e:
+            result.order_status = e.status
+            result.error = str(e)
+            logging.error(f"Order {result.order_id} for {result.stock.get('symbol')} not filled: {e}")
+        except Exception as e:
+            result.error = str(e)
+            logging.error(f"Failed to confirm order {result.order_id} for {result.stock.get('symbol')}: {e}")
+    return result
+
+
+async def prepare_buy(repository: StockRepository, placer: OrderPlacer, basket_size: int) -> List[OrderResult]:
+    """Size buy orders for the top scanned stocks of the day, splitting the balance evenly."""
+    today_date = datetime.now().strftime("%Y-%m-%d")
+    stocks = [serialize_document(stock) for stock in await repository.find_top_scanned(today_date, basket_size)]
+    if not stocks:
+        logging.warning("No stock data available for today.")
+        return []
+
+    # One fund read sizes the whole basket, split evenly between its stocks
+    balance, prices = await asyncio.gather(
+        placer.available_balance(),
+        asyncio.gather(*[fetch_price(stock) for stock in stocks]),
+    )
+    budget = balance / len(stocks)
+
+    orders = []
+    for stock, price in zip(stocks, prices):
+        quantity = int(budget / price)
+        if quantity <= 0:
+            logging.warning(f"Budget {budget:.2f} too small to buy {stock['symbol']} at {price}")
+            continue
+        orders.append(OrderResult(stock, placer.create_payload(stock, quantity, price, "buy")))
+    return orders
+
+
+async def prepare_sell(repository: StockRepository, placer: OrderPlacer) -> List[OrderResult]:
+    """Create sell orders for every held stock, after settling the orders left pending."""
+    settled = await reconcile_pending(repository, placer)
+    if settled:
+        logging.info(f"Settled {settled} pending order(s) before selling.")
+    stocks = [serialize_document(stock) for stock in await repository.find_all_bought()]
+    if not stocks:
+        logging.warning("No stocks to sell.")
+        return []
+
+    prices = await asyncio.gather(*[placer.sell_price(stock) for stock in stocks])
+    return [
+        OrderResult(stock, placer.create_payload(stock, stock["quantity"], price, "sell"))
+        for stock, price in zip(stocks, prices)
+    ]
+
+
+def _update_fields(result: OrderResult, action: str) -> Dict[str, Any]:
+    """Fields to store for a submitted order: filled, still pending, or ended unfilled."""
+    if result.pending:
+        # Settled by reconcile_pending once the broker knows the outcome
+        return {
+            "status": "pending",
+            "pending_action": action,
+            "quantity": result.payload["quantity"],
+            f"{action}_order_id": result.order_id,
+            f"{action}_order_status": result.order_status,
+        }
+    if not result.filled:
+        return {
+            "status": "scanned" if action == "buy" else "bought",
+            "pending_action": None,
+            f"{action}_order_id": result.order_id,
+            f"{action}_order_status": result.order_status,
+        }
+    stock_status = "bought" if action == "buy" else "sold"
+    return {
+        "status": stock_status,
+        "pending_action": None,
+        "quantity": result.payload["quantity"],
+        "state": "active" if stock_status == "bought" else "inactive",
+        f"{action}_price": result.fill_price,
+        f"{action}_order_id": result.order_id,
+        f"{action}_order_status": result.order_status,
+        f"{action}_latency_ms": result.latency_ms,
+    }
+
+
+async def reconcile_pending(repository: StockRepository, placer: OrderPlacer) -> int:
+    """
+    Settle the orders earlier baskets stored as pending: filled orders
+    become held or sold stocks, orders the broker ended unfilled go back to
+    their previous status, and open orders stay pending.
+
+    :return: Number of records settled.
+    """
+    updates = {}
+    for stock in await repository.find_pending():
+        action = stock["pending_action"]
+        result = OrderResult(stock, {"quantity": stock["quantity"]})
+        result.order_id = stock[f"{action}_order_id"]
+        try:
+            result.order_status, price = await placer.order_status(result.order_id)
+        except Exception as e:
+            logging.error(f"Failed to reconcile order {result.order_id} of {stock.get('symbol')}: {e}")
+            continue
+        if result.order_status == FILLED_STATUS:
+            result.fill_price = price
+            result.filled_at = time.perf_counter()
+        elif result.order_status not in FAILED_STATUSES:
+            continue
+        updates[stock["id"]] = _update_fields(result, action)
+        logging.info(f"Reconciled {action} order {result.order_id} of {stock.get('symbol')}: {result.order_status}")
+    if updates:
+        await repository.bulk_update_by_id(updates)
+    return len(updates)
+
+
+async def execute_basket(
+    action: str,
+    repository: StockRepository,
+    placer: OrderPlacer,
+    basket_size: int = settings.BASKET_SIZE,
+    max_parallel: int = settings.BASKET_MAX_PARALLEL_ORDERS,
+) -> List[OrderResult]:
+    """
+    Buy the top scanned stocks of the day or sell every held stock as one basket.
+
+    Orders are placed and confirmed concurrently, at most ``max_parallel``
+    at a time, and the status of every submitted order is stored with a
+    single bulk write.
+
+    :param action: "buy" or "sell".
+    :return: The result of every order of the basket.
+    """
+    if action == "buy":
+        orders = await prepare_buy(repository, placer, basket_size)
+    elif action == "sell":
+        orders = await prepare_sell(repository, placer)
+    else:
+        logging.error(f"Invalid action: {action}")
+        return []
+    return await place_basket(action, repository, placer, orders, max_parallel)
+
+
+async def place_basket(
+    action: str,
+    repository: StockRepository,
+    placer: OrderPlacer,
+    orders: List[OrderResult],
+    max_parallel: int = settings.BASKET_MAX_PARALLEL_ORDERS,
+) -> List[OrderResult]:
+    """
+    Place and confirm prepared orders concurrently, at most ``max_parallel``
+    at a time, and store the status of every submitted order with a single
+    bulk write. Orders that did not fill in time are stored as pending.
+    """
+    if not orders:
+        return []
+
+    semaphore = asyncio.Semaphore(max_parallel)
+    started_at = time.perf_counter()
+    results = await asyncio.gather(*[_execute_order(order, placer, semaphore) for order in orders])
+    basket_ms = round((time.perf_counter() - started_at) * 1000, 3)
+
+    # Every order the broker accepted is stored, so that a position is never left untracked
+    updates = {result.stock["id"]: _update_fields(result, action) for result in results if result.order_id is not None}
+    if updates:
+        await repository.bulk_update_by_id(updates)
+
+    filled = [result for result in results if result.filled]
+    for result in filled:
+        logging.info(
+            f"Order executed: {result.order_id} {action} {result.payload['quantity']} "
+            f"{result.stock['symbol']} @ {result.fill_price} in {result.latency_ms} ms"
+        )
+    pending = sum(1 for result in results if result.pending)
+    logging.info(
+        f"Basket {action}: {len(filled)}/{len(results)} orders filled, {pending} pending in {basket_ms} ms"
+    )
+    return results
@@ -0,0 +1,175 @@
+import html
+import logging
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import httpx
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import timed
+
+CSRF_TOKEN_PATTERN = re.compile(r'<meta\s+name="csrf-token"\s+content="([^"]+)"')
+SCAN_CLAUSE_PATTERNS = (
+    re.compile(r'<textarea[^>]*name="scan_clause"[^>]*>(.*?)</textarea>', re.S),
+    re.compile(r'<input[^>]*name="scan_clause"[^>]*value="([^"]*)"'),
+    re.compile(r'&quot;scan_clause&quot;\s*:\s*&quot;(.*?)&quot;'),
+    re.compile(r'"scan_clause"\s*:\s*"((?:[^"\\]|\\.)*)"'),
+)
+PROCESS_PATH = "/screener/process"
+
+
+def format_indian_number(value: Any) -> str:
+    """Format an integer with Indian digit grouping, e.g. 694683 -> "6,94,683"."""
+    digits = str(int(float(value)))
+    sign = ""
+    if digits.startswith("-"):
+        sign, digits = "-", digits[1:]
+    if len(digits) <= 3:
+        return sign + digits
+    head, tail = digits[:-3], digits[-3:]
+    groups = []
+    while len(head) > 2:
+        groups.insert(0, head[-2:])
+        head = head[:-2]
+    if head:
+        groups.insert(0, head)
+    return sign + ",".join(groups + [tail])
+
+
+def to_table_row(record: Dict[str, Any]) -> Dict[str, str]:
+    """Map a Chartink JSON record to the row dict the rendered table produces."""
+    return {
+        "Sr.": str(record.get("sr", "")),
+        "Stock Name": record.get("name", ""),
+        "Symbol": record.get("nsecode", ""),
+        "Links": "",
+        "% Chg": f"{float(record.get('per_chg', 0)):.2f}%",
+        "Price": f"{float(record.get('close', 0)):.2f}",
+        "Volume": format_indian_number(record.get("volume", 0)),
+    }
+
+
+class SeleniumFetchBackend:
+    """Render the page in a pooled headless browser and read the table."""
+
+    name = "selenium"
+
+    def supports(self, url: str) -> bool:
+        return True
+
+    async def fetch_table(self, url: str, table_id: str) -> List[Dict[str, str]]:
+        # Imported here because the scrape route itself dispatches through this module
+        from app.routes.scrape_table import scrape_table_to_json
+
+        return await run_in_threadpool(scrape_table_to_json, url, table_id)
+
+
+class ChartinkHttpFetchBackend:
+    """
+    Fetch Chartink screener results straight from its JSON endpoint.
+
+    The screener page is requested once per URL to pick up the session
+    cookie, the CSRF token and the scan clause. Later fetches are a single
+    POST on a pooled connection, and the session is refreshed when the
+    token expires.
+    """
+
+    name = "http"
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+        self._csrf_tokens: Dict[str, str] = {}
+        self._scan_clauses: Dict[str, str] = {}
+
+    def supports(self, url: str) -> bool:
+        return "/screener/" in urlparse(url).path
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": "Mozilla/5.0 (X11; Linux x86_64)"},
+                limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @timed("chartink", "load_session")
+    async def _load_session(self, url: str) -> None:
+        """Fetch the screener page to set cookies and read the CSRF token and scan clause."""
+        response = await self._get_client().get(url)
+        response.raise_for_status()
+        page = response.text
+
+        token = CSRF_TOKEN_PATTERN.search(page)
+        if not token:
+            raise ValueError(f"CSRF token not found on {url}")
+        self._csrf_tokens[url] = token.group(1)
+
+        if url not in self._scan_clauses:
+            for pattern in SCAN_CLAUSE_PATTERNS:
+                match = pattern.search(page)
+                if match:
+                    self._scan_clauses[url] = html.unescape(match.group(1))
+                    break
+            else:
+                raise ValueError(f"Scan clause not found on {url}")
+
+    @timed("chartink", "scan")
+    async def _post_scan(self, url: str) -> httpx.Response:
+        return await self._get_client().post(
+            urljoin(url, PROCESS_PATH),
+            data={"scan_clause": self._scan_clauses[url]},
+            headers={
+                "X-CSRF-TOKEN": self._csrf_tokens[url],
+                "X-Requested-With": "XMLHttpRequest",
+                "Referer": url,
+            },
+        )
+
+    async def fetch_table(self, url: str, table_id: str) -> List[Dict[str, str]]:
+        if url not in self._csrf_tokens:
+            await self._load_session(url)
+
+        response = await self._post_scan(url)
+        if response.status_code in (401, 403, 419):
+            # Session or CSRF token expired, start a new one and retry once
+            await self._load_session(url)
+            response = await self._post_scan(url)
+        response.raise_for_status()
+
+        payload = response.json()
+        if payload.get("scan_error"):
+            raise ValueError(f"Chartink scan error: {payload['scan_error']}")
+        return [to_table_row(record) for record in payload.get("data", [])]
+
+
+selenium_backend = SeleniumFetchBackend()
+http_backend = ChartinkHttpFetchBackend(timeout=settings.SCRAPE_HTTP_TIMEOUT)
+
+FETCH_BACKENDS = {
+    selenium_backend.name: selenium_backend,
+    http_backend.name: http_backend,
+}
+
+
+async def fetch_table(url: str, table_id: str) -> List[Dict[str, str]]:
+    """
+    Fetch table rows with the configured backend, falling back to Selenium
+    when the preferred backend cannot handle the URL or fails.
+    """
+    backend = FETCH_BACKENDS.get(settings.SCRAPE_BACKEND, selenium_backend)
+    if backend is not selenium_backend and backend.supports(url):
+        try:
+            return await backend.fetch_table(url, table_id)
+        except Exception as e:
+            logging.warning(f"{backend.name} backend failed for {url}, falling back to selenium: {e}")
+    return await selenium_backend.fetch_table(url, table_id)
@@ -0,0 +1,188 @@
+import bisect
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pytz
+
+from app.core.config import settings
+
+BLOCK_SIZE = 64 * 1024
+INDEX_INTERVAL = 1024 * 1024
+RAW_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S,%f"
+
+kolkata_timezone = pytz.timezone("Asia/Kolkata")
+
+# JsonFormatter always writes "timestamp" as the first key
+TIMESTAMP_PREFIX = re.compile(rb'\{"timestamp": "(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3})"')
+
+
+def to_local_timestamp(raw_timestamp: str) -> str:
+    """Convert a raw (UTC) log timestamp to the Asia/Kolkata display format."""
+    utc_time = datetime.fromisoformat(raw_timestamp.replace(",", "."))
+    local_time = utc_time.replace(tzinfo=pytz.utc).astimezone(kolkata_timezone)
+    return local_time.strftime(RAW_TIMESTAMP_FORMAT)
+
+
+def to_raw_timestamp(value: datetime) -> str:
+    """Convert a datetime (Asia/Kolkata when naive) to the raw log timestamp format."""
+    if value.tzinfo is None:
+        value = kolkata_timezone.localize(value)
+    return value.astimezone(pytz.utc).strftime(RAW_TIMESTAMP_FORMAT)[:-3]
+
+
+def parse_log_line(line, exclude=[]):
+    """Parse a JSON log line into a log entry, or None if it is invalid or excluded."""
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict) or "timestamp" not in record:
+        return None
+    if record.get("filename") in exclude:
+        return None
+    record["timestamp"] = to_local_timestamp(record["timestamp"])
+    return record
+
+
+def raw_timestamp_of(line: bytes) -> Optional[str]:
+    """Return the raw timestamp of a log line without parsing the rest of it."""
+    match = TIMESTAMP_PREFIX.match(line)
+    return match.group(1).decode() if match else None
+
+
+class LogReader:
+    """
+    Newest-first reader over an append-only log file.
+
+    Lines are read backwards from the end of the file in fixed-size blocks,
+    so the cost of a query depends on how many entries it returns rather
+    than on the size of the file. A sparse index of (timestamp, offset)
+    samples taken every ``INDEX_INTERVAL`` bytes lets time-range queries
+    seek close to their end time before reading.
+    """
+
+    def __init__(self, path: str = settings.LOG_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._index_timestamps: List[str] = []
+        self._index_offsets: List[int] = []
+        self._indexed_size = 0
+        self._indexed_inode: Optional[int] = None
+
+    def _refresh_index(self, file, size: int, inode: int) -> None:
+        """Sample timestamps for the part of the file appended since the last call."""
+        with self._lock:
+            if inode != self._indexed_inode or size < self._indexed_size:
+                # The file was rotated or truncated, start over
+                self._index_timestamps, self._index_offsets = [], []
+                self._indexed_size = 0
+                self._indexed_inode = inode
+
+            offset = (self._indexed_size // INDEX_INTERVAL) * INDEX_INTERVAL
+            if self._index_offsets and offset <= self._index_offsets[-1]:
+                offset += INDEX_INTERVAL
+            while offset < size:
+                file.seek(offset)
+                if offset:
+                    file.readline()  # Skip the partial line at the boundary
+                line_start = file.tell()
+                while line_start < size:
+                    line = file.readline()
+                    raw_timestamp = raw_timestamp_of(line)
+                    if raw_timestamp:
+                        if not self._index_timestamps or raw_timestamp >= self._index_timestamps[-1]:
+                            self._index_timestamps.append(raw_timestamp)
+                            self._index_offsets.append(line_start)
+                        break
+                    line_start = file.tell()
+                offset += INDEX_INTERVAL
+            self._indexed_size = size
+
+    def _offset_after(self, raw_timestamp: str, size: int) -> int:
+        """Return an offset before which every line is at or before the given timestamp."""
+        position = bisect.bisect_right(self._index_timestamps, raw_timestamp)
+        return self._index_offsets[position] if position < len(self._index_offsets) else size
+
+    @staticmethod
+    def _iter_reversed(file, end: int) -> Iterator[Tuple[int, bytes]]:
+        """Yield (offset, line) pairs from ``end`` back to the start of the file."""
+        position = end
+        remainder = b""
+        while position > 0:
+            size = min(BLOCK_SIZE, position)
+            position -= size
+            file.seek(position)
+            block = file.read(size) + remainder
+            lines = block.split(b"\n")
+            # The first piece may continue in the previous block
+            remainder = lines.pop(0)
+            line_end = position + len(block)
+            for line in reversed(lines):
+                line_start = line_end - len(line)
+                if line:
+                    yield line_start, line
+                line_end = line_start - 1
+        if remainder:
+            yield 0, remainder
+
+    def query(
+        self,
+        limit: int,
+        before: Optional[int] = None,
+        level: Optional[str] = None,
+        filename: Optional[str] = None,
+        start_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        exclude=[],
+    ) -> Tuple[List[Dict[str, str]], Optional[int]]:
+        """
+        Return up to ``limit`` entries, newest first, and the cursor of the next page.
+
+        :param before: Cursor from a previous page; only entries before it are returned.
+        :param level: Only return entries with this level.
+        :param filename: Only return entries logged from this file.
+        :param start_time: Only return entries at or after this time.
+        :param end_time: Only return entries at or before this time.
+        :param exclude: Filenames whose entries are skipped.
+        """
+        start_raw = to_raw_timestamp(start_time) if start_time else None
+        end_raw = to_raw_timestamp(end_time) if end_time else None
+
+        with open(self.path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            size = stat.st_size
+            self._refresh_index(file, size, stat.st_ino)
+
+            end = size if before is None else min(before, size)
+            if end_raw:
+                end = min(end, self._offset_after(end_raw, size))
+
+            entries = []
+            for offset, line in self._iter_reversed(file, end):
+                raw_timestamp = raw_timestamp_of(line)
+                if raw_timestamp is None:
+                    continue
+                if start_raw and raw_timestamp < start_raw:
+                    return entries, None
+                if end_raw and raw_timestamp > end_raw:
+                    continue
+
+                entry = parse_log_line(line, exclude)
+                if entry is None:
+                    continue
+                if level and entry["level"] != level:
+                    continue
+                if filename and entry["filename"] != filename:
+                    continue
+
+                entries.append(entry)
+                if len(entries) == limit:
+                    return entries, offset if offset > 0 else None
+        return entries, None
+
+
+log_reader = LogReader()
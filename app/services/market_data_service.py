@@ -0,0 +1,47 @@
+import math
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from app.models.market import MarketSummary
+from app.services.bar_store import bar_store
+
+# Enough daily bars to always include the previous session, even across holidays
+SUMMARY_PERIOD = "5d"
+
+
+def _summarize(symbol: str, bars: pd.DataFrame) -> Optional[MarketSummary]:
+    bars = bars.dropna(subset=["Close"])
+    if bars.empty:
+        return None
+
+    latest_data = bars.iloc[-1]
+    current_price = round(float(latest_data["Close"]), 2)
+    previous_close = round(float(bars["Close"].iloc[-2]), 2) if len(bars) > 1 else current_price
+    volume = latest_data.get("Volume", 0)
+
+    return MarketSummary(
+        index_name=symbol,
+        current_price=current_price,
+        open_price=round(float(latest_data["Open"]), 2),
+        high_price=round(float(latest_data["High"]), 2),
+        low_price=round(float(latest_data["Low"]), 2),
+        previous_close=previous_close,
+        volume=0 if volume is None or math.isnan(volume) else int(volume),
+    )
+
+
+def get_market_summaries(symbols: List[str]) -> Dict[str, Optional[MarketSummary]]:
+    """
+    Return the latest OHLC, volume and previous close of every symbol.
+
+    Bars are read from the bar store; symbols whose bars are stale are
+    refreshed together in a single batched download of the missing range,
+    so the cost stays roughly constant as the list grows.
+    Symbols without data map to None.
+    """
+    if not symbols:
+        return {}
+
+    bars = bar_store.get_batch_history(symbols, period=SUMMARY_PERIOD)
+    return {symbol: _summarize(symbol, bars[symbol]) for symbol in symbols}
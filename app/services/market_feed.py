@@ -0,0 +1,254 @@
+import asyncio
+import json
+import logging
+import random
+import struct
+import time
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urlencode
+
+from websockets.asyncio.client import ClientConnection, connect
+
+from app.core.config import settings
+
+# Response codes of the Dhan live market feed (v2) binary packets
+TICKER_PACKET = 2
+QUOTE_PACKET = 4
+FULL_PACKET = 8
+DISCONNECT_PACKET = 50
+
+# Request code subscribing to ticker (LTP + LTT) packets
+TICKER_REQUEST = 15
+MAX_INSTRUMENTS_PER_MESSAGE = 100
+
+HEADER = struct.Struct("<BHBI")
+TICKER_BODY = struct.Struct("<fI")
+QUOTE_BODY = struct.Struct("<fHI")
+DISCONNECT_REASON = struct.Struct("<H")
+
+
+class FeedDisconnected(Exception):
+    """Raised when the feed server closes the session with a disconnection packet."""
+
+
+class Tick:
+    """Last traded price of one security."""
+
+    __slots__ = ("security_id", "exchange_segment", "ltp", "ltt", "received_at")
+
+    def __init__(self, security_id: str, exchange_segment: int, ltp: float, ltt: int):
+        self.security_id = security_id
+        self.exchange_segment = exchange_segment
+        self.ltp = ltp
+        self.ltt = ltt
+        self.received_at = time.monotonic()
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.received_at
+
+    def __repr__(self):
+        return f"Tick({self.security_id!r}, ltp={self.ltp}, ltt={self.ltt})"
+
+
+def parse_packet(data: bytes) -> Optional[Tick]:
+    """
+    Parse a binary feed packet into a tick.
+
+    Packets without a traded price (previous close, OI, market status) are
+    ignored and return None.
+    """
+    if not isinstance(data, bytes) or len(data) < HEADER.size:
+        return None
+    code, _, exchange_segment, security_id = HEADER.unpack_from(data)
+    if code == TICKER_PACKET:
+        ltp, ltt = TICKER_BODY.unpack_from(data, HEADER.size)
+    elif code in (QUOTE_PACKET, FULL_PACKET):
+        ltp, _, ltt = QUOTE_BODY.unpack_from(data, HEADER.size)
+    elif code == DISCONNECT_PACKET:
+        (reason,) = DISCONNECT_REASON.unpack_from(data, HEADER.size)
+        raise FeedDisconnected(f"Feed server disconnected with code {reason}")
+    else:
+        return None
+    return Tick(str(security_id), exchange_segment, round(ltp, 2), ltt)
+
+
+def subscription_messages(security_ids: List[str], exchange_segment: str) -> List[str]:
+    """Build the JSON ticker subscription messages for the given securities."""
+    return [
+        json.dumps(
+            {
+                "RequestCode": TICKER_REQUEST,
+                "InstrumentCount": len(batch),
+                "InstrumentList": [
+                    {"ExchangeSegment": exchange_segment, "SecurityId": security_id} for security_id in batch
+                ],
+            }
+        )
+        for batch in (
+            security_ids[i : i + MAX_INSTRUMENTS_PER_MESSAGE]
+            for i in range(0, len(security_ids), MAX_INSTRUMENTS_PER_MESSAGE)
+        )
+    ]
+
+
+class MarketFeed:
+    """
+    Last-tick table fed by the broker's streaming market feed.
+
+    Watched securities are subscribed on one websocket connection whose
+    ticks overwrite the table entry of their security, so reading a price
+    is a dictionary lookup. The connection is reopened with exponential
+    backoff (and jitter) whenever it drops, and every watched security is
+    subscribed again. Without watched securities no connection is opened.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        client_id: Optional[str],
+        access_token: Optional[str],
+        max_tick_age: float,
+        backoff_initial: float,
+        backoff_max: float,
+    ):
+        self.url = url
+        self.client_id = client_id
+        self.access_token = access_token
+        self.max_tick_age = max_tick_age
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.ticks: Dict[str, Tick] = {}
+        self.reconnects = 0
+        self._watched: Dict[str, str] = {}
+        self._has_watched: Optional[asyncio.Event] = None
+        self._ws: Optional[ClientConnection] = None
+        self._task: Optional[asyncio.Task] = None
+        # Subscriptions sent on the open connection; the loop only keeps weak references to tasks
+        self._subscriptions: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url and self.client_id and self.access_token)
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    def _connect_url(self) -> str:
+        query = urlencode({"version": 2, "token": self.access_token, "clientId": self.client_id, "authType": 2})
+        return f"{self.url}?{query}"
+
+    def watch(self, security_ids: Iterable, exchange_segment: str = "NSE_EQ") -> None:
+        """Subscribe to ticks of the given securities, on the open connection if there is one."""
+        new_ids = [str(security_id) for security_id in security_ids if security_id is not None]
+        new_ids = [security_id for security_id in dict.fromkeys(new_ids) if security_id not in self._watched]
+        if not new_ids:
+            return
+        for security_id in new_ids:
+            self._watched[security_id] = exchange_segment
+        logging.info(f"Watching {len(new_ids)} more securities on the market feed")
+
+        if self._has_watched is not None:
+            self._has_watched.set()
+        if self._ws is not None:
+            task = asyncio.create_task(
+                self._subscribe(self._ws, {security_id: exchange_segment for security_id in new_ids})
+            )
+            self._subscriptions.add(task)
+            task.add_done_callback(self._subscriptions.discard)
+
+    def last_price(self, security_id, max_age: Optional[float] = None) -> Optional[float]:
+        """Return the last traded price of a security, or None without a tick fresher than ``max_age``."""
+        tick = self.ticks.get(str(security_id))
+        if tick is None or tick.age > (self.max_tick_age if max_age is None else max_age):
+            return None
+        return tick.ltp
+
+    async def _subscribe(self, ws: ClientConnection, watched: Dict[str, str]) -> None:
+        by_segment: Dict[str, List[str]] = {}
+        for security_id, exchange_segment in watched.items():
+            by_segment.setdefault(exchange_segment, []).append(security_id)
+        try:
+            for exchange_segment, security_ids in by_segment.items():
+                for message in subscription_messages(security_ids, exchange_segment):
+                    await ws.send(message)
+        except Exception as e:
+            # The receive loop notices the broken connection and reconnects
+            logging.warning(f"Failed to subscribe on the market feed: {e}")
+
+    async def _consume(self) -> None:
+        async with connect(self._connect_url(), open_timeout=settings.BROKER_TIMEOUT_SECONDS) as ws:
+            self._ws = ws
+            try:
+                await self._subscribe(ws, dict(self._watched))
+                logging.info(f"Market feed connected, {len(self._watched)} securities subscribed")
+                async for message in ws:
+                    tick = parse_packet(message)
+                    if tick is not None:
+                        self.ticks[tick.security_id] = tick
+            finally:
+                self._ws = None
+
+    async def _run(self) -> None:
+        backoff = self.backoff_initial
+        while True:
+            await self._has_watched.wait()
+            connected_at = time.monotonic()
+            try:
+                await self._consume()
+                logging.warning("Market feed connection closed by the server")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.warning(f"Market feed connection failed: {e}")
+
+            # A connection that stayed up for a while starts the backoff over
+            if time.monotonic() - connected_at > self.backoff_max:
+                backoff = self.backoff_initial
+            delay = backoff * random.uniform(0.5, 1.0)
+            backoff = min(backoff * 2, self.backoff_max)
+            self.reconnects += 1
+            logging.info(f"Reconnecting to the market feed in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    def start(self) -> None:
+        """Start the feed loop on the running event loop."""
+        if not self.enabled:
+            logging.info("Market feed disabled, trade prices fall back to Yahoo Finance")
+            return
+        if self._task is None or self._task.done():
+            self._has_watched = asyncio.Event()
+            if self._watched:
+                self._has_watched.set()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in list(self._subscriptions):
+            task.cancel()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "enabled": self.enabled,
+            "connected": self.connected,
+            "watched": len(self._watched),
+            "ticks": len(self.ticks),
+            "reconnects": self.reconnects,
+        }
+
+
+market_feed = MarketFeed(
+    settings.MARKET_FEED_URL,
+    settings.DHAN_CLIENT_ID,
+    settings.DHAN_ACCESS_TOKEN,
+    max_tick_age=settings.MARKET_FEED_MAX_TICK_AGE,
+    backoff_initial=settings.MARKET_FEED_BACKOFF_INITIAL,
+    backoff_max=settings.MARKET_FEED_BACKOFF_MAX,
+)
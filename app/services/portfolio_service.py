@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.core.broker_gateway import BrokerGateway, broker_gateway
+from app.core.config import settings
+
+
+class PortfolioUnavailable(Exception):
+    """Raised when the broker cannot provide a portfolio snapshot and no usable one is cached."""
+
+
+class PortfolioSnapshot:
+    """Funds, positions and holdings fetched together from the broker."""
+
+    __slots__ = ("version", "fetched_at", "fetched_monotonic", "funds", "positions", "holdings")
+
+    def __init__(self, version: int, funds, positions, holdings):
+        self.version = version
+        self.fetched_at = datetime.now(timezone.utc)
+        self.fetched_monotonic = time.monotonic()
+        self.funds = funds
+        self.positions = positions
+        self.holdings = holdings
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.fetched_monotonic
+
+
+class PortfolioSnapshotService:
+    """
+    Serve portfolio data from a cached snapshot with stale-while-revalidate.
+
+    A snapshot younger than ``ttl`` is served as is. An older one is still
+    served, up to ``max_stale``, while a single background refresh fetches
+    a new one. Without a usable snapshot the caller waits for the refresh.
+
+    A refresh only replaces the snapshot when the funds, positions and
+    holdings were all fetched; otherwise the previous snapshot is kept.
+    """
+
+    def __init__(self, gateway: BrokerGateway, ttl: float, max_stale: float):
+        self.gateway = gateway
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._snapshot: Optional[PortfolioSnapshot] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._version = 0
+
+    async def _fetch(self) -> PortfolioSnapshot:
+        responses = await asyncio.gather(
+            self.gateway.get_fund_limits(),
+            self.gateway.get_positions(),
+            self.gateway.get_holdings(),
+            return_exceptions=True,
+        )
+        # dhanhq reports most failures as a response with status "failure" rather than raising
+        errors = []
+        for name, response in zip(("funds", "positions", "holdings"), responses):
+            if isinstance(response, BaseException):
+                errors.append(f"{name}: {response!r}")
+            elif not isinstance(response, dict) or response.get("status") != "success":
+                remarks = response.get("remarks") if isinstance(response, dict) else response
+                errors.append(f"{name}: {remarks}")
+        if errors:
+            raise PortfolioUnavailable(f"Failed to fetch {'; '.join(errors)}")
+
+        funds, positions, holdings = responses
+        self._version += 1
+        self._snapshot = PortfolioSnapshot(self._version, funds, positions, holdings)
+        return self._snapshot
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._fetch())
+            self._refresh_task.add_done_callback(self._log_refresh_error)
+        return self._refresh_task
+
+    @staticmethod
+    def _log_refresh_error(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(f"Failed to refresh portfolio snapshot: {task.exception()}")
+
+    async def get(self) -> PortfolioSnapshot:
+        """
+        Return the current snapshot, refreshing it as needed.
+
+        :raises PortfolioUnavailable: When there is no usable snapshot and the refresh failed.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            if snapshot.age < self.ttl:
+                return snapshot
+            if snapshot.age < self.max_stale:
+                self._start_refresh()
+                return snapshot
+        # shield() so one cancelled request does not cancel the refresh other callers share
+        return await asyncio.shield(self._start_refresh())
+
+    async def refresh(self) -> PortfolioSnapshot:
+        """
+        Fetch a new snapshot now, joining a refresh already in progress.
+
+        :raises PortfolioUnavailable: When the refresh failed.
+        """
+        return await asyncio.shield(self._start_refresh())
+
+    def to_dict(self, snapshot: PortfolioSnapshot) -> Dict[str, Any]:
+        age = snapshot.age
+        return {
+            "version": snapshot.version,
+            "fetched_at": snapshot.fetched_at.isoformat(),
+            "age_seconds": round(age, 3),
+            "stale": age >= self.ttl,
+            "funds": snapshot.funds,
+            "positions": snapshot.positions,
+            "holdings": snapshot.holdings,
+        }
+
+
+portfolio_snapshot_service = PortfolioSnapshotService(
+    broker_gateway,
+    ttl=settings.PORTFOLIO_TTL_SECONDS,
+    max_stale=settings.PORTFOLIO_MAX_STALE_SECONDS,
+)
@@ -0,0 +1,184 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+import yfinance as yf
+
+from app.core.config import settings
+from app.core.metrics import timed
+
+# Data types, each with its own TTL
+QUOTE = "quote"
+DAILY_BAR = "daily_bar"
+FUNDAMENTALS = "fundamentals"
+
+INTRADAY_INTERVALS = {"1m", "2m", "5m", "15m", "30m", "60m", "90m", "1h"}
+
+
+class YFinanceProvider:
+    """Upstream market data provider backed by yfinance."""
+
+    @timed("yfinance")
+    def history(self, symbol: str, period: str, interval: str = "1d"):
+        return yf.Ticker(symbol).history(period=period, interval=interval)
+
+    @timed("yfinance")
+    def info(self, symbol: str) -> Dict[str, Any]:
+        return yf.Ticker(symbol).info
+
+    @timed("yfinance")
+    def quote(self, symbol: str) -> Dict[str, Any]:
+        """Live price fields of a symbol, read eagerly from yfinance's lazy ``fast_info``."""
+        fast_info = yf.Ticker(symbol).fast_info
+        return {
+            "current_price": fast_info.last_price,
+            "open": fast_info.open,
+            "previous_close": fast_info.previous_close,
+            "volume": fast_info.last_volume,
+        }
+
+    @timed("yfinance")
+    def history_since(self, symbol: str, start: datetime, interval: str = "1d"):
+        return yf.Ticker(symbol).history(start=start, interval=interval)
+
+    @timed("yfinance")
+    def download_since(self, symbols: List[str], start: datetime, interval: str = "1d"):
+        """Download bars from ``start`` for several symbols in one request, columns grouped by ticker."""
+        return yf.download(
+            symbols, start=start, interval=interval, group_by="ticker", threads=True, progress=False
+        )
+
+    @timed("yfinance")
+    def download(self, symbols: List[str], period: str, interval: str = "1d"):
+        """Download bars for several symbols in one request, columns grouped by ticker."""
+        return yf.download(
+            symbols, period=period, interval=interval, group_by="ticker", threads=True, progress=False
+        )
+
+
+class QuoteCache:
+    """
+    Thread-safe TTL + LRU cache with single-flight loading.
+
+    When several callers miss on the same key at once, only the first one
+    calls the loader; the others wait for and share its result. Failed
+    loads are not cached. Cached values are shared between callers and
+    must be treated as read-only.
+    """
+
+    def __init__(self, ttls: Dict[str, float], max_entries: int):
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, Hashable], Future] = {}
+        self._lock = threading.Lock()
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.coalesced: Counter = Counter()
+
+    def get_or_load(self, kind: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for (kind, key), loading it with ``loader`` on a miss."""
+        cache_key = (kind, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(cache_key)
+                self.hits[kind] += 1
+                return entry[1]
+
+            future = self._in_flight.get(cache_key)
+            is_loader = future is None
+            if is_loader:
+                self.misses[kind] += 1
+                future = self._in_flight[cache_key] = Future()
+            else:
+                self.coalesced[kind] += 1
+
+        if not is_loader:
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[cache_key]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._entries[cache_key] = (time.monotonic() + self.ttls[kind], value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            del self._in_flight[cache_key]
+        future.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": dict(self.hits),
+                "misses": dict(self.misses),
+                "coalesced": dict(self.coalesced),
+            }
+
+
+provider = YFinanceProvider()
+quote_cache = QuoteCache(
+    ttls={
+        QUOTE: settings.QUOTE_TTL_SECONDS,
+        DAILY_BAR: settings.DAILY_BAR_TTL_SECONDS,
+        FUNDAMENTALS: settings.FUNDAMENTALS_TTL_SECONDS,
+    },
+    max_entries=settings.QUOTE_CACHE_MAX_ENTRIES,
+)
+
+
+def get_history(symbol: str, period: str, interval: str = "1d"):
+    """
+    Return price history for a symbol through the quote cache.
+
+    Intraday bars and the current day's bar use the short quote TTL,
+    longer daily histories use the daily bar TTL.
+    """
+    kind = QUOTE if interval in INTRADAY_INTERVALS or period == "1d" else DAILY_BAR
+    return quote_cache.get_or_load(
+        kind, ("history", symbol, period, interval), lambda: provider.history(symbol, period, interval)
+    )
+
+
+def get_info(symbol: str) -> Dict[str, Any]:
+    """
+    Return the fundamentals of a symbol through the quote cache. Its price
+    fields can be as old as the fundamentals TTL; use :func:`get_quote` for those.
+    """
+    return quote_cache.get_or_load(FUNDAMENTALS, ("info", symbol), lambda: provider.info(symbol))
+
+
+def get_quote(symbol: str) -> Dict[str, Any]:
+    """Return the current price, open, previous close and volume of a symbol, with the short quote TTL."""
+    return quote_cache.get_or_load(QUOTE, ("quote", symbol), lambda: provider.quote(symbol))
+
+
+def get_batch_history(symbols: List[str], period: str, interval: str = "1d", kind: str = QUOTE):
+    """
+    Return price history for several symbols, fetched in one batched download.
+
+    Cached with the quote TTL by default, since the batch usually serves live
+    summaries whose latest bar changes during the session.
+    """
+    symbols = sorted(set(symbols))
+    return quote_cache.get_or_load(
+        kind,
+        ("batch_history", tuple(symbols), period, interval),
+        lambda: provider.download(symbols, period, interval),
+    )
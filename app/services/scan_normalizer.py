@@ -0,0 +1,83 @@
+from typing import Any, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+# Scraped table column -> typed column
+TABLE_COLUMNS = {
+    "Sr.": "sr",
+    "Stock Name": "stock_name",
+    "Symbol": "symbol",
+    "Links": "links",
+    "% Chg": "change",
+    "Price": "price",
+    "Volume": "volume",
+}
+NUMERIC_COLUMNS = ["change", "price", "volume"]
+
+# Indian unit suffixes: thousand, lakh, crore
+UNIT_MULTIPLIERS = {"k": 1e3, "l": 1e5, "lakh": 1e5, "lakhs": 1e5, "cr": 1e7, "crore": 1e7, "crores": 1e7}
+NUMBER_PATTERN = r"^(?P<number>[-+]?\d*\.?\d+)(?P<unit>[a-z]*)$"
+
+
+def parse_indian_numbers(values: pd.Series) -> pd.Series:
+    """
+    Parse Indian formatted numbers such as "6,94,683", "₹1,234.50", "6.91%"
+    or "1.2 Cr" in one vectorised pass. Unparseable values become NaN.
+    """
+    text = values.astype("string").str.lower().str.replace(r"[,%₹\s]|rs\.?", "", regex=True)
+    parts = text.str.extract(NUMBER_PATTERN)
+    numbers = pd.to_numeric(parts["number"], errors="coerce")
+    multipliers = parts["unit"].map(UNIT_MULTIPLIERS).astype(float)
+    multipliers[parts["unit"].fillna("") == ""] = 1.0
+    return numbers * multipliers
+
+
+def normalize_scan(table_data: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Turn scraped scan rows into a typed frame: numeric change, price and
+    volume, and one row per symbol. Rows without a symbol or a parseable
+    change (such as the "No stocks filtered" placeholder) are dropped.
+    """
+    frame = pd.DataFrame.from_records(table_data, columns=list(TABLE_COLUMNS)).rename(columns=TABLE_COLUMNS)
+    for column in NUMERIC_COLUMNS:
+        frame[column] = parse_indian_numbers(frame[column])
+    frame["sr"] = pd.to_numeric(frame["sr"], errors="coerce").astype("Int64")
+    frame["symbol"] = frame["symbol"].astype("string").str.strip()
+    frame = frame.dropna(subset=["symbol", "change"])
+    frame = frame[frame["symbol"] != ""]
+    frame["volume"] = frame["volume"].round().astype("Int64")
+    return frame.drop_duplicates("symbol").reset_index(drop=True)
+
+
+def rank_top_k(
+    frame: pd.DataFrame,
+    k: int,
+    rank_by: Sequence[str] = ("change",),
+    min_change: Optional[float] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_volume: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    Return the ``k`` best rows of a normalised scan, highest first.
+
+    Rows are first filtered to the change, price and volume bands, then
+    ranked by the ``rank_by`` columns in order, each one breaking ties of
+    the one before.
+    """
+    mask = pd.Series(True, index=frame.index)
+    if min_change is not None:
+        mask &= frame["change"] >= min_change
+    if min_price is not None:
+        mask &= frame["price"] >= min_price
+    if max_price is not None:
+        mask &= frame["price"] <= max_price
+    if min_volume is not None:
+        mask &= frame["volume"] >= min_volume
+    return frame[mask].nlargest(k, list(rank_by), keep="first")
+
+
+def to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert typed rows to plain Python records, with None for missing values."""
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict("records")
@@ -1,53 +1,152 @@
+import asyncio
 import logging
+import time
 import uuid
 import os
 import json
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, List, Optional
 
 from app.core.config import settings
-from app.routes.scrape_table import scrape_table_to_json
-from motor.motor_asyncio import AsyncIOMotorClient
+from app.models.scanner import ScannerItem
+from app.repositories.stock_repository import StockRepository, test_stock_repository
+from app.services.fetch_backend import fetch_table
+from app.services.market_feed import market_feed
+from app.services.scan_normalizer import normalize_scan, rank_top_k, to_records
+from app.services.screener_engine import screener_engine
+from app.services.scrip_master import SCRIP_MASTER_FILE, scrip_master
 
 # Constants
-MONGO_URI = settings.MONGODB_URL
-DB_NAME = "stock_database"
-COLLECTION_NAME = "stock_data"
-TEST_COLLECTION_NAME = "test_stock_data"
-SCRIP_MASTER_FILE = "api_scrip_master.json"
 STOCK_DATA_URL = "https://chartink.com/screener/rsi-greater-than-60-5109"
 TABLE_ID = "DataTables_Table_0"
+DEFAULT_SCANNERS = [
+    ScannerItem(
+        name="rsi-greater-than-60-5109",
+        url=STOCK_DATA_URL,
+        table_id=TABLE_ID,
+        description="Chartink: daily RSI(14) above 60",
+    )
+]
+
+# Local scans and bar refreshes run here, off the event loop
+scanner_executor = ThreadPoolExecutor(max_workers=settings.SCANNER_MAX_WORKERS, thread_name_prefix="scanner")
+
+
+def load_scanners() -> List[ScannerItem]:
+    """Return the configured scanners: SCANNERS_FILE when set, else the default Chartink scan."""
+    if settings.SCANNERS_FILE:
+        records = load_json(settings.SCANNERS_FILE)
+        if records:
+            return [ScannerItem(**record) for record in records]
+        logging.warning(f"No scanners found in {settings.SCANNERS_FILE}, using the default scanner.")
+    return DEFAULT_SCANNERS
+
+
+async def scan_table(scanner: ScannerItem) -> List[Dict[str, str]]:
+    """Fetch the result table of one scanner without blocking the event loop."""
+    if scanner.source == "local":
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(scanner_executor, screener_engine.run, scanner)
+    return await fetch_table(scanner.url, scanner.table_id)
+
+
+async def run_scanner(scanner: ScannerItem, semaphore: asyncio.Semaphore) -> Optional[List[Dict[str, str]]]:
+    """
+    Fetch the result table of one scanner.
 
-async def fetch_stock_data() -> None:
+    Returns None when the scanner failed or ran past SCANNER_TIMEOUT_SECONDS,
+    so that the stocks it stored earlier are left untouched.
     """
-    Fetch stock data from a given URL and update MongoDB with the stock
-    having the highest percentage change for the current date.
+    async with semaphore:
+        started_at = time.perf_counter()
+        try:
+            table_data = await asyncio.wait_for(scan_table(scanner), settings.SCANNER_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            logging.warning(f"Scanner {scanner.name} timed out after {settings.SCANNER_TIMEOUT_SECONDS}s")
+            return None
+        except Exception as e:
+            logging.error(f"Scanner {scanner.name} failed: {e}", exc_info=True)
+            return None
+        logging.info(f"Scanner {scanner.name} returned {len(table_data)} row(s) in {time.perf_counter() - started_at:.2f}s")
+        return table_data
+
+
+async def scan_all(scanners: List[ScannerItem]) -> Dict[str, List[Dict[str, str]]]:
     """
-    try:
-        logging.info("Starting stock data fetch process.")
+    Run the scanners concurrently, at most SCANNER_MAX_WORKERS at a time,
+    and return the table of every scanner that completed.
+    """
+    semaphore = asyncio.Semaphore(settings.SCANNER_MAX_WORKERS)
+    tables = await asyncio.gather(*(run_scanner(scanner, semaphore) for scanner in scanners))
+    return {scanner.name: table for scanner, table in zip(scanners, tables) if table is not None}
+
 
-        # Fetch stock data
-        table_data = scrape_table_to_json(STOCK_DATA_URL, TABLE_ID)
+def rank_tables(tables: Dict[str, List[Dict[str, str]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Return the BASKET_SIZE best ranked rows of each scanner's table."""
+    ranked = {}
+    for name, table_data in tables.items():
         if not validate_table_data(table_data):
-            logging.warning("No valid stock data available to process.")
-            return
+            logging.warning(f"No valid stock data from scanner {name}.")
+            ranked[name] = []
+            continue
+        ranked[name] = to_records(rank_scan(normalize_scan(table_data), settings.BASKET_SIZE))
+    return ranked
+
+
+def resolve_picks(ranked: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Turn each scanner's ranked rows into stock entries with their security id."""
+    return {
+        name: [create_stock_entry(stock, scrip_master.find_security_id(stock["symbol"]), name) for stock in rows]
+        for name, rows in ranked.items()
+    }
+
 
-        # Extract stock with the highest % change
-        raw_max_stock = get_stock_with_highest_change(table_data)
-        scrip_master_data = load_json(SCRIP_MASTER_FILE)
-        security_id = find_security_id(scrip_master_data, raw_max_stock.get("Symbol"))
+async def store_picks(repository: StockRepository, picks: Dict[str, List[Dict[str, Any]]]) -> None:
+    """Store the picks of each scanner and stream their prices ahead of the buy."""
+    market_feed.watch(stock["security_id"] for stocks in picks.values() for stock in stocks)
+    await update_mongodb_data(repository, picks)
 
-        updated_stock = create_stock_entry(raw_max_stock, security_id)
-        db = get_mongo_database()
 
-        # Update MongoDB
-        # await update_mongodb_data(db[COLLECTION_NAME], COLLECTION_NAME, updated_stock)
-        await update_mongodb_data(db[TEST_COLLECTION_NAME], TEST_COLLECTION_NAME, updated_stock)
+async def fetch_stock_data(scanners: Optional[List[ScannerItem]] = None) -> Dict[str, int]:
+    """
+    Run every configured scanner concurrently, at most SCANNER_MAX_WORKERS at
+    a time, and update MongoDB with the BASKET_SIZE best ranked stocks (by
+    SCAN_RANK_BY, within the configured change, price and volume bands) of
+    each scanner for the current date.
+
+    :param scanners: Scanners to run, defaults to ``load_scanners()``.
+    :return: Number of stocks stored per scanner that completed.
+    """
+    try:
+        scanners = scanners or load_scanners()
+        logging.info(f"Starting stock data fetch process for {len(scanners)} scanner(s).")
+        started_at = time.perf_counter()
+
+        picks = resolve_picks(rank_tables(await scan_all(scanners)))
+        # await store_picks(stock_repository, picks)
+        await store_picks(test_stock_repository, picks)
 
-        logging.info("Stock data successfully updated in MongoDB.")
+        logging.info(
+            f"{len(picks)}/{len(scanners)} scanner(s) completed in {time.perf_counter() - started_at:.2f}s"
+        )
+        return {name: len(stocks) for name, stocks in picks.items()}
 
     except Exception as e:
         logging.error(f"Failed to fetch or process stock data: {e}", exc_info=True)
+        return {}
+
+
+async def refresh_scanner_bars() -> None:
+    """Bring the stored bars up to date ahead of the scan when any local scanner is configured."""
+    local_scanners = [scanner for scanner in load_scanners() if scanner.source == "local"]
+    if not local_scanners:
+        return
+    intervals = {scanner.interval for scanner in local_scanners}
+    loop = asyncio.get_running_loop()
+    for interval in intervals:
+        refreshed = await loop.run_in_executor(scanner_executor, screener_engine.refresh_bars, interval)
+        logging.info(f"Refreshed {interval} bars of {refreshed} symbols for the local scanners.")
 
 
 def validate_table_data(table_data: List[Dict[str, Any]]) -> bool:
@@ -60,21 +159,31 @@ def validate_table_data(table_data: List[Dict[str, Any]]) -> bool:
     return True
 
 
-def get_stock_with_highest_change(table_data: List[Dict[str, str]]) -> Dict[str, str]:
-    """Extract stock with the highest percentage change."""
-    return max(table_data, key=lambda x: float(x["% Chg"].strip("%")))
+def rank_scan(frame, count: int):
+    """Rank a normalised scan with the configured criteria and price/volume bands."""
+    return rank_top_k(
+        frame,
+        count,
+        rank_by=settings.SCAN_RANK_BY,
+        min_change=settings.SCAN_MIN_CHANGE,
+        min_price=settings.SCAN_MIN_PRICE,
+        max_price=settings.SCAN_MAX_PRICE,
+        min_volume=settings.SCAN_MIN_VOLUME,
+    )
 
 
-def create_stock_entry(stock_data: Dict[str, str], security_id: Optional[str]) -> Dict[str, Any]:
-    """Create a stock entry dictionary."""
+def create_stock_entry(
+    stock: Dict[str, Any], security_id: Optional[str], scanner: Optional[str] = None
+) -> Dict[str, Any]:
+    """Create a stock entry dictionary from a normalised scan row of ``scanner``."""
     current_date = datetime.now().strftime("%Y-%m-%d")
     return {
         "id": str(uuid.uuid4())[0:8],
-        "stock_name": stock_data.get("Stock Name"),
-        "symbol": stock_data.get("Symbol"),
-        "change": float(stock_data.get("% Chg", "0").strip("%")),
-        "price": stock_data.get("Price"),
-        "volume": stock_data.get("Volume"),
+        "stock_name": stock.get("stock_name"),
+        "symbol": stock.get("symbol"),
+        "change": stock.get("change"),
+        "price": stock.get("price"),
+        "volume": stock.get("volume"),
         "security_id": security_id,
         "quantity": 0,
         "status": "scanned",
@@ -82,6 +191,7 @@ def create_stock_entry(stock_data: Dict[str, str], security_id: Optional[str]) -
         "sell_price": 0,
         "date": current_date,
         "state": "inactive",
+        "scanner": scanner,
     }
 
 
@@ -105,24 +215,20 @@ def load_json(file_name: str) -> List[Dict[str, Any]]:
     return []
 
 
-def get_mongo_database() -> AsyncIOMotorClient:
-    """Initialize and return a MongoDB client instance."""
-    return AsyncIOMotorClient(MONGO_URI)[DB_NAME]
-
-
-async def update_mongodb_data(collection, collection_name, new_stock: Dict[str, Any]) -> None:
+async def update_mongodb_data(repository: StockRepository, picks: Dict[str, List[Dict[str, Any]]]) -> None:
     """
-    Update MongoDB with the new stock for the current date.
-    If an entry already exists for the date, replace it.
+    Update MongoDB with the new stocks of each scanner for the current date,
+    in one bulk write. The stocks each scanner stored earlier for the date
+    are replaced.
     """
-    current_date = new_stock["date"]
+    if not picks:
+        return
+    current_date = datetime.now().strftime("%Y-%m-%d")
     try:
-        existing_record = await collection.find_one({"date": current_date})
-        if existing_record:
-            await collection.update_one({"_id": existing_record["_id"]}, {"$set": new_stock})
-            logging.info(f"Updated existing record in {collection_name} for date: {current_date}")
-        else:
-            await collection.insert_one(new_stock)
-            logging.info(f"Inserted new record in {collection_name} for date: {current_date}")
+        await repository.replace_scanned(current_date, picks)
+        stored = sum(len(stocks) for stocks in picks.values())
+        logging.info(
+            f"Stored {stored} scanned stock(s) of {len(picks)} scanner(s) in {repository.name} for date: {current_date}"
+        )
     except Exception as e:
         logging.error(f"Error updating MongoDB: {e}", exc_info=True)
@@ -0,0 +1,232 @@
+import logging
+import operator
+import time
+import warnings
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.scanner import ScanCondition, ScannerItem
+from app.services.bar_store import BarStore, bar_store
+from app.services.fetch_backend import to_table_row
+from app.services.scrip_master import ScripMaster, scrip_master
+
+# Series of the NSE equity segment that trade in the normal market
+UNIVERSE_SERIES = {"EQ", "BE"}
+YAHOO_SUFFIX = ".NS"
+
+OPERATORS: Dict[str, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+
+class BarMatrix:
+    """
+    Close and volume bars of many symbols as (symbols x bars) matrices.
+
+    Each symbol's most recent bars are right-aligned, so column -1 is the
+    latest bar of every symbol; shorter histories are padded with NaN.
+    """
+
+    def __init__(self, symbols: List[str], names: List[str], close: np.ndarray, volume: np.ndarray):
+        self.symbols = symbols
+        self.names = names
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_store(
+        cls, store: BarStore, symbols: Sequence[str], names: Sequence[str], interval: str, bars: int
+    ) -> "BarMatrix":
+        close = np.full((len(symbols), bars), np.nan)
+        volume = np.full((len(symbols), bars), np.nan)
+        for row, symbol in enumerate(symbols):
+            records = store.read(symbol + YAHOO_SUFFIX, interval)[-bars:]
+            if len(records):
+                close[row, bars - len(records) :] = records["close"]
+                volume[row, bars - len(records) :] = records["volume"]
+        return cls(list(symbols), list(names), close, volume)
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average along the bar axis; NaN until ``period`` bars exist."""
+    result = np.full(values.shape, np.nan)
+    if values.shape[1] < period:
+        return result
+    cumsum = np.cumsum(values, axis=1)
+    result[:, period - 1] = cumsum[:, period - 1]
+    result[:, period:] = cumsum[:, period:] - cumsum[:, :-period]
+    return result / period
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """Exponential moving average along the bar axis, seeded with the first value."""
+    alpha = 2 / (period + 1)
+    result = np.empty(values.shape)
+    current = values[:, 0].copy()
+    for bar in range(values.shape[1]):
+        column = values[:, bar]
+        current = np.where(np.isnan(current), column, current + alpha * (column - current))
+        result[:, bar] = current
+    return result
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    Wilder's relative strength index along the bar axis.
+
+    The smoothing is recursive in time, so it steps through the bars, but
+    every step updates all symbols at once.
+    """
+    delta = np.diff(close, axis=1)
+    gains, losses = np.clip(delta, 0, None), np.clip(-delta, 0, None)
+    result = np.full(close.shape, np.nan)
+    if delta.shape[1] < period:
+        return result
+    with warnings.catch_warnings():
+        # Symbols without a full first window start from NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        avg_gain = np.nanmean(gains[:, :period], axis=1)
+        avg_loss = np.nanmean(losses[:, :period], axis=1)
+    for bar in range(period, delta.shape[1] + 1):
+        if bar > period:
+            gain, loss = gains[:, bar - 1], losses[:, bar - 1]
+            # Histories that start later pick up their first value here
+            avg_gain = np.where(np.isnan(avg_gain), gain, (avg_gain * (period - 1) + gain) / period)
+            avg_loss = np.where(np.isnan(avg_loss), loss, (avg_loss * (period - 1) + loss) / period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[:, bar] = np.where(avg_loss == 0, 100.0, 100 - 100 / (1 + avg_gain / avg_loss))
+    return result
+
+
+def latest(matrix: BarMatrix, indicator: str, period: Optional[int]) -> np.ndarray:
+    """Value of an indicator at the latest bar of every symbol."""
+    close, volume = matrix.close, matrix.volume
+    if indicator in ("close", "price"):
+        return close[:, -1]
+    if indicator == "volume":
+        return volume[:, -1]
+    if indicator == "change":
+        lookback = period or 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (close[:, -1] / close[:, -1 - lookback] - 1) * 100
+    if indicator == "rsi":
+        return rsi(close, period or 14)[:, -1]
+    if indicator == "sma":
+        return sma(close[:, -(period or 20) :], period or 20)[:, -1]
+    if indicator == "ema":
+        return ema(close, period or 20)[:, -1]
+    if indicator == "avg_volume":
+        return sma(volume[:, -(period or 20) :], period or 20)[:, -1]
+    if indicator in ("high", "low"):
+        window = close[:, -(period or 20) :]
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            return np.nanmax(window, axis=1) if indicator == "high" else np.nanmin(window, axis=1)
+    raise ValueError(f"Unknown indicator: {indicator}")
+
+
+def evaluate(matrix: BarMatrix, conditions: Sequence[ScanCondition]) -> np.ndarray:
+    """Return a boolean mask of the symbols meeting every condition; NaN never matches."""
+    mask = np.isfinite(matrix.close[:, -1])
+    for condition in conditions:
+        compare = OPERATORS.get(condition.op)
+        if compare is None:
+            raise ValueError(f"Unknown operator: {condition.op}")
+        left = latest(matrix, condition.indicator, condition.period)
+        if condition.compare_to is not None:
+            right = latest(matrix, condition.compare_to, condition.compare_period)
+        elif condition.value is not None:
+            right = np.float64(condition.value)
+        else:
+            raise ValueError(f"Condition on {condition.indicator} needs a value or compare_to")
+        with np.errstate(invalid="ignore"):
+            mask &= compare(left, right)
+    return mask
+
+
+def to_rows(matrix: BarMatrix, mask: np.ndarray) -> List[Dict[str, str]]:
+    """Matching symbols as scan table rows, highest change first, like the Chartink table."""
+    change = latest(matrix, "change", 1)
+    matched = np.flatnonzero(mask)
+    matched = matched[np.argsort(-np.nan_to_num(change[matched], nan=-np.inf), kind="stable")]
+    return [
+        to_table_row(
+            {
+                "sr": sr,
+                "name": matrix.names[row],
+                "nsecode": matrix.symbols[row],
+                "per_chg": 0.0 if np.isnan(change[row]) else change[row],
+                "close": matrix.close[row, -1],
+                "volume": np.nan_to_num(matrix.volume[row, -1]),
+            }
+        )
+        for sr, row in enumerate(matched, start=1)
+    ]
+
+
+class ScreenerEngine:
+    """
+    Evaluates local scan definitions over the NSE equity universe of the
+    scrip master, using only bars already in the bar store.
+    """
+
+    def __init__(self, store: BarStore, scrips: ScripMaster):
+        self.store = store
+        self.scrips = scrips
+
+    def universe(self) -> List[Tuple[str, str]]:
+        """(trading symbol, name) of every normal market NSE equity."""
+        return [
+            (record.trading_symbol, record.symbol_name or record.trading_symbol)
+            for record in self.scrips.get_by_segment("NSE", "E")
+            if record.series in UNIVERSE_SERIES
+        ]
+
+    def load(self, interval: str, bars: int) -> BarMatrix:
+        universe = self.universe()
+        symbols = [symbol for symbol, _ in universe]
+        names = [name for _, name in universe]
+        return BarMatrix.from_store(self.store, symbols, names, interval, bars)
+
+    def refresh_bars(self, interval: str = "1d", period: str = "1y", chunk_size: int = 200) -> int:
+        """
+        Bring the stored bars of the whole universe up to date, downloading
+        the stale symbols in batches of ``chunk_size``. Run ahead of the
+        scans so that they never touch the network.
+        """
+        symbols = [symbol + YAHOO_SUFFIX for symbol, _ in self.universe()]
+        refreshed = 0
+        for start in range(0, len(symbols), chunk_size):
+            chunk = symbols[start : start + chunk_size]
+            try:
+                self.store.get_batch_history(chunk, period, interval)
+                refreshed += len(chunk)
+            except Exception as e:
+                logging.warning(f"Failed to refresh bars of {len(chunk)} symbols: {e}")
+        return refreshed
+
+    def run(self, scanner: ScannerItem, matrix: Optional[BarMatrix] = None) -> List[Dict[str, str]]:
+        """Run a local scan and return its matches in the scraped table row shape."""
+        started_at = time.perf_counter()
+        matrix = matrix or self.load(scanner.interval, scanner.bars)
+        rows = to_rows(matrix, evaluate(matrix, scanner.conditions))
+        logging.info(
+            f"Local scan {scanner.name}: {len(rows)}/{len(matrix.symbols)} symbols matched "
+            f"in {time.perf_counter() - started_at:.2f}s"
+        )
+        return rows
+
+
+screener_engine = ScreenerEngine(bar_store, scrip_master)
+
+# Local counterpart of the Chartink "RSI greater than 60" scan
+RSI_ABOVE_60_SCANNER = ScannerItem(
+    name="rsi-greater-than-60",
+    description="Daily RSI(14) above 60",
+    source="local",
+    conditions=[ScanCondition(indicator="rsi", period=14, op=">", value=60)],
+)
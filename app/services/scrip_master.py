@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Dict, List, Optional, Tuple
+
+SCRIP_MASTER_FILE = "api_scrip_master.json"
+
+
+class ScripRecord:
+    """Compact, read-only view of a single scrip master entry."""
+
+    __slots__ = (
+        "security_id",
+        "trading_symbol",
+        "exchange",
+        "segment",
+        "instrument",
+        "series",
+        "lot_units",
+        "tick_size",
+        "custom_symbol",
+        "symbol_name",
+    )
+
+    def __init__(self, entry: Dict):
+        # Low-cardinality fields are interned so every record shares one string object
+        self.security_id = entry.get("SEM_SMST_SECURITY_ID")
+        self.trading_symbol = entry.get("SEM_TRADING_SYMBOL")
+        self.exchange = sys.intern(str(entry.get("SEM_EXM_EXCH_ID", "")))
+        self.segment = sys.intern(str(entry.get("SEM_SEGMENT", "")))
+        self.instrument = sys.intern(str(entry.get("SEM_INSTRUMENT_NAME", "")))
+        self.series = sys.intern(str(entry.get("SEM_SERIES", "")))
+        self.lot_units = entry.get("SEM_LOT_UNITS")
+        self.tick_size = entry.get("SEM_TICK_SIZE")
+        self.custom_symbol = entry.get("SEM_CUSTOM_SYMBOL")
+        self.symbol_name = entry.get("SM_SYMBOL_NAME")
+
+    def __repr__(self):
+        return f"ScripRecord({self.exchange}:{self.segment}:{self.trading_symbol}={self.security_id})"
+
+
+class ScripMaster:
+    """
+    Process-wide, indexed view of the scrip master file.
+
+    The file is parsed once into ``ScripRecord`` objects and re-parsed only
+    when its modification time changes, so symbol resolution is a dict lookup
+    instead of a scan over the raw JSON list.
+    """
+
+    def __init__(self, file_name: str = SCRIP_MASTER_FILE):
+        self.file_name = file_name
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._by_symbol: Dict[str, ScripRecord] = {}
+        self._by_key: Dict[Tuple[str, str, str], ScripRecord] = {}
+        self._by_security_id: Dict[int, ScripRecord] = {}
+        self._by_segment: Dict[Tuple[str, str], List[ScripRecord]] = {}
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.file_name).st_mtime
+        except OSError:
+            return None
+
+    def _ensure_loaded(self) -> None:
+        """Reload the indexes if the file changed since the last load."""
+        mtime = self._current_mtime()
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            if mtime == self._mtime:
+                return
+            self._load(mtime)
+
+    def _load(self, mtime: Optional[float]) -> None:
+        entries = []
+        if mtime is not None:
+            try:
+                with open(self.file_name, "r") as file:
+                    entries = json.load(file)
+            except (json.JSONDecodeError, IOError) as e:
+                logging.warning(f"Error loading file {self.file_name}: {e}")
+                return
+
+        by_symbol: Dict[str, ScripRecord] = {}
+        by_key: Dict[Tuple[str, str, str], ScripRecord] = {}
+        by_security_id: Dict[int, ScripRecord] = {}
+        by_segment: Dict[Tuple[str, str], List[ScripRecord]] = {}
+
+        for entry in entries:
+            record = ScripRecord(entry)
+            # First occurrence wins, matching the order of a linear scan
+            by_symbol.setdefault(record.trading_symbol, record)
+            by_key.setdefault((record.exchange, record.segment, record.trading_symbol), record)
+            by_security_id.setdefault(record.security_id, record)
+            by_segment.setdefault((record.exchange, record.segment), []).append(record)
+
+        # Swap the indexes in one go so readers never see a half-built state
+        self._by_symbol, self._by_key = by_symbol, by_key
+        self._by_security_id, self._by_segment = by_security_id, by_segment
+        self._mtime = mtime
+        logging.info(f"Loaded {len(by_security_id)} scrips from {self.file_name}")
+
+    def get_by_symbol(
+        self, symbol: str, exchange: Optional[str] = None, segment: Optional[str] = None
+    ) -> Optional[ScripRecord]:
+        """Return the scrip for a trading symbol, optionally scoped to an exchange segment."""
+        self._ensure_loaded()
+        if exchange is None and segment is None:
+            return self._by_symbol.get(symbol)
+        return self._by_key.get((exchange or "NSE", segment or "E", symbol))
+
+    def get_by_security_id(self, security_id) -> Optional[ScripRecord]:
+        """Return the scrip for a security id."""
+        self._ensure_loaded()
+        try:
+            return self._by_security_id.get(int(security_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_by_segment(self, exchange: str, segment: str) -> List[ScripRecord]:
+        """Return every scrip listed under an exchange segment."""
+        self._ensure_loaded()
+        return self._by_segment.get((exchange, segment), [])
+
+    def find_security_id(self, symbol: str) -> Optional[int]:
+        """Find the SEM_SMST_SECURITY_ID for a given trading symbol."""
+        record = self.get_by_symbol(symbol)
+        if record is None:
+            logging.warning(f"Security ID not found for symbol: {symbol}")
+            return None
+        return record.security_id
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._by_security_id)
+
+
+scrip_master = ScripMaster()
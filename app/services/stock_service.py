@@ -1,7 +1,6 @@
-import yfinance as yf
+from app.services.bar_store import bar_store
 
 
 def fetch_stock_price(symbol: str):
-    stock = yf.Ticker(symbol)
-    history = stock.history(period="1d")
+    history = bar_store.get_history(symbol, period="1d")
     return history["Close"].iloc[-1]
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES, EVENT_JOB_MISSED, EVENT_JOB_SUBMITTED, JobEvent
+from pytz import timezone
+
+from app.core.config import settings
+from app.models.scanner import ScannerItem
+from app.repositories.stock_repository import StockRepository, stock_repository, test_stock_repository
+from app.services.basket_service import OrderPlacer, OrderResult, place_basket, prepare_buy
+from app.services.scrape_service import load_scanners, rank_tables, resolve_picks, scan_all, store_picks
+from app.services.test_trade_service import test_order_placer
+from app.services.trade_service import live_order_placer
+
+ASIA_KOLKATA = timezone("Asia/Kolkata")
+STAGES = ("scrape", "rank", "resolve", "size", "order")
+# Scheduler events the monitor listens to
+JOB_EVENTS = EVENT_JOB_SUBMITTED | EVENT_JOB_MISSED | EVENT_JOB_MAX_INSTANCES
+
+
+class PipelineRun:
+    """Timings and outcome of one scan-to-order pipeline run."""
+
+    __slots__ = ("pipeline", "started_at", "deadline", "stages", "status", "orders", "filled", "error")
+
+    def __init__(self, pipeline: str, started_at: datetime, deadline: datetime):
+        self.pipeline = pipeline
+        self.started_at = started_at
+        self.deadline = deadline
+        self.stages: Dict[str, float] = {}
+        # running -> completed | no_orders | deadline_missed | failed
+        self.status = "running"
+        self.orders = 0
+        self.filled = 0
+        self.error: Optional[str] = None
+
+    @property
+    def total_ms(self) -> float:
+        return round(sum(self.stages.values()), 3)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pipeline": self.pipeline,
+            "started_at": self.started_at.isoformat(),
+            "deadline": self.deadline.isoformat(),
+            "stages_ms": dict(self.stages),
+            "total_ms": self.total_ms,
+            "status": self.status,
+            "orders": self.orders,
+            "filled": self.filled,
+            "error": self.error,
+        }
+
+
+class PipelineMonitor:
+    """
+    Keeps the most recent pipeline runs together with the lateness and
+    misfires the scheduler reported for every job.
+    """
+
+    def __init__(self, history: int):
+        self.runs: deque = deque(maxlen=history)
+        self.deadline_misses = 0
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+
+    def _job(self, job_id: str) -> Dict[str, Any]:
+        return self.jobs.setdefault(
+            job_id, {"submitted": 0, "misfires": 0, "skipped": 0, "last_lateness_s": None, "max_lateness_s": 0.0}
+        )
+
+    def record_run(self, run: PipelineRun) -> None:
+        self.runs.append(run)
+        if run.status == "deadline_missed":
+            self.deadline_misses += 1
+
+    def listener(self, event: JobEvent) -> None:
+        """APScheduler listener for JOB_EVENTS."""
+        job = self._job(event.job_id)
+        if event.code == EVENT_JOB_SUBMITTED:
+            lateness = (datetime.now(ASIA_KOLKATA) - event.scheduled_run_times[-1]).total_seconds()
+            job["submitted"] += 1
+            job["last_lateness_s"] = round(lateness, 3)
+            job["max_lateness_s"] = max(job["max_lateness_s"], job["last_lateness_s"])
+            if lateness > settings.PIPELINE_LATENESS_WARNING_SECONDS:
+                logging.warning(f"Job {event.job_id} started {lateness:.1f}s after {event.scheduled_run_times[-1]}")
+        elif event.code == EVENT_JOB_MISSED:
+            job["misfires"] += 1
+            logging.error(f"Job {event.job_id} misfired, run time {event.scheduled_run_time} was missed")
+        elif event.code == EVENT_JOB_MAX_INSTANCES:
+            job["skipped"] += 1
+            logging.warning(f"Job {event.job_id} skipped, the previous run is still going")
+
+    def stats(self) -> Dict[str, Any]:
+        stage_ms = {}
+        for stage in STAGES:
+            durations = sorted(run.stages[stage] for run in self.runs if stage in run.stages)
+            if durations:
+                stage_ms[stage] = {
+                    "last": next(run.stages[stage] for run in reversed(self.runs) if stage in run.stages),
+                    "p50": durations[len(durations) // 2],
+                    "max": durations[-1],
+                }
+        return {
+            "runs": [run.to_dict() for run in reversed(self.runs)],
+            "stage_ms": stage_ms,
+            "deadline_misses": self.deadline_misses,
+            "jobs": self.jobs,
+        }
+
+
+pipeline_monitor = PipelineMonitor(settings.PIPELINE_HISTORY)
+
+
+def deadline_today(deadline: str, now: datetime) -> datetime:
+    """The "HH:MM[:SS]" deadline on the day of ``now``."""
+    parts = [int(part) for part in deadline.split(":")]
+    hour, minute, second = (parts + [0, 0])[:3]
+    return now.replace(hour=hour, minute=minute, second=second, microsecond=0)
+
+
+class TradePipeline:
+    """
+    Scans, ranks, resolves, sizes and orders as one run.
+
+    Each stage starts as soon as the one before it finished, so the orders
+    go out as soon as the scans are in. Everything up to the order stage
+    must finish before the deadline or no order is placed; once placing
+    has started, the orders are always confirmed and stored.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        repository: StockRepository,
+        placer: OrderPlacer,
+        deadline: str = settings.PIPELINE_ORDER_DEADLINE,
+        monitor: PipelineMonitor = pipeline_monitor,
+    ):
+        self.name = name
+        self.repository = repository
+        self.placer = placer
+        self.deadline = deadline
+        self.monitor = monitor
+
+    @contextmanager
+    def _stage(self, run: PipelineRun, stage: str) -> Iterator[None]:
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            run.stages[stage] = round((time.perf_counter() - started_at) * 1000, 3)
+
+    async def _prepare(self, run: PipelineRun, scanners: List[ScannerItem]) -> List[OrderResult]:
+        with self._stage(run, "scrape"):
+            tables = await scan_all(scanners)
+        with self._stage(run, "rank"):
+            ranked = rank_tables(tables)
+        with self._stage(run, "resolve"):
+            picks = resolve_picks(ranked)
+            await store_picks(self.repository, picks)
+        with self._stage(run, "size"):
+            return await prepare_buy(self.repository, self.placer, settings.BASKET_SIZE)
+
+    async def run(self, scanners: Optional[List[ScannerItem]] = None, deadline: Optional[datetime] = None) -> PipelineRun:
+        """
+        Run the pipeline once.
+
+        :param scanners: Scanners to run, defaults to ``load_scanners()``.
+        :param deadline: Latest time to start placing orders, defaults to today's ``self.deadline``.
+        """
+        now = datetime.now(ASIA_KOLKATA)
+        run = PipelineRun(self.name, now, deadline or deadline_today(self.deadline, now))
+        try:
+            remaining = (run.deadline - now).total_seconds()
+            if remaining <= 0:
+                raise asyncio.TimeoutError
+            orders = await asyncio.wait_for(self._prepare(run, scanners or load_scanners()), remaining)
+            run.orders = len(orders)
+            if not orders:
+                run.status = "no_orders"
+                return run
+            with self._stage(run, "order"):
+                results = await place_basket("buy", self.repository, self.placer, orders)
+            run.filled = sum(1 for result in results if result.filled)
+            run.status = "completed"
+        except asyncio.TimeoutError:
+            run.status = "deadline_missed"
+            logging.error(f"Pipeline {self.name} missed its {run.deadline:%H:%M:%S} deadline, no orders placed")
+        except Exception as e:
+            run.status = "failed"
+            run.error = str(e)
+            logging.error(f"Pipeline {self.name} failed: {e}", exc_info=True)
+        finally:
+            self.monitor.record_run(run)
+            stages = ", ".join(f"{stage}={ms:.0f}ms" for stage, ms in run.stages.items())
+            logging.info(
+                f"Pipeline {self.name} {run.status}: {run.filled}/{run.orders} orders filled, "
+                f"{stages}, total {run.total_ms:.0f}ms"
+            )
+        return run
+
+
+trade_pipeline = TradePipeline("live", stock_repository, live_order_placer)
+test_trade_pipeline = TradePipeline("test", test_stock_repository, test_order_placer)
+
+
+async def run_trade_pipeline() -> None:
+    await trade_pipeline.run()
+
+
+async def run_test_trade_pipeline() -> None:
+    await test_trade_pipeline.run()
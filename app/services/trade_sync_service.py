@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+
+from pytz import timezone
+
+from app.core.broker_gateway import BrokerGateway, broker_gateway
+from app.core.config import settings
+from app.repositories.trade_repository import TradeRepository, trade_repository
+
+ASIA_KOLKATA = timezone("Asia/Kolkata")
+DATE_FORMAT = "%Y-%m-%d"
+# Guard against a broker that keeps returning pages
+MAX_PAGES_PER_WINDOW = 500
+
+
+def normalize_trade(trade: Dict[str, Any], source: str) -> Dict[str, Any]:
+    """Prepare a broker trade for the local store, adding its trade_time and trade_date."""
+    trade = dict(trade)
+    trade["orderId"] = str(trade.get("orderId"))
+    trade["exchangeTradeId"] = str(trade.get("exchangeTradeId"))
+    trade_time = trade.get("exchangeTime")
+    if not trade_time or trade_time == "NA":
+        trade_time = trade.get("createTime") or trade.get("updateTime") or ""
+    trade["trade_time"] = trade_time
+    trade["trade_date"] = trade_time[:10]
+    trade["source"] = source
+    return trade
+
+
+def date_windows(start: date, end: date, days: int) -> Iterator[Tuple[date, date]]:
+    """Split [start, end] into consecutive windows of at most ``days`` days."""
+    while start <= end:
+        window_end = min(start + timedelta(days=days - 1), end)
+        yield start, window_end
+        start = window_end + timedelta(days=1)
+
+
+class TradeHistorySync:
+    """
+    Incremental copy of the broker trade history into the local trade store.
+
+    Closed days (before today) are fetched once, window by window, from the
+    day after the stored high-water mark; the mark advances after every
+    stored window, so an interrupted sync resumes where it stopped. Only
+    the open window, today's trade book, is fetched on every run.
+    """
+
+    def __init__(self, gateway: BrokerGateway, repository: TradeRepository, window_days: int, lookback_days: int):
+        self.gateway = gateway
+        self.repository = repository
+        self.window_days = window_days
+        self.lookback_days = lookback_days
+        self._lock = asyncio.Lock()
+
+    async def _fetch_history(self, from_date: str, to_date: str) -> List[Dict[str, Any]]:
+        trades = []
+        for page_number in range(MAX_PAGES_PER_WINDOW):
+            response = await self.gateway.get_trade_history(from_date, to_date, page_number)
+            if response.get("status") != "success":
+                raise RuntimeError(f"Trade history fetch failed for {from_date}..{to_date}: {response.get('remarks')}")
+            page = response.get("data") or []
+            if not page:
+                break
+            trades.extend(page)
+        return trades
+
+    async def _fetch_trade_book(self) -> List[Dict[str, Any]]:
+        response = await self.gateway.get_trade_book()
+        if response.get("status") != "success":
+            raise RuntimeError(f"Trade book fetch failed: {response.get('remarks')}")
+        return response.get("data") or []
+
+    async def sync(self) -> Dict[str, Any]:
+        """Bring the local store up to date; concurrent calls wait for the running sync."""
+        async with self._lock:
+            today = datetime.now(ASIA_KOLKATA).date()
+            synced_through = await self.repository.get_synced_through()
+            if synced_through:
+                start = datetime.strptime(synced_through, DATE_FORMAT).date() + timedelta(days=1)
+            else:
+                start = today - timedelta(days=self.lookback_days)
+
+            closed = 0
+            for window_start, window_end in date_windows(start, today - timedelta(days=1), self.window_days):
+                from_date, to_date = window_start.strftime(DATE_FORMAT), window_end.strftime(DATE_FORMAT)
+                trades = await self._fetch_history(from_date, to_date)
+                closed += await self.repository.upsert_many([normalize_trade(trade, "history") for trade in trades])
+                await self.repository.set_synced_through(to_date)
+
+            trade_book = await self._fetch_trade_book()
+            open_trades = await self.repository.upsert_many(
+                [normalize_trade(trade, "trade_book") for trade in trade_book]
+            )
+
+            synced_at = datetime.now(ASIA_KOLKATA).isoformat()
+            await self.repository.set_synced_at(synced_at)
+            synced_through = await self.repository.get_synced_through()
+            logging.info(
+                f"Trade history synced through {synced_through}: "
+                f"{closed} closed and {open_trades} open trades stored"
+            )
+            return {
+                "synced_through": synced_through,
+                "closed_trades": closed,
+                "open_trades": open_trades,
+                "synced_at": synced_at,
+            }
+
+
+trade_history_sync = TradeHistorySync(
+    broker_gateway,
+    trade_repository,
+    window_days=settings.TRADE_SYNC_WINDOW_DAYS,
+    lookback_days=settings.TRADE_SYNC_LOOKBACK_DAYS,
+)
+
+
+async def sync_trade_history() -> None:
+    try:
+        await trade_history_sync.sync()
+    except Exception as e:
+        logging.error(f"Failed to sync trade history: {e}")
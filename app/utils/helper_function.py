@@ -1,12 +1,12 @@
-import yfinance as yf
 import logging
 
+from app.services.bar_store import bar_store
+
 
 def get_current_price(stock_symbol):
-    """Fetch the current price of a stock from Yahoo Finance."""
+    """Fetch the current price of a stock from the bar store, refreshed from Yahoo Finance."""
     try:
-        ticker = yf.Ticker(stock_symbol + ".NS")
-        price_data = ticker.history(period="1d", interval="1m")
+        price_data = bar_store.get_history(stock_symbol + ".NS", period="1d", interval="1m")
 
         if not price_data.empty:
             return price_data["Close"].iloc[-1]
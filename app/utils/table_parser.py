@@ -0,0 +1,67 @@
+from typing import Dict, List, Optional
+
+import lxml.html
+from lxml import etree
+
+
+def _cell_text(cell) -> str:
+    # Serialising in text mode runs in C and is much cheaper than text_content()
+    return etree.tostring(cell, method="text", encoding=str, with_tail=False).strip()
+
+
+def _find_table(page_source: str, table_id: str):
+    document = lxml.html.fromstring(page_source)
+    tables = document.xpath("//table[@id=$table_id]", table_id=table_id)
+    return tables[0] if tables else None
+
+
+def _headers(table) -> List[str]:
+    header_cells = table.findall("thead//th")
+    if not header_cells:
+        # Fall back to the first row when the table has no <thead>
+        first_row = table.find(".//tr")
+        header_cells = first_row.findall("th") if first_row is not None else []
+    return [_cell_text(cell) for cell in header_cells]
+
+
+def _body_rows(table):
+    rows = table.findall("tbody/tr")
+    return rows if rows else [row for row in table.findall("tr") if row.find("td") is not None]
+
+
+def extract_table(page_source: str, table_id: str) -> Optional[List[Dict[str, str]]]:
+    """
+    Extract a table from an HTML page as a list of row dicts keyed by header.
+
+    Returns None when no table with the given id exists on the page.
+    """
+    table = _find_table(page_source, table_id)
+    if table is None:
+        return None
+
+    headers = _headers(table)
+    return [
+        dict(zip(headers, (_cell_text(cell) for cell in row.findall("td"))))
+        for row in _body_rows(table)
+    ]
+
+
+def extract_table_columns(page_source: str, table_id: str) -> Optional[Dict[str, List[str]]]:
+    """
+    Extract a table from an HTML page as a mapping of header to column values.
+
+    Returns None when no table with the given id exists on the page.
+    """
+    table = _find_table(page_source, table_id)
+    if table is None:
+        return None
+
+    headers = _headers(table)
+    columns: Dict[str, List[str]] = {header: [] for header in headers}
+    for row in _body_rows(table):
+        cells = [_cell_text(cell) for cell in row.findall("td")]
+        # Short rows (e.g. a colspan "no results" row) are padded to keep columns aligned
+        cells.extend([""] * (len(headers) - len(cells)))
+        for header, value in zip(headers, cells):
+            columns[header].append(value)
+    return columns
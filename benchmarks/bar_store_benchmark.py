@@ -0,0 +1,92 @@
+"""
+Compare the ways a price lookup can get its bars: a cold read that fetches
+from the network and fills the bar store, a warm read that loads the
+stored segments from disk, and a read from the already memory-mapped store.
+
+Yahoo Finance is replaced by a synthetic provider with a fixed simulated
+latency unless --network is passed.
+
+Run from the repository root:  python -m benchmarks.bar_store_benchmark [--network]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from app.services import quote_cache
+from app.services.bar_store import BarStore
+
+SYMBOLS = [f"SYM{i}.NS" for i in range(20)]
+NETWORK_SYMBOLS = ["RELIANCE.NS", "TCS.NS", "INFY.NS", "HDFCBANK.NS", "ICICIBANK.NS"]
+SIMULATED_LATENCY = 0.25
+READS = 2000
+
+
+class SyntheticProvider:
+    """Minute bars from ``start`` to now, after a simulated network round trip."""
+
+    def history_since(self, symbol, start, interval="1m"):
+        time.sleep(SIMULATED_LATENCY)
+        index = pd.date_range(start, datetime.now(timezone.utc), freq="1min")
+        close = 100 + np.cumsum(np.random.default_rng(len(symbol)).normal(0, 0.1, len(index)))
+        return pd.DataFrame(
+            {"Open": close, "High": close + 0.1, "Low": close - 0.1, "Close": close, "Volume": 1000.0},
+            index=index,
+        )
+
+
+def timed(label, func, count, symbols):
+    start = time.perf_counter()
+    for _ in range(count):
+        func()
+    per_call = (time.perf_counter() - start) / count / symbols
+    print(f"{label:<28} {per_call * 1e3:>10.3f} ms/read")
+
+
+def main():
+    network = "--network" in sys.argv
+    symbols = NETWORK_SYMBOLS if network else SYMBOLS
+    if not network:
+        quote_cache.provider = SyntheticProvider()
+
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root, max_segments=64)
+        start = time.perf_counter()
+        for symbol in symbols:
+            store.get_history(symbol, "1d", "1m")
+        print(f"{'cold (network + store)':<28} {(time.perf_counter() - start) / len(symbols) * 1e3:>10.3f} ms/read")
+        bars = sum(len(store.read(symbol, "1m")) for symbol in symbols)
+        print(f"stored {bars:,} bars for {len(symbols)} symbols")
+
+        # Incremental refresh: only the bars after the last stored one are appended
+        store._refreshed_at.pop((symbols[0], "1m"))
+        store.get_history(symbols[0], "1d", "1m")
+        print(f"segments after refresh       {len(store._load((symbols[0], '1m'))):>10}")
+        print(f"keys compacted               {store.compact():>10}")
+
+        def warm_disk_read():
+            cold_store = BarStore(root, max_segments=64)
+            for symbol in symbols:
+                np.array(cold_store.read_period(symbol, "1m", "1d"))
+
+        def mmap_read():
+            for symbol in symbols:
+                store.read_period(symbol, "1m", "1d")
+
+        def frame_read():
+            for symbol in symbols:
+                store.get_history(symbol, "1d", "1m")
+
+        # Keep the timed reads from refreshing once the quote TTL runs out
+        store._ttl = lambda interval: float("inf")
+        per_symbol = len(symbols)
+        timed("warm disk (load + copy)", warm_disk_read, READS // 10 // per_symbol or 1, per_symbol)
+        timed("mmap range view", mmap_read, READS // per_symbol, per_symbol)
+        timed("mmap + DataFrame", frame_read, READS // per_symbol, per_symbol)
+
+
+if __name__ == "__main__":
+    main()
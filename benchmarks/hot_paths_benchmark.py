@@ -0,0 +1,213 @@
+"""
+Microbenchmarks of the project's hot paths over fixed fixtures: the repo's
+own api_scrip_master.json, stock_screener.json and executed_orders.json,
+plus a synthetic JSON log file and a synthetic Chartink results page.
+
+Results are written as JSON so that two runs can be compared; a case that
+got slower than the baseline by more than the threshold is reported as a
+regression and makes the run exit with status 1.
+
+Run from the repository root:
+    python -m benchmarks.hot_paths_benchmark --output before.json
+    python -m benchmarks.hot_paths_benchmark --compare before.json [--threshold 1.2] [--filter logs]
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from bson import ObjectId
+
+from app.core.logging_config import JsonFormatter
+from app.routes.app_logs import EXCLUDED_FILES
+from app.routes.screener import serialize_stock_data
+from app.services.log_reader import LogReader, parse_log_line
+from app.services.scan_normalizer import normalize_scan
+from app.services.scrape_service import SCRIP_MASTER_FILE, find_security_id, load_json, rank_scan, rank_tables
+from app.services.scrip_master import ScripMaster
+from app.utils.table_parser import extract_table
+from benchmarks.table_parser_benchmark import TABLE_ID, build_page
+
+SCREENER_FILE = "stock_screener.json"
+EXECUTED_ORDERS_FILE = "executed_orders.json"
+LOG_LINES = 100_000
+SCAN_ROWS = 300
+SCREENER_PAGE = 1000
+LOG_FILES = ["scrape_service.py", "basket_service.py", "base.py", "trade_sync_service.py", "market_feed.py"]
+LOG_LEVELS = ["INFO"] * 8 + ["WARNING", "ERROR"]
+SEED = 7
+
+
+def write_log_file(path: str, lines: int = LOG_LINES) -> Tuple[datetime, datetime]:
+    """Write ``lines`` JsonFormatter records one second apart and return the first and last time."""
+    rng = random.Random(SEED)
+    formatter = JsonFormatter()
+    start = datetime(2025, 1, 1, 3, 45)
+    with open(path, "w") as file:
+        for i in range(lines):
+            record = logging.LogRecord(
+                "root", logging.INFO, rng.choice(LOG_FILES), rng.randint(1, 400),
+                "Stored %s scanned stock(s) for date: %s", (rng.randint(1, 5), "2025-01-01"), None,
+            )
+            record.levelname = rng.choice(LOG_LEVELS)
+            record.created = (start + timedelta(seconds=i)).timestamp()
+            record.msecs = 0
+            file.write(formatter.format(record) + "\n")
+    return start, start + timedelta(seconds=lines - 1)
+
+
+def screener_documents(count: int = SCREENER_PAGE) -> List[Dict[str, Any]]:
+    """A page of screener documents as Mongo returns them, cycled from stock_screener.json."""
+    stocks = load_json(SCREENER_FILE)
+    return [{"_id": ObjectId(), **stocks[i % len(stocks)]} for i in range(count)]
+
+
+def serialize_json_page(documents: List[Dict[str, Any]]) -> bytes:
+    """The JSON page path of /screener/stocks: serialize_stock_data, then JSONResponse rendering."""
+    page = [serialize_stock_data(dict(stock)) for stock in documents]
+    return json.dumps(page, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def serialize_ndjson(documents: List[Dict[str, Any]]) -> int:
+    """The format=ndjson path of /screener/stocks, one line per document."""
+    return sum(len(json.dumps(serialize_stock_data(dict(stock)), default=str)) + 1 for stock in documents)
+
+
+def build_cases(directory: str) -> Dict[str, Callable[[], Any]]:
+    scrip_master_data = load_json(SCRIP_MASTER_FILE)
+    # The last symbol in the file is the worst case for a linear scan
+    symbol = scrip_master_data[-1]["SEM_TRADING_SYMBOL"]
+    scrips = ScripMaster(SCRIP_MASTER_FILE)
+
+    log_path = os.path.join(directory, "app_logs.jsonl")
+    first, last = write_log_file(log_path)
+    reader = LogReader(log_path)
+    reader.query(1)  # Build the sparse index once, as the running app would have
+    with open(log_path, "rb") as file:
+        log_line = file.readline()
+    middle = first + (last - first) / 2
+    # The log reader takes Asia/Kolkata times; the file is written in UTC
+    window_end = middle + timedelta(hours=5, minutes=30)
+
+    page = build_page(SCAN_ROWS)
+    table_data = extract_table(page, TABLE_ID)
+    scan = normalize_scan(table_data)
+    documents = screener_documents()
+
+    return {
+        "find_security_id.linear_scan": lambda: find_security_id(scrip_master_data, symbol),
+        "find_security_id.indexed": lambda: scrips.find_security_id(symbol),
+        "load_json.api_scrip_master": lambda: load_json(SCRIP_MASTER_FILE),
+        "load_json.stock_screener": lambda: load_json(SCREENER_FILE),
+        "load_json.executed_orders": lambda: load_json(EXECUTED_ORDERS_FILE),
+        "logs.parse_log_line": lambda: parse_log_line(log_line, EXCLUDED_FILES),
+        "logs.newest_page": lambda: reader.query(200, exclude=EXCLUDED_FILES),
+        "logs.level_filter": lambda: reader.query(200, level="ERROR", exclude=EXCLUDED_FILES),
+        "logs.time_window": lambda: reader.query(
+            200, start_time=window_end - timedelta(minutes=10), end_time=window_end, exclude=EXCLUDED_FILES
+        ),
+        "scrape.extract_table": lambda: extract_table(page, TABLE_ID),
+        "scan.normalize": lambda: normalize_scan(table_data),
+        "scan.rank_top5": lambda: rank_scan(scan, 5),
+        "scan.rank_tables": lambda: rank_tables({"default": table_data}),
+        "screener.serialize_json_page": lambda: serialize_json_page(documents),
+        "screener.serialize_ndjson": lambda: serialize_ndjson(documents),
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """Time ``func`` in ``repeat`` rounds of enough calls to last ``min_time`` each."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / max(elapsed, 1e-9)))
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {"min_s": min(timings), "median_s": statistics.median(timings), "number": number, "repeat": repeat}
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Print the change of every case against the baseline and return the names of the regressions."""
+    regressions = []
+    previous = baseline.get("results", {})
+    print(f"\nagainst {baseline.get('environment', {}).get('commit')} (threshold x{threshold:.2f})")
+    for name, result in results.items():
+        if name not in previous:
+            print(f"{name:<34} {'new':>10}")
+            continue
+        # min is the least noisy estimate of the cost of a call
+        ratio = result["min_s"] / previous[name]["min_s"]
+        flag = ""
+        if ratio > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 / threshold:
+            flag = "  faster"
+        print(f"{name:<34} {ratio:>9.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Baseline results JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="Seconds per timing round")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        cases = build_cases(directory)
+        results = {}
+        for name, func in cases.items():
+            if args.filter not in name:
+                continue
+            results[name] = measure(func, args.repeat, args.min_time)
+            print(f"{name:<34} {results[name]['min_s'] * 1e6:>14.2f} us/call  (x{results[name]['number']})")
+
+    report = {"environment": environment(), "results": results}
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            if compare(results, json.load(file), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
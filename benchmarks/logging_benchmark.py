@@ -0,0 +1,71 @@
+"""
+Measure the per-call overhead a log statement adds to the request path:
+the old synchronous text FileHandler against the queue-backed JSON pipeline.
+
+Run from the repository root:  python -m benchmarks.logging_benchmark
+"""
+import logging
+import logging.handlers
+import os
+import queue
+import tempfile
+import time
+
+from app.core.logging_config import JsonFormatter, _QueueHandler
+
+CALLS = 50000
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(filename)s - %(funcName)s - %(message)s"
+
+
+def time_calls(logger: logging.Logger) -> float:
+    start = time.perf_counter()
+    for i in range(CALLS):
+        logger.info("Stock data successfully updated in MongoDB for %s", i)
+    return (time.perf_counter() - start) / CALLS
+
+
+def bench_sync_file(path: str) -> float:
+    logger = logging.getLogger("bench.sync")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(path)
+    handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    logger.addHandler(handler)
+    try:
+        return time_calls(logger)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def bench_queue_json(path: str) -> float:
+    logger = logging.getLogger("bench.queue")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    file_handler = logging.FileHandler(path)
+    file_handler.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    handler = _QueueHandler(log_queue)
+    logger.addHandler(handler)
+    try:
+        return time_calls(logger)
+    finally:
+        logger.removeHandler(handler)
+        listener.stop()
+        file_handler.close()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        results = {
+            "sync_text_file": bench_sync_file(os.path.join(directory, "sync.txt")),
+            "queue_json": bench_queue_json(os.path.join(directory, "queue.jsonl")),
+        }
+    for name, seconds in results.items():
+        print(f"{name:<16} {seconds * 1e6:>8.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
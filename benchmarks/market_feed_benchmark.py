@@ -0,0 +1,59 @@
+"""
+Exercise the market feed against a local stand-in for the Dhan feed server:
+subscription, tick ingestion, reconnect after the server drops the
+connection, and the cost of a price lookup in the last-tick table.
+
+Run from the repository root:  python -m benchmarks.market_feed_benchmark
+"""
+import asyncio
+import time
+
+from websockets.asyncio.server import serve
+
+from app.services.market_feed import MarketFeed
+from tests.feed_server import StandInFeedServer
+
+SECURITY_IDS = [str(1000 + i) for i in range(200)]
+TICKS_PER_CONNECTION = 20000
+LOOKUPS = 1_000_000
+
+
+async def run() -> None:
+    server = StandInFeedServer(SECURITY_IDS, TICKS_PER_CONNECTION)
+    async with serve(server.handler, "127.0.0.1", 0) as ws_server:
+        port = ws_server.sockets[0].getsockname()[1]
+        feed = MarketFeed(
+            f"ws://127.0.0.1:{port}",
+            "client",
+            "token",
+            max_tick_age=60,
+            backoff_initial=0.05,
+            backoff_max=0.2,
+        )
+        feed.watch(SECURITY_IDS)
+
+        start = time.perf_counter()
+        feed.start()
+        while feed.reconnects < 2:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+        await feed.stop()
+
+    assert server.subscribed == set(SECURITY_IDS), "not every watched security was subscribed"
+    assert set(feed.ticks) == set(SECURITY_IDS), "not every subscribed security has a tick"
+    print(f"connections        {server.connections:>10}")
+    print(f"reconnects         {feed.reconnects:>10}")
+    print(f"ticks ingested/s   {2 * TICKS_PER_CONNECTION / elapsed:>10.0f}")
+
+    start = time.perf_counter()
+    for i in range(LOOKUPS):
+        feed.last_price(SECURITY_IDS[i % len(SECURITY_IDS)])
+    print(f"last_price lookup  {(time.perf_counter() - start) / LOOKUPS * 1e6:>10.3f} us/call")
+
+
+def main():
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Check that the stock repository queries are index-backed and time them
+against a local mongod.
+
+Seeds a scratch collection with several years of daily scan records,
+creates the repository indexes, then prints the winning plan stage and
+average latency of every query the services run.
+
+Run from the repository root:  MONGODB_URL=mongodb://localhost:27017 python -m benchmarks.mongo_index_benchmark
+"""
+import asyncio
+import time
+from datetime import date, timedelta
+
+from app.core.database import client
+from app.repositories.stock_repository import StockRepository
+
+BENCH_DB_NAME = "stock_database_bench"
+DAYS = 3000
+ROUNDS = 200
+
+
+def winning_stage(plan):
+    """Return the chain of stages of a query plan, e.g. FETCH <- IXSCAN."""
+    stages = []
+    while plan:
+        stages.append(plan["stage"])
+        plan = plan.get("inputStage")
+    return " <- ".join(stages)
+
+
+async def timed(coro_factory, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await coro_factory()
+    return (time.perf_counter() - start) / rounds
+
+
+async def main():
+    collection = client[BENCH_DB_NAME]["stock_data"]
+    await collection.drop()
+    repository = StockRepository(collection)
+
+    start_day = date(2017, 1, 1)
+    docs = [
+        {
+            "id": f"{i:08x}",
+            "symbol": f"SYM{i % 500}",
+            "status": "sold",
+            "change": float(i % 20),
+            "date": (start_day + timedelta(days=i)).isoformat(),
+            "state": "inactive",
+        }
+        for i in range(DAYS)
+    ]
+    docs[-1]["status"] = "scanned"
+    docs[-2]["status"] = "bought"
+    await collection.insert_many(docs)
+    await repository.ensure_indexes()
+
+    last_date = docs[-1]["date"]
+    last_stock = {key: value for key, value in docs[-1].items() if key != "_id"}
+    queries = {
+        "find_top_scanned": ({"date": last_date, "status": "scanned"}, [("change", -1)]),
+        "find_all_bought": ({"status": "bought"}, None),
+        "update_by_id": ({"id": docs[-1]["id"]}, None),
+        "replace_scanned_for_date": ({"date": last_date, "scanner": None, "symbol": docs[-1]["symbol"]}, None),
+    }
+    for name, (query, sort) in queries.items():
+        cursor = collection.find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        print(f"{name:<24} {winning_stage(explain['queryPlanner']['winningPlan'])}")
+
+    results = {
+        "find_top_scanned": await timed(lambda: repository.find_top_scanned(last_date, 5)),
+        "find_all_bought": await timed(repository.find_all_bought),
+        "update_by_id": await timed(lambda: repository.update_by_id(docs[-1]["id"], {"state": "inactive"})),
+        "replace_scanned_for_date": await timed(lambda: repository.replace_scanned_for_date(last_date, [last_stock])),
+    }
+    for name, seconds in results.items():
+        print(f"{name:<24} {seconds * 1e3:>8.3f} ms/query")
+
+    await client.drop_database(BENCH_DB_NAME)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
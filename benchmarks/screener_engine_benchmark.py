@@ -0,0 +1,65 @@
+"""
+Time a full-universe local scan: every normal market NSE equity of the
+scrip master with a year of synthetic daily bars in a temporary bar store,
+loaded into a symbols x bars matrix and screened without any network.
+
+Run from the repository root:  python -m benchmarks.screener_engine_benchmark
+"""
+import tempfile
+import time
+
+import numpy as np
+
+from app.models.scanner import ScanCondition, ScannerItem
+from app.services.bar_store import BAR_DTYPE, BarStore
+from app.services.screener_engine import RSI_ABOVE_60_SCANNER, YAHOO_SUFFIX, ScreenerEngine
+from app.services.scrip_master import scrip_master
+
+BARS = 250
+MOMENTUM_SCANNER = ScannerItem(
+    name="momentum",
+    source="local",
+    conditions=[
+        ScanCondition(indicator="rsi", period=14, op=">", value=60),
+        ScanCondition(indicator="change", op=">=", value=2),
+        ScanCondition(indicator="close", op=">", compare_to="sma", compare_period=50),
+        ScanCondition(indicator="volume", op=">", compare_to="avg_volume", compare_period=20),
+    ],
+)
+
+
+def fill_store(store: BarStore, symbols, seed: int = 3) -> None:
+    rng = np.random.default_rng(seed)
+    timestamps = (np.datetime64("2025-01-01") + np.arange(BARS).astype("timedelta64[D]")).astype("datetime64[ns]")
+    for symbol in symbols:
+        records = np.empty(BARS, dtype=BAR_DTYPE)
+        close = 100 * np.exp(np.cumsum(rng.normal(0.001, 0.02, BARS)))
+        records["ts"] = timestamps.astype(np.int64)
+        records["open"] = records["high"] = records["low"] = records["close"] = close
+        records["volume"] = rng.integers(10_000, 1_000_000, BARS)
+        store.append(symbol + YAHOO_SUFFIX, "1d", records)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as root:
+        store = BarStore(root, max_segments=64)
+        engine = ScreenerEngine(store, scrip_master)
+        symbols = [symbol for symbol, _ in engine.universe()]
+        fill_store(store, symbols)
+        print(f"universe {len(symbols)} symbols x {BARS} bars")
+
+        # A fresh store instance, so the load includes mapping every file
+        engine = ScreenerEngine(BarStore(root, max_segments=64), scrip_master)
+        start = time.perf_counter()
+        matrix = engine.load("1d", BARS)
+        print(f"{'load matrix':<24} {time.perf_counter() - start:>8.3f}s")
+
+        for scanner in (RSI_ABOVE_60_SCANNER, MOMENTUM_SCANNER):
+            start = time.perf_counter()
+            rows = engine.run(scanner, matrix)
+            print(f"{scanner.name:<24} {time.perf_counter() - start:>8.3f}s  {len(rows)} matches")
+        print("first row", rows[0] if rows else None)
+
+
+if __name__ == "__main__":
+    main()
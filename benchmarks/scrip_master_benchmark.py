@@ -0,0 +1,41 @@
+"""
+Compare symbol resolution through the indexed scrip master against the
+original load-and-scan path.
+
+Run from the repository root:  python -m benchmarks.scrip_master_benchmark
+"""
+import timeit
+
+from app.services.scrape_service import SCRIP_MASTER_FILE, find_security_id, load_json
+from app.services.scrip_master import ScripMaster
+
+ROUNDS = 20
+
+
+def main():
+    scrip_master_data = load_json(SCRIP_MASTER_FILE)
+    # The last symbol in the file is the worst case for a linear scan
+    symbol = scrip_master_data[-1]["SEM_TRADING_SYMBOL"]
+    store = ScripMaster(SCRIP_MASTER_FILE)
+
+    results = {
+        "load_and_scan": timeit.timeit(
+            lambda: find_security_id(load_json(SCRIP_MASTER_FILE), symbol), number=ROUNDS
+        ) / ROUNDS,
+        "scan_only": timeit.timeit(
+            lambda: find_security_id(scrip_master_data, symbol), number=ROUNDS
+        ) / ROUNDS,
+        "indexed_cold_load": timeit.timeit(
+            lambda: ScripMaster(SCRIP_MASTER_FILE).find_security_id(symbol), number=ROUNDS
+        ) / ROUNDS,
+        "indexed_lookup": timeit.timeit(
+            lambda: store.find_security_id(symbol), number=ROUNDS * 1000
+        ) / (ROUNDS * 1000),
+    }
+
+    for name, seconds in results.items():
+        print(f"{name:<20} {seconds * 1e6:>12.2f} us/lookup")
+
+
+if __name__ == "__main__":
+    main()
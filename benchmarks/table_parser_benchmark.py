@@ -0,0 +1,75 @@
+"""
+Compare the lxml table extractor against the original BeautifulSoup
+(html.parser) walk on a synthetic Chartink-style table.
+
+Run from the repository root:  python -m benchmarks.table_parser_benchmark
+"""
+import random
+import timeit
+
+from bs4 import BeautifulSoup
+
+from app.utils.table_parser import extract_table, extract_table_columns
+
+TABLE_ID = "DataTables_Table_0"
+ROW_COUNT = 10000
+ROUNDS = 3
+HEADERS = ["Sr.", "Stock Name", "Symbol", "Links", "% Chg", "Price", "Volume"]
+
+
+def build_page(row_count: int = ROW_COUNT) -> str:
+    """Build an HTML page with a screener table and some unrelated markup around it."""
+    rng = random.Random(42)
+    rows = []
+    for i in range(1, row_count + 1):
+        rows.append(
+            "<tr>"
+            f"<td>{i}</td>"
+            f"<td><a href=\"/stocks/s{i}.html\">Stock {i} Ltd</a></td>"
+            f"<td><a href=\"/stocks/s{i}.html\">SYM{i}</a></td>"
+            "<td><a href=\"#\">P&amp;F</a> | <a href=\"#\">F.A</a></td>"
+            f"<td>{rng.uniform(-10, 10):.2f}%</td>"
+            f"<td>{rng.uniform(10, 5000):.2f}</td>"
+            f"<td>{rng.randint(1000, 10**8):,}</td>"
+            "</tr>"
+        )
+    header = "".join(f"<th>{name}</th>" for name in HEADERS)
+    noise = "<div><p>filler</p><table id=\"other\"><tr><td>x</td></tr></table></div>" * 200
+    return (
+        f"<html><head><title>Screener</title></head><body>{noise}"
+        f"<table id=\"{TABLE_ID}\"><thead><tr>{header}</tr></thead>"
+        f"<tbody>{''.join(rows)}</tbody></table>{noise}</body></html>"
+    )
+
+
+def extract_table_bs4(page_source: str, table_id: str):
+    """The table walk scrape_table_to_json used before the lxml extractor."""
+    soup = BeautifulSoup(page_source, "html.parser")
+    table = soup.find("table", id=table_id)
+    headers = [header.text.strip() for header in table.find("thead").find_all("th")]
+    table_data = []
+    for row in table.find("tbody").find_all("tr"):
+        row_data = {}
+        for i, cell in enumerate(row.find_all("td")):
+            row_data[headers[i]] = cell.text.strip()
+        table_data.append(row_data)
+    return table_data
+
+
+def main():
+    page = build_page()
+    assert extract_table(page, TABLE_ID) == extract_table_bs4(page, TABLE_ID)
+
+    results = {
+        "bs4_html_parser": timeit.timeit(lambda: extract_table_bs4(page, TABLE_ID), number=ROUNDS) / ROUNDS,
+        "lxml_rows": timeit.timeit(lambda: extract_table(page, TABLE_ID), number=ROUNDS) / ROUNDS,
+        "lxml_columns": timeit.timeit(lambda: extract_table_columns(page, TABLE_ID), number=ROUNDS) / ROUNDS,
+    }
+
+    print(f"{ROW_COUNT} rows, {len(page) / 1e6:.1f} MB page")
+    for name, seconds in results.items():
+        print(f"{name:<20} {seconds * 1e3:>10.1f} ms/parse")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+class FakeDhanClient:
+    """
+    Stand-in for the dhanhq client: records calls, tracks how many run at
+    once, and answers like the Dhan API with scripted delays and failures.
+    """
+
+    def __init__(self, delay: float = 0.0, balance: float = 10000.0):
+        self.delay = delay
+        self.balance = balance
+        self.calls: List[str] = []
+        self.running = 0
+        self.max_running = 0
+        # method -> number of failure responses to return before succeeding
+        self.failures: Dict[str, int] = {}
+        # tag -> exception raised by place_order for that order
+        self.order_errors: Dict[str, str] = {}
+        self.placed: Dict[str, Dict[str, Any]] = {}
+        self.order_delay = 0.0
+        # tag -> statuses reported by successive order lookups, the last one repeating
+        self.status_script: Dict[str, List[str]] = {}
+        self.accept_failed_orders = False
+        self._lock = threading.Lock()
+
+    def _enter(self, method: str, delay: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self.calls.append(method)
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(delay)
+        finally:
+            with self._lock:
+                self.running -= 1
+        with self._lock:
+            if self.failures.get(method, 0) > 0:
+                self.failures[method] -= 1
+                return {"status": "failure", "remarks": f"{method} unavailable", "data": ""}
+        return None
+
+    def get_fund_limits(self):
+        return self._enter("get_fund_limits", self.delay) or {
+            "status": "success",
+            "remarks": "",
+            "data": {"availabelBalance": self.balance},
+        }
+
+    def get_holdings(self):
+        return self._enter("get_holdings", self.delay) or {"status": "success", "remarks": "", "data": []}
+
+    def place_order(self, security_id, exchange_segment, transaction_type, quantity, order_type, product_type, price, tag=None):
+        failure = self._enter("place_order", self.order_delay)
+        order_id = f"ORD-{tag}"
+        if tag in self.order_errors:
+            return {"status": "failure", "remarks": self.order_errors[tag], "data": ""}
+        if failure is not None:
+            if self.accept_failed_orders:
+                # The broker took the order but the response was lost
+                self.placed[tag] = {"orderId": order_id, "orderStatus": "TRADED", "averageTradedPrice": price}
+            return failure
+        self.placed[tag] = {"orderId": order_id, "orderStatus": "TRADED", "averageTradedPrice": price or 100.0}
+        return {"status": "success", "remarks": "", "data": {"orderId": order_id, "orderStatus": "TRANSIT"}}
+
+    def get_order_by_id(self, order_id):
+        self._enter("get_order_by_id", self.delay)
+        tag, order = next((tag, order) for tag, order in self.placed.items() if order["orderId"] == order_id)
+        script = self.status_script.get(tag)
+        if script:
+            order["orderStatus"] = script.pop(0) if len(script) > 1 else script[0]
+        return {"status": "success", "remarks": "", "data": [order]}
+
+    def get_order_by_correlationID(self, correlation_id):
+        self._enter("get_order_by_correlationID", self.delay)
+        if correlation_id not in self.placed:
+            return {"status": "failure", "remarks": "no order", "data": ""}
+        return {"status": "success", "remarks": "", "data": self.placed[correlation_id]}
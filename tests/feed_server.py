@@ -0,0 +1,59 @@
+"""Local stand-in for the Dhan live market feed, shared by the tests and benchmarks.market_feed_benchmark."""
+import json
+import struct
+import time
+from typing import List, Optional, Set
+
+from websockets.asyncio.server import ServerConnection
+
+from app.services.market_feed import DISCONNECT_PACKET, QUOTE_PACKET, TICKER_PACKET
+
+
+def ticker_packet(security_id: str, ltp: float, ltt: Optional[int] = None) -> bytes:
+    return struct.pack("<BHBIfI", TICKER_PACKET, 16, 1, int(security_id), ltp, ltt or int(time.time()))
+
+
+def quote_packet(security_id: str, ltp: float, ltq: int, ltt: int, code: int = QUOTE_PACKET) -> bytes:
+    return struct.pack("<BHBIfHI", code, 18, 1, int(security_id), ltp, ltq, ltt)
+
+
+def disconnect_packet(reason: int) -> bytes:
+    return struct.pack("<BHBIH", DISCONNECT_PACKET, 10, 1, 0, reason)
+
+
+class StandInFeedServer:
+    """
+    Local stand-in for the broker feed: records subscriptions, then streams
+    ticker packets for the subscribed securities and closes the connection
+    after ``ticks_per_connection`` packets to force a reconnect, optionally
+    sending ``final_packet`` (e.g. a disconnection packet) first.
+    """
+
+    def __init__(self, security_ids: List[str], ticks_per_connection: int, final_packet: Optional[bytes] = None):
+        self.security_ids = security_ids
+        self.ticks_per_connection = ticks_per_connection
+        self.final_packet = final_packet
+        self.connections = 0
+        self.connected_at: List[float] = []
+        self.subscribed: Set[str] = set()
+        # Securities subscribed on each connection
+        self.subscriptions: List[List[str]] = []
+
+    async def handler(self, ws: ServerConnection) -> None:
+        self.connections += 1
+        self.connected_at.append(time.monotonic())
+        subscribed = []
+        self.subscriptions.append(subscribed)
+        message = json.loads(await ws.recv())
+        while True:
+            subscribed += [instrument["SecurityId"] for instrument in message["InstrumentList"]]
+            if len(subscribed) >= len(self.security_ids):
+                break
+            message = json.loads(await ws.recv())
+        self.subscribed.update(subscribed)
+
+        for i in range(self.ticks_per_connection):
+            await ws.send(ticker_packet(subscribed[i % len(subscribed)], 100 + i % 50))
+        if self.final_packet is not None:
+            await ws.send(self.final_packet)
+        await ws.close()
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.backtest_service import run_backtest
+
+DAYS = pd.bdate_range("2025-01-06", periods=5)
+
+
+def scenario(closes, opens, scan_days):
+    bars = pd.DataFrame({"symbol": "AAA", "date": DAYS, "open": opens, "close": closes})
+    scans = pd.DataFrame({"date": DAYS[:scan_days], "symbol": "AAA", "change": 5.0})
+    return scans, bars
+
+
+def backtest(scans, bars):
+    return run_backtest(scans, bars, initial_balance=1000, buy_cost_rate=0, sell_cost_rate=0)
+
+
+def test_metrics_of_a_losing_run():
+    # Buy at 100, sell at 110: 10 shares, +100. Buy at 110, sell at 55: 9 shares, -495
+    scans, bars = scenario(closes=[100, 110, 50, 1, 2], opens=[100, 110, 55, 0.5, 2], scan_days=2)
+
+    result = backtest(scans, bars)
+    summary = result["summary"]
+
+    assert result["equity"].tolist() == [1100, 605]
+    assert summary["total_return"] == pytest.approx(-0.395)
+    assert summary["max_drawdown"] == pytest.approx(605 / 1100 - 1)
+    # Daily returns +10% on 1000 and -45% on 1100
+    returns = np.array([0.1, -0.45])
+    assert summary["sharpe"] == pytest.approx(returns.mean() / returns.std(ddof=1) * np.sqrt(252))
+    assert summary["sharpe"] < 0
+    assert summary["win_rate"] == 0.5
+    assert not summary["ruined"]
+
+
+def test_run_stops_at_ruin():
+    # The third trade, 20 shares from 50 down to 0.5, loses 990 of the 605 left.
+    # The fourth would double 1000 shares at 1, but nothing is left to buy them with
+    scans, bars = scenario(closes=[100, 110, 50, 1, 2], opens=[100, 110, 55, 0.5, 2], scan_days=4)
+
+    result = backtest(scans, bars)
+    summary = result["summary"]
+
+    assert result["equity"].tolist() == [1100, 605, -385]
+    assert len(result["trades"]) == 3
+    assert summary["ruined"]
+    assert summary["total_return"] == pytest.approx(-1.385)
+    assert summary["max_drawdown"] == -1.0
+    assert summary["cagr"] == -1.0
+    # Daily returns +10%, -45% and -100% (capped)
+    returns = np.array([0.1, -0.45, -1.0])
+    assert summary["sharpe"] == pytest.approx(returns.mean() / returns.std(ddof=1) * np.sqrt(252))
+
+
+def test_live_sizing_sizes_from_the_running_equity():
+    scans, bars = scenario(closes=[100, 110, 50, 1, 2], opens=[100, 110, 55, 0.5, 2], scan_days=4)
+
+    result = run_backtest(scans, bars, sizing="live", initial_balance=1500, buy_cost_rate=0, sell_cost_rate=0)
+
+    # Each day buys with the equity less the 500 reserve: 1000 / 100, 1100 / 110, 550 / 50, 5.5 / 1
+    assert result["trades"]["quantity"].tolist() == [10, 10, 11, 5]
+    assert result["equity"].tolist() == [1600, 1050, 505.5, 510.5]
+    assert not result["summary"]["ruined"]
+    assert result["summary"]["max_drawdown"] == pytest.approx(505.5 / 1600 - 1)
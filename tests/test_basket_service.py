@@ -0,0 +1,172 @@
+import asyncio
+
+import pytest
+
+from app.services import basket_service, trade_service
+from app.services.basket_service import OrderPlacer, execute_basket, reconcile_pending
+from tests.fake_broker import FakeDhanClient
+from tests.test_broker_gateway import make_gateway
+
+
+class FakeRepository:
+    def __init__(self, stocks):
+        self.records = {stock["id"]: dict(stock) for stock in stocks}
+        self.updates = []
+
+    def _with_status(self, status):
+        return [dict(stock) for stock in self.records.values() if stock["status"] == status]
+
+    async def find_top_scanned(self, date, limit):
+        return self._with_status("scanned")[:limit]
+
+    async def find_all_bought(self):
+        return self._with_status("bought")
+
+    async def find_pending(self):
+        return self._with_status("pending")
+
+    async def bulk_update_by_id(self, updates):
+        self.updates.append(updates)
+        for stock_id, fields in updates.items():
+            self.records[stock_id].update(fields)
+
+
+def stocks(count, status="scanned"):
+    return [
+        {"id": f"s{i}", "symbol": f"STOCK{i}", "security_id": 1000 + i, "status": status, "quantity": 5}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    client = FakeDhanClient(balance=4500.0)
+    gateway = make_gateway(client, max_workers=4)
+    monkeypatch.setattr(trade_service, "broker_gateway", gateway)
+    monkeypatch.setattr(basket_service.settings, "ORDER_CONFIRM_POLL_SECONDS", 0.01)
+
+    async def fetch_price(stock):
+        return 100.0
+
+    monkeypatch.setattr(basket_service, "fetch_price", fetch_price)
+    yield client
+    gateway.shutdown()
+
+
+def run_basket(repository, action="buy", max_parallel=2):
+    return asyncio.run(
+        execute_basket(action, repository, trade_service.LiveOrderPlacer(), basket_size=4, max_parallel=max_parallel)
+    )
+
+
+def test_basket_stores_only_accepted_orders(broker):
+    broker.order_errors["s1"] = "insufficient margin"
+    repository = FakeRepository(stocks(4))
+
+    results = run_basket(repository)
+
+    assert [result.filled for result in results] == [True, False, True, True]
+    assert "insufficient margin" in results[1].error
+    # (4500 - 500) / 4 stocks at 100
+    assert all(result.payload["quantity"] == 10 for result in results)
+    assert len(repository.updates) == 1
+    updates = repository.updates[0]
+    assert sorted(updates) == ["s0", "s2", "s3"]
+    assert updates["s0"]["status"] == "bought"
+    assert updates["s0"]["buy_order_id"] == "ORD-s0"
+    assert updates["s0"]["buy_price"] == 100.0
+    assert updates["s0"]["buy_latency_ms"] is not None
+
+
+def test_basket_waits_for_the_fill(broker):
+    broker.status_script["s0"] = ["TRANSIT", "PENDING", "TRADED"]
+    repository = FakeRepository(stocks(1))
+
+    (result,) = run_basket(repository)
+
+    assert result.filled and result.fill_price == 100.0
+    assert repository.records["s0"]["status"] == "bought"
+    assert broker.calls.count("get_order_by_id") == 3
+
+
+def test_basket_respects_max_parallel_orders(broker):
+    broker.balance = 8500.0
+    broker.order_delay = 0.05
+    repository = FakeRepository(stocks(4))
+
+    results = run_basket(repository, max_parallel=2)
+
+    assert all(result.filled for result in results)
+    assert broker.max_running <= 2
+
+
+def test_basket_with_every_order_failing_writes_nothing(broker):
+    broker.order_errors.update({f"s{i}": "market closed" for i in range(3)})
+    repository = FakeRepository(stocks(3, status="bought"))
+
+    results = run_basket(repository, action="sell")
+
+    assert all(result.error is not None for result in results)
+    assert repository.updates == []
+
+
+def test_unconfirmed_order_is_stored_as_pending_and_reconciled(broker, monkeypatch):
+    monkeypatch.setattr(basket_service.settings, "ORDER_CONFIRM_TIMEOUT_SECONDS", 0.05)
+    broker.status_script["s0"] = ["TRANSIT"]
+    repository = FakeRepository(stocks(2))
+
+    results = run_basket(repository)
+
+    assert results[0].order_id == "ORD-s0" and not results[0].filled and results[0].pending
+    pending = repository.records["s0"]
+    assert pending["status"] == "pending"
+    assert pending["pending_action"] == "buy"
+    assert pending["buy_order_id"] == "ORD-s0"
+    assert pending["quantity"] == 20
+    assert repository.records["s1"]["status"] == "bought"
+
+    # The sell run settles the overnight fill first, then sells it with the rest
+    broker.status_script["s0"] = ["TRADED"]
+    results = run_basket(repository, action="sell")
+
+    assert sorted(result.stock["id"] for result in results) == ["s0", "s1"]
+    assert repository.updates[1]["s0"]["status"] == "bought"
+    assert repository.updates[1]["s0"]["buy_price"] == 100.0
+    assert all(record["status"] == "sold" for record in repository.records.values())
+
+
+def test_rejected_order_keeps_its_id_and_goes_back_to_scanned(broker):
+    broker.status_script["s0"] = ["REJECTED"]
+    repository = FakeRepository(stocks(1))
+
+    (result,) = run_basket(repository)
+
+    assert not result.filled and not result.pending
+    record = repository.records["s0"]
+    assert record["status"] == "scanned"
+    assert record["buy_order_id"] == "ORD-s0"
+    assert record["buy_order_status"] == "REJECTED"
+
+
+def test_reconcile_leaves_open_orders_pending(broker):
+    record = dict(stocks(1)[0], status="pending", pending_action="sell", sell_order_id="ORD-s0")
+    broker.placed["s0"] = {"orderId": "ORD-s0", "orderStatus": "PENDING", "averageTradedPrice": 0}
+    repository = FakeRepository([record])
+
+    settled = asyncio.run(reconcile_pending(repository, trade_service.LiveOrderPlacer()))
+
+    assert settled == 0
+    assert repository.records["s0"]["status"] == "pending"
+
+    broker.placed["s0"]["orderStatus"] = "CANCELLED"
+    assert asyncio.run(reconcile_pending(repository, trade_service.LiveOrderPlacer())) == 1
+    assert repository.records["s0"]["status"] == "bought"
+
+
+def test_order_placer_requires_every_method():
+    class IncompletePlacer(OrderPlacer):
+        async def available_balance(self):
+            return 0
+
+    with pytest.raises(TypeError, match="abstract"):
+        IncompletePlacer()
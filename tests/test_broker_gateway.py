@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.broker_gateway import AsyncTokenBucket, BrokerGateway, BrokerTimeout
+from tests.fake_broker import FakeDhanClient
+
+
+def make_gateway(client, max_workers=2, timeout=1.0, retries=0, retry_backoff=0.01, rate=1000):
+    return BrokerGateway(
+        client_factory=lambda: client,
+        max_workers=max_workers,
+        timeout=timeout,
+        order_rate=rate,
+        api_rate=rate,
+        retries=retries,
+        retry_backoff=retry_backoff,
+    )
+
+
+def test_calls_are_bounded_by_the_worker_pool():
+    client = FakeDhanClient(delay=0.05)
+    gateway = make_gateway(client, max_workers=2)
+
+    async def run():
+        return await asyncio.gather(*[gateway.get_fund_limits() for _ in range(6)])
+
+    responses = asyncio.run(run())
+    assert all(response["status"] == "success" for response in responses)
+    assert client.max_running == 2
+    gateway.shutdown()
+
+
+def test_token_bucket_limits_the_call_rate():
+    limiter = AsyncTokenBucket(rate=50, capacity=1)
+
+    async def run():
+        started_at = time.monotonic()
+        for _ in range(6):
+            await limiter.acquire()
+        return time.monotonic() - started_at
+
+    # The first call uses the burst, the other five wait 1/50 s each
+    assert asyncio.run(run()) >= 5 / 50 * 0.9
+
+
+def test_read_calls_are_retried_with_backoff():
+    client = FakeDhanClient()
+    client.failures["get_holdings"] = 2
+    gateway = make_gateway(client, retries=2, retry_backoff=0.05)
+
+    started_at = time.monotonic()
+    response = asyncio.run(gateway.get_holdings())
+
+    assert response["status"] == "success"
+    assert client.calls.count("get_holdings") == 3
+    # Backoff of 0.05 s, then 0.1 s
+    assert time.monotonic() - started_at >= 0.15 * 0.9
+    gateway.shutdown()
+
+
+def test_retries_give_up_with_the_last_failure():
+    client = FakeDhanClient()
+    client.failures["get_holdings"] = 5
+    gateway = make_gateway(client, retries=1)
+
+    response = asyncio.run(gateway.get_holdings())
+
+    assert response["status"] == "failure"
+    assert client.calls.count("get_holdings") == 2
+    gateway.shutdown()
+
+
+def test_read_calls_time_out():
+    client = FakeDhanClient(delay=0.3)
+    gateway = make_gateway(client, timeout=0.05)
+
+    with pytest.raises(BrokerTimeout):
+        asyncio.run(gateway.get_fund_limits())
+    gateway.shutdown()
+
+
+def test_order_calls_are_not_abandoned_by_the_timeout():
+    client = FakeDhanClient()
+    client.order_delay = 0.2
+    gateway = make_gateway(client, timeout=0.05, retries=2)
+
+    response = asyncio.run(gateway.place_order(**order("a1")))
+
+    assert response["status"] == "success"
+    assert response["data"]["orderId"] == "ORD-a1"
+    gateway.shutdown()
+
+
+def test_failed_placement_is_reconciled_by_tag():
+    client = FakeDhanClient()
+    client.failures["place_order"] = 1
+    client.accept_failed_orders = True
+    gateway = make_gateway(client, retries=2)
+
+    response = asyncio.run(gateway.place_order(**order("a2")))
+
+    assert response["status"] == "success"
+    assert response["data"]["orderId"] == "ORD-a2"
+    # Orders are never retried
+    assert client.calls.count("place_order") == 1
+    gateway.shutdown()
+
+
+def test_failed_placement_without_an_order_stays_failed():
+    client = FakeDhanClient()
+    client.failures["place_order"] = 1
+    gateway = make_gateway(client, retries=2)
+
+    response = asyncio.run(gateway.place_order(**order("a3")))
+
+    assert response["status"] == "failure"
+    assert client.calls.count("place_order") == 1
+    assert "get_order_by_correlationID" in client.calls
+    gateway.shutdown()
+
+
+def order(tag):
+    return {
+        "security_id": "1333",
+        "exchange_segment": "NSE_EQ",
+        "transaction_type": "BUY",
+        "quantity": 1,
+        "order_type": "MARKET",
+        "product_type": "CNC",
+        "price": 0,
+        "tag": tag,
+    }
@@ -0,0 +1,175 @@
+import asyncio
+import json
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import httpx
+import pytest
+
+from app.services import fetch_backend
+from app.services.fetch_backend import ChartinkHttpFetchBackend
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SCREENER_URL = "https://chartink.com/screener/rsi-greater-than-60-5109"
+TABLE_ID = "DataTables_Table_0"
+CSRF_TOKEN = "Qm9ndXNDc3JmVG9rZW5Gb3JUZXN0czEyMzQ1Njc4OTA="
+SESSION_COOKIE = "ci_session=abc123"
+
+
+class RecordedChartink:
+    """Serves the recorded screener page and scan results, checking the handshake."""
+
+    def __init__(self, expired_posts=0, page=None):
+        self.page = page if page is not None else (FIXTURES / "chartink_screener.html").read_text()
+        self.results = (FIXTURES / "chartink_process.json").read_text()
+        self.expired_posts = expired_posts
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.method == "GET" and request.url.path.startswith("/screener/"):
+            return httpx.Response(200, text=self.page, headers={"Set-Cookie": f"{SESSION_COOKIE}; path=/"})
+        if request.method == "POST" and request.url.path == "/screener/process":
+            if self.expired_posts:
+                self.expired_posts -= 1
+                return httpx.Response(419, text="Page Expired")
+            if request.headers.get("X-CSRF-TOKEN") != CSRF_TOKEN or SESSION_COOKIE not in request.headers.get("Cookie", ""):
+                return httpx.Response(419, text="Page Expired")
+            form = parse_qs(request.content.decode())
+            assert form["scan_clause"] == ["( {cash} ( latest rsi( 14 ) > 60 and latest close > 100 ) )"]
+            return httpx.Response(200, text=self.results, headers={"Content-Type": "application/json"})
+        return httpx.Response(404)
+
+    def count(self, method):
+        return sum(1 for request in self.requests if request.method == method)
+
+
+def http_backend(server):
+    backend = ChartinkHttpFetchBackend(timeout=5)
+    backend._client = httpx.AsyncClient(transport=httpx.MockTransport(server), follow_redirects=True)
+    return backend
+
+
+def fetch(backend, url=SCREENER_URL):
+    async def run():
+        try:
+            return await backend.fetch_table(url, TABLE_ID)
+        finally:
+            await backend.close()
+
+    return asyncio.run(run())
+
+
+def test_http_backend_reads_the_recorded_results():
+    server = RecordedChartink()
+
+    rows = fetch(http_backend(server))
+
+    assert rows[0] == {
+        "Sr.": "1",
+        "Stock Name": "Tata Power Company Limited",
+        "Symbol": "TATAPOWER",
+        "Links": "",
+        "% Chg": "4.12%",
+        "Price": "412.35",
+        "Volume": "1,23,45,678",
+    }
+    assert [row["Volume"] for row in rows[1:]] == ["6,94,683", "950"]
+    assert rows[2]["% Chg"] == "-0.40%"
+    assert (server.count("GET"), server.count("POST")) == (1, 1)
+
+
+def test_http_backend_reuses_the_session():
+    server = RecordedChartink()
+    backend = http_backend(server)
+
+    async def run():
+        try:
+            await backend.fetch_table(SCREENER_URL, TABLE_ID)
+            return await backend.fetch_table(SCREENER_URL, TABLE_ID)
+        finally:
+            await backend.close()
+
+    assert len(asyncio.run(run())) == 3
+    assert (server.count("GET"), server.count("POST")) == (1, 2)
+
+
+def test_http_backend_renews_an_expired_session():
+    server = RecordedChartink(expired_posts=1)
+
+    rows = fetch(http_backend(server))
+
+    assert len(rows) == 3
+    assert (server.count("GET"), server.count("POST")) == (2, 2)
+
+
+def test_http_backend_fails_without_a_csrf_token():
+    server = RecordedChartink(page="<html><body>Just a moment...</body></html>")
+
+    with pytest.raises(ValueError, match="CSRF token"):
+        fetch(http_backend(server))
+
+
+def test_http_backend_raises_scan_errors():
+    server = RecordedChartink()
+    server.results = json.dumps({"data": [], "scan_error": "Invalid scan clause"})
+
+    with pytest.raises(ValueError, match="Invalid scan clause"):
+        fetch(http_backend(server))
+
+
+class FakeSelenium:
+    name = "selenium"
+
+    def __init__(self):
+        self.urls = []
+
+    async def fetch_table(self, url, table_id):
+        self.urls.append(url)
+        return [{"Symbol": "FROM_SELENIUM"}]
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    selenium = FakeSelenium()
+    monkeypatch.setattr(fetch_backend, "selenium_backend", selenium)
+    monkeypatch.setattr(fetch_backend.settings, "SCRAPE_BACKEND", "http")
+
+    def install(server):
+        backend = http_backend(server)
+        monkeypatch.setitem(fetch_backend.FETCH_BACKENDS, "http", backend)
+        monkeypatch.setitem(fetch_backend.FETCH_BACKENDS, "selenium", selenium)
+        return backend
+
+    return selenium, install
+
+
+def test_fetch_table_uses_the_http_backend(backends):
+    selenium, install = backends
+    install(RecordedChartink())
+
+    rows = asyncio.run(fetch_backend.fetch_table(SCREENER_URL, TABLE_ID))
+
+    assert rows[0]["Symbol"] == "TATAPOWER"
+    assert selenium.urls == []
+
+
+def test_fetch_table_falls_back_to_selenium_when_http_fails(backends):
+    selenium, install = backends
+    install(RecordedChartink(page="<html></html>"))
+
+    rows = asyncio.run(fetch_backend.fetch_table(SCREENER_URL, TABLE_ID))
+
+    assert rows == [{"Symbol": "FROM_SELENIUM"}]
+    assert selenium.urls == [SCREENER_URL]
+
+
+def test_fetch_table_sends_unsupported_urls_to_selenium(backends):
+    selenium, install = backends
+    server = RecordedChartink()
+    install(server)
+
+    asyncio.run(fetch_backend.fetch_table("https://chartink.com/dashboard/1234", TABLE_ID))
+
+    assert selenium.urls == ["https://chartink.com/dashboard/1234"]
+    assert server.requests == []
@@ -0,0 +1,198 @@
+import asyncio
+import gc
+import json
+
+import pytest
+from websockets.asyncio.server import serve
+
+from app.services import market_feed as market_feed_module
+from app.services.market_feed import FULL_PACKET, FeedDisconnected, MarketFeed, Tick, parse_packet
+from tests.feed_server import StandInFeedServer, disconnect_packet, quote_packet, ticker_packet
+
+
+class FakeConnection:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def send(self, message):
+        await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(message))
+
+
+def make_feed():
+    return MarketFeed("wss://feed.example", "client", "token", max_tick_age=5, backoff_initial=1, backoff_max=30)
+
+
+def test_watch_keeps_the_subscription_task_until_it_is_sent():
+    feed = make_feed()
+    ws = feed._ws = FakeConnection(delay=0.01)
+
+    async def run():
+        feed.watch(["1333", "1333", None, "11536"])
+        assert len(feed._subscriptions) == 1
+        # Nothing else references the task
+        gc.collect()
+        await asyncio.sleep(0.05)
+        assert not feed._subscriptions
+
+    asyncio.run(run())
+    assert len(ws.sent) == 1
+    assert [item["SecurityId"] for item in ws.sent[0]["InstrumentList"]] == ["1333", "11536"]
+
+
+def test_watch_does_not_resubscribe_watched_securities():
+    feed = make_feed()
+    ws = feed._ws = FakeConnection()
+
+    async def run():
+        feed.watch(["1333"])
+        feed.watch(["1333"])
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert len(ws.sent) == 1
+
+
+def test_stop_cancels_pending_subscriptions():
+    feed = make_feed()
+    ws = feed._ws = FakeConnection(delay=10)
+
+    async def run():
+        feed.watch(["1333"])
+        (task,) = feed._subscriptions
+        await asyncio.sleep(0)
+        await feed.stop()
+        await asyncio.sleep(0)
+        return task
+
+    task = asyncio.run(run())
+    assert task.cancelled()
+    assert ws.sent == []
+    assert not feed._subscriptions
+
+
+def test_parse_ticker_packet():
+    tick = parse_packet(ticker_packet("1333", 1612.35, ltt=1700000000))
+
+    assert (tick.security_id, tick.exchange_segment, tick.ltp, tick.ltt) == ("1333", 1, 1612.35, 1700000000)
+
+
+@pytest.mark.parametrize("code", [market_feed_module.QUOTE_PACKET, FULL_PACKET])
+def test_parse_quote_and_full_packets(code):
+    tick = parse_packet(quote_packet("11536", 3890.1, ltq=25, ltt=1700000001, code=code))
+
+    assert (tick.security_id, tick.ltp, tick.ltt) == ("11536", 3890.1, 1700000001)
+
+
+def test_parse_disconnect_packet():
+    with pytest.raises(FeedDisconnected, match="805"):
+        parse_packet(disconnect_packet(805))
+
+
+def test_packets_without_a_price_are_ignored():
+    # Previous close packets, text frames and truncated frames
+    assert parse_packet(b"\x06" + bytes(15)) is None
+    assert parse_packet("{}") is None
+    assert parse_packet(b"\x02\x00") is None
+
+
+def test_last_price_reads_fresh_ticks_only():
+    feed = make_feed()
+    feed.ticks["1333"] = Tick("1333", 1, 1612.35, 0)
+
+    assert feed.last_price(1333) == 1612.35
+    assert feed.last_price("1333", max_age=-1) is None
+    assert feed.last_price("999") is None
+
+
+def run_against(server, until, timeout=5.0, **feed_options):
+    """Run a feed watching the server's securities until ``until(feed)`` holds."""
+
+    async def run():
+        async with serve(server.handler, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            options = {"max_tick_age": 60, "backoff_initial": 0.05, "backoff_max": 0.2, **feed_options}
+            feed = MarketFeed(f"ws://127.0.0.1:{port}", "client", "token", **options)
+            feed.watch(server.security_ids)
+            feed.start()
+            try:
+                await asyncio.wait_for(_wait(feed, until), timeout)
+            finally:
+                await feed.stop()
+            return feed
+
+    return asyncio.run(run())
+
+
+async def _wait(feed, until):
+    while not until(feed):
+        await asyncio.sleep(0.005)
+
+
+def test_ticks_update_the_last_tick_table():
+    security_ids = ["1333", "11536", "2885"]
+    server = StandInFeedServer(security_ids, ticks_per_connection=9)
+
+    feed = run_against(server, lambda feed: len(feed.ticks) == 3 and feed.reconnects >= 1)
+
+    assert server.subscriptions[0] == security_ids
+    # Ticks cycle over the securities at 100, 101, ... so the last ones are 106, 107, 108
+    assert [feed.last_price(security_id) for security_id in security_ids] == [106.0, 107.0, 108.0]
+
+
+class RecordingAsyncio:
+    """The asyncio module as seen by the feed, recording the delays it sleeps for."""
+
+    def __init__(self):
+        self.delays = []
+
+    def __getattr__(self, name):
+        return getattr(asyncio, name)
+
+    async def sleep(self, delay):
+        self.delays.append(delay)
+        await asyncio.sleep(delay)
+
+
+def test_reconnects_with_exponential_backoff_and_resubscribes(monkeypatch):
+    # No jitter, so the delays are exactly 0.05, 0.1, then 0.2 (the cap)
+    monkeypatch.setattr(market_feed_module.random, "uniform", lambda low, high: high)
+    recording = RecordingAsyncio()
+    monkeypatch.setattr(market_feed_module, "asyncio", recording)
+    server = StandInFeedServer(["1333", "11536"], ticks_per_connection=2)
+
+    feed = run_against(server, lambda feed: server.connections >= 5)
+
+    assert recording.delays[:4] == [0.05, 0.1, 0.2, 0.2]
+    # The fifth connection may still be subscribing when the feed is stopped
+    assert server.subscriptions[:4] == [["1333", "11536"]] * 4
+    assert feed.reconnects >= 4
+
+
+def test_reconnects_after_a_disconnection_packet():
+    server = StandInFeedServer(["1333"], ticks_per_connection=1, final_packet=disconnect_packet(805))
+
+    feed = run_against(server, lambda feed: server.connections >= 2)
+
+    assert feed.reconnects >= 1
+    assert feed.last_price("1333") == 100.0
+
+
+def test_no_connection_without_watched_securities():
+    server = StandInFeedServer(["1333"], ticks_per_connection=1)
+
+    async def run():
+        async with serve(server.handler, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            feed = MarketFeed(f"ws://127.0.0.1:{port}", "client", "token", 60, 0.05, 0.2)
+            feed.start()
+            await asyncio.sleep(0.1)
+            connections_before_watch = server.connections
+            feed.watch(["1333"])
+            await asyncio.wait_for(_wait(feed, lambda feed: "1333" in feed.ticks), 5)
+            await feed.stop()
+            return connections_before_watch
+
+    assert asyncio.run(run()) == 0
+    assert server.connections >= 1
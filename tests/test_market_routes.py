@@ -0,0 +1,45 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import market
+from app.services import quote_cache as quote_cache_module
+from app.services.quote_cache import DAILY_BAR, FUNDAMENTALS, QUOTE, QuoteCache
+
+
+class StubProvider:
+    def __init__(self):
+        self.price = 110.0
+
+    def info(self, symbol):
+        # Price fields of info are stale: they were read when the fundamentals were cached
+        return {
+            "longName": "Tata Consultancy Services",
+            "marketCap": 12_000_000 * 1e7,
+            "sector": "Technology",
+            "trailingPE": 30.1,
+            "currentPrice": 90.0,
+            "previousClose": 90.0,
+        }
+
+    def quote(self, symbol):
+        return {"current_price": self.price, "open": 101.0, "previous_close": 100.0, "volume": 12345}
+
+
+def test_stock_detail_takes_prices_from_the_quote(monkeypatch):
+    provider = StubProvider()
+    monkeypatch.setattr(quote_cache_module, "provider", provider)
+    cache = QuoteCache(ttls={QUOTE: 0, DAILY_BAR: 300, FUNDAMENTALS: 3600}, max_entries=10)
+    monkeypatch.setattr(quote_cache_module, "quote_cache", cache)
+    app = FastAPI()
+    app.include_router(market.router, prefix="/market")
+    client = TestClient(app)
+
+    first = client.post("/market/stock-detail", params={"index_symbol": "tcs"}).json()
+    provider.price = 120.0
+    second = client.post("/market/stock-detail", params={"index_symbol": "tcs"}).json()
+
+    assert (first["current_price"], first["previous_close"], first["percent_change"]) == (110.0, 100.0, 10.0)
+    assert (second["current_price"], second["percent_change"]) == (120.0, 20.0)
+    assert second["open_price"] == 101.0 and second["volume"] == 12345
+    assert second["category"] == "Large-Cap" and second["pe_ratio"] == 30.1
+    assert cache.stats()["hits"] == {FUNDAMENTALS: 1}
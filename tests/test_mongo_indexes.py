@@ -0,0 +1,128 @@
+"""
+Query plans and cost of the stock repository queries against a real mongod.
+
+Runs against TEST_MONGODB_URL (default mongodb://localhost:27017) and is
+skipped when no server answers there. Uses a scratch database that is
+dropped afterwards.
+"""
+import asyncio
+import os
+from datetime import date, timedelta
+
+import pytest
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+from app.repositories.stock_repository import StockRepository
+
+MONGODB_URL = os.getenv("TEST_MONGODB_URL", "mongodb://localhost:27017")
+TEST_DB_NAME = "stock_database_index_tests"
+DAYS = 3000
+
+
+def mongod_available() -> bool:
+    try:
+        with MongoClient(MONGODB_URL, serverSelectionTimeoutMS=500) as client:
+            client.admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+
+
+pytestmark = pytest.mark.skipif(not mongod_available(), reason=f"no mongod at {MONGODB_URL}")
+
+
+def plan_stages(plan):
+    """Every stage of a winning plan with its index name, whatever the query engine's plan shape."""
+    plan = plan.get("queryPlan", plan)
+    stages = [(plan["stage"], plan.get("indexName"))]
+    for child in [plan.get("inputStage")] + plan.get("inputStages", []):
+        if child:
+            stages += plan_stages(child)
+    return stages
+
+
+def explain_all(queries):
+    """Seed several years of records, create the indexes and explain each (query, sort) by name."""
+
+    async def run():
+        client = AsyncIOMotorClient(MONGODB_URL)
+        try:
+            await client.drop_database(TEST_DB_NAME)
+            collection = client[TEST_DB_NAME]["stock_data"]
+            start_day = date(2017, 1, 1)
+            documents = [
+                {
+                    "id": f"{i:08x}",
+                    "symbol": f"SYM{i % 500}",
+                    "scanner": None,
+                    "status": "sold",
+                    "change": float(i % 20),
+                    "price": float(100 + i % 50),
+                    "volume": 1000 + i,
+                    "date": (start_day + timedelta(days=i)).isoformat(),
+                    "state": "inactive",
+                }
+                for i in range(DAYS)
+            ]
+            documents[-1]["status"] = "scanned"
+            documents[-2]["status"] = "bought"
+            await collection.insert_many(documents)
+            await StockRepository(collection).ensure_indexes()
+
+            explained = {}
+            for name, (query, sort) in queries(documents).items():
+                cursor = collection.find(query)
+                if sort:
+                    cursor = cursor.sort(sort)
+                explained[name] = await cursor.explain()
+            return explained
+        finally:
+            await client.drop_database(TEST_DB_NAME)
+            client.close()
+
+    return asyncio.run(run())
+
+
+@pytest.fixture(scope="module")
+def explained():
+    return explain_all(
+        lambda documents: {
+            "find_top_scanned": ({"date": documents[-1]["date"], "status": "scanned"}, [("change", -1)]),
+            "find_all_bought": ({"status": "bought"}, None),
+            "find_by_id": ({"id": documents[-1]["id"]}, None),
+            "replace_scanned": (
+                {"date": documents[-1]["date"], "scanner": None, "symbol": documents[-1]["symbol"]},
+                None,
+            ),
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "name, index",
+    [
+        ("find_top_scanned", "status_date_change"),
+        ("find_all_bought", "status_date_change"),
+        ("find_by_id", "id_unique"),
+        ("replace_scanned", "date_scanner_symbol_unique"),
+    ],
+)
+def test_queries_use_their_index(explained, name, index):
+    stages = plan_stages(explained[name]["queryPlanner"]["winningPlan"])
+
+    assert ("IXSCAN", index) in stages
+    assert "COLLSCAN" not in [stage for stage, _ in stages]
+    # The sort of find_top_scanned is served by the index too
+    assert "SORT" not in [stage for stage, _ in stages]
+
+
+@pytest.mark.parametrize("name", ["find_top_scanned", "find_all_bought", "find_by_id", "replace_scanned"])
+def test_queries_only_read_matching_records(explained, name):
+    # Each query matches a single record out of DAYS
+    stats = explained[name]["executionStats"]
+
+    assert stats["nReturned"] == 1
+    assert stats["totalDocsExamined"] == 1
+    assert stats["totalKeysExamined"] <= 2
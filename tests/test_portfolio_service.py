@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import portfolio
+from app.services.portfolio_service import PortfolioSnapshotService, PortfolioUnavailable
+
+
+def success(data):
+    return {"status": "success", "remarks": "", "data": data}
+
+
+FAILURE = {"status": "failure", "remarks": {"error_message": "Invalid token"}, "data": ""}
+
+
+class FakeGateway:
+    def __init__(self):
+        self.funds = success({"availabelBalance": 1000})
+        self.positions = success([])
+        self.holdings = success([{"tradingSymbol": "TCS"}])
+        self.calls = 0
+
+    async def _respond(self, response):
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    async def get_fund_limits(self):
+        self.calls += 1
+        return await self._respond(self.funds)
+
+    async def get_positions(self):
+        return await self._respond(self.positions)
+
+    async def get_holdings(self):
+        return await self._respond(self.holdings)
+
+
+def test_failure_responses_are_not_stored_as_a_snapshot():
+    gateway = FakeGateway()
+    gateway.holdings = FAILURE
+    service = PortfolioSnapshotService(gateway, ttl=5, max_stale=60)
+
+    with pytest.raises(PortfolioUnavailable, match="holdings.*Invalid token"):
+        asyncio.run(service.get())
+    assert service._snapshot is None
+
+
+def test_failed_refresh_keeps_the_previous_snapshot_and_version():
+    gateway = FakeGateway()
+    service = PortfolioSnapshotService(gateway, ttl=0, max_stale=60)
+
+    async def run():
+        first = await service.get()
+        gateway.funds = FAILURE
+        gateway.positions = ConnectionError("broker down")
+        # Stale but usable: served while the refresh fails in the background
+        served = await service.get()
+        await asyncio.sleep(0)
+        with pytest.raises(PortfolioUnavailable, match="positions: ConnectionError"):
+            await service.refresh()
+        return first, served
+
+    first, served = asyncio.run(run())
+    assert served is first
+    assert service._snapshot is first and first.version == 1
+    assert first.funds == success({"availabelBalance": 1000})
+
+
+def test_refresh_failure_without_a_usable_snapshot_is_a_502():
+    gateway = FakeGateway()
+    gateway.funds = FAILURE
+    service = PortfolioSnapshotService(gateway, ttl=5, max_stale=60)
+    app = FastAPI()
+    app.include_router(portfolio.router, prefix="/portfolio")
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(portfolio, "portfolio_snapshot_service", service)
+        client = TestClient(app)
+        responses = [client.get(f"/portfolio/{path}") for path in ("get_fund_limits", "get_holdings", "snapshot")]
+
+        assert [response.status_code for response in responses] == [502, 502, 502]
+        assert "Invalid token" in responses[0].json()["error"]
+
+        gateway.funds = success({"availabelBalance": 1000})
+        snapshot = client.get("/portfolio/snapshot").json()
+        assert snapshot["version"] == 1
+        assert snapshot["holdings"]["data"] == [{"tradingSymbol": "TCS"}]
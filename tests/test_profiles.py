@@ -0,0 +1,42 @@
+from collections import Counter
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core import profiler
+from app.core.profiler import ProfileStore
+from app.routes import profiles
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    store = ProfileStore(str(tmp_path), max_reports=10)
+    store.save("20260101-000000-000-GET_stocks", "GET /stocks", Counter({"main;handler": 3}), {})
+    monkeypatch.setattr(profiles, "profile_store", store)
+    monkeypatch.setattr(profiler.settings, "PROFILE_TOKEN", "s3cret")
+    app = FastAPI()
+    app.include_router(profiles.router, prefix="/admin/profiles")
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/admin/profiles", "/admin/profiles/20260101-000000-000-GET_stocks"])
+def test_routes_reject_missing_or_wrong_tokens(client, path):
+    assert client.get(path).status_code == 401
+    assert client.get(path, headers={"X-Profile-Token": "wrong"}).status_code == 401
+
+
+def test_routes_are_closed_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(profiler.settings, "PROFILE_TOKEN", None)
+    assert client.get("/admin/profiles", headers={"X-Profile-Token": ""}).status_code == 403
+
+
+def test_routes_serve_reports_with_the_token(client):
+    headers = {"X-Profile-Token": "s3cret"}
+
+    listing = client.get("/admin/profiles", headers=headers)
+    report = client.get("/admin/profiles/20260101-000000-000-GET_stocks", headers=headers)
+
+    assert [item["label"] for item in listing.json()] == ["GET /stocks"]
+    assert report.text == "main;handler 3\n"
+    assert client.get("/admin/profiles/..%2Fsecrets", headers=headers).status_code == 404
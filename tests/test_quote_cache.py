@@ -0,0 +1,150 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import quote_cache as quote_cache_module
+from app.services.quote_cache import DAILY_BAR, FUNDAMENTALS, QUOTE, QuoteCache
+
+
+class CountingProvider:
+    """Counts upstream fetches; ``release`` holds them until set."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.release.set()
+        self._lock = threading.Lock()
+
+    def _fetch(self, *args):
+        with self._lock:
+            self.calls.append(args)
+        self.release.wait(5)
+        return {"args": args, "fetch": len(self.calls)}
+
+    def history(self, symbol, period, interval="1d"):
+        return self._fetch("history", symbol, period, interval)
+
+    def info(self, symbol):
+        return self._fetch("info", symbol)
+
+    def quote(self, symbol):
+        return self._fetch("quote", symbol)
+
+    def download(self, symbols, period, interval="1d"):
+        return self._fetch("download", tuple(symbols), period, interval)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = CountingProvider()
+    monkeypatch.setattr(quote_cache_module, "provider", provider)
+    return provider
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(quote_cache_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = QuoteCache(ttls={QUOTE: 60, DAILY_BAR: 3600, FUNDAMENTALS: 86400}, max_entries=3)
+    monkeypatch.setattr(quote_cache_module, "quote_cache", cache)
+    return cache
+
+
+def test_concurrent_misses_share_one_fetch(provider, cache):
+    provider.release.clear()
+    with ThreadPoolExecutor(8) as executor:
+        futures = [executor.submit(quote_cache_module.get_history, "INFY.NS", "1d", "5m") for _ in range(8)]
+        # Let every caller reach the cache before the first fetch returns
+        while cache.stats()["coalesced"].get(QUOTE, 0) < 7:
+            time.sleep(0.001)
+        provider.release.set()
+        results = [future.result() for future in futures]
+
+    assert len(provider.calls) == 1
+    assert all(result is results[0] for result in results)
+    assert cache.stats()["misses"] == {QUOTE: 1}
+    assert cache.stats()["coalesced"] == {QUOTE: 7}
+
+
+def test_failed_fetch_is_shared_but_not_cached(provider, cache):
+    calls = []
+
+    def failing_loader():
+        calls.append(1)
+        raise ConnectionError("yahoo down")
+
+    with pytest.raises(ConnectionError):
+        cache.get_or_load(QUOTE, "k", failing_loader)
+    assert cache.get_or_load(QUOTE, "k", lambda: "fresh") == "fresh"
+    assert len(calls) == 1
+
+
+def test_entries_expire_after_their_ttl(provider, cache, clock):
+    quote_cache_module.get_history("TCS.NS", "1d")
+    quote_cache_module.get_history("TCS.NS", "1mo")
+    clock.now += 59
+    quote_cache_module.get_history("TCS.NS", "1d")
+    assert len(provider.calls) == 2
+
+    # The intraday quote expires, the daily bars use the longer TTL
+    clock.now += 2
+    quote_cache_module.get_history("TCS.NS", "1d")
+    quote_cache_module.get_history("TCS.NS", "1mo")
+    assert len(provider.calls) == 3
+    assert provider.calls[-1] == ("history", "TCS.NS", "1d", "1d")
+
+
+def test_least_recently_used_entry_is_evicted(provider, cache):
+    for symbol in ("A", "B", "C"):
+        quote_cache_module.get_info(symbol)
+    # Touch A so that B is the least recently used
+    quote_cache_module.get_info("A")
+    quote_cache_module.get_info("D")
+
+    assert cache.stats()["entries"] == 3
+    quote_cache_module.get_info("A")
+    quote_cache_module.get_info("C")
+    assert len(provider.calls) == 4
+    quote_cache_module.get_info("B")
+    assert len(provider.calls) == 5
+
+
+def test_hit_and_miss_counters(provider, cache):
+    quote_cache_module.get_info("A")
+    quote_cache_module.get_info("A")
+    quote_cache_module.get_batch_history(["B", "A", "B"], "5d")
+    quote_cache_module.get_batch_history(["A", "B"], "5d")
+    quote_cache_module.get_history("A", "1y")
+
+    stats = cache.stats()
+    assert stats["hits"] == {FUNDAMENTALS: 1, QUOTE: 1}
+    assert stats["misses"] == {FUNDAMENTALS: 1, QUOTE: 1, DAILY_BAR: 1}
+    assert stats["coalesced"] == {}
+    # Batches are keyed by their sorted, deduplicated symbols
+    assert ("download", ("A", "B"), "5d", "1d") in provider.calls
+
+
+def test_quotes_expire_with_the_quote_ttl_and_fundamentals_do_not(provider, cache, clock):
+    quote_cache_module.get_info("TCS.NS")
+    quote_cache_module.get_quote("TCS.NS")
+    clock.now += 61
+    quote_cache_module.get_info("TCS.NS")
+    quote_cache_module.get_quote("TCS.NS")
+
+    assert provider.calls == [("info", "TCS.NS"), ("quote", "TCS.NS"), ("quote", "TCS.NS")]
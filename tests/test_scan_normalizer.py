@@ -0,0 +1,119 @@
+import pandas as pd
+import pytest
+
+from app.services.scan_normalizer import normalize_scan, parse_indian_numbers, rank_top_k, to_records
+
+
+def row(sr, symbol, change, price="100", volume="1,000", name=None):
+    return {
+        "Sr.": sr,
+        "Stock Name": name or symbol.title(),
+        "Symbol": symbol,
+        "Links": "P&F | F.A",
+        "% Chg": change,
+        "Price": price,
+        "Volume": volume,
+    }
+
+
+@pytest.mark.parametrize(
+    "text, number",
+    [
+        ("6,94,683", 694683),
+        ("1,23,45,678", 12345678),
+        ("₹1,234.50", 1234.5),
+        ("Rs. 100", 100),
+        ("6.91%", 6.91),
+        ("-2.5 %", -2.5),
+        ("5k", 5e3),
+        ("3L", 3e5),
+        ("2 lakhs", 2e5),
+        ("1.2 Cr", 1.2e7),
+        ("1.5 crores", 1.5e7),
+        (12, 12),
+    ],
+)
+def test_parse_indian_numbers(text, number):
+    assert parse_indian_numbers(pd.Series([text])).iloc[0] == pytest.approx(number)
+
+
+@pytest.mark.parametrize("text", ["", None, "abc", "1.2 bn", "No stocks filtered in the Scan"])
+def test_unparseable_numbers_are_missing(text):
+    assert pd.isna(parse_indian_numbers(pd.Series([text])).iloc[0])
+
+
+def test_normalize_scan_types_the_columns():
+    frame = normalize_scan([row("1", " TATAPOWER ", "4.12%", "412.35", "1.2 Cr")])
+
+    assert list(frame.columns) == ["sr", "stock_name", "symbol", "links", "change", "price", "volume"]
+    record = frame.iloc[0]
+    assert (record["sr"], record["symbol"], record["change"], record["price"]) == (1, "TATAPOWER", 4.12, 412.35)
+    assert record["volume"] == 12_000_000
+    assert str(frame["volume"].dtype) == "Int64"
+
+
+def test_normalize_scan_drops_placeholders_and_duplicates():
+    frame = normalize_scan(
+        [
+            {"Sr.": "No stocks filtered in the Scan"},
+            row("1", "AAA", "3%", volume="10"),
+            row("2", "AAA", "5%", volume="20"),
+            row("3", "", "9%"),
+            row("4", "BBB", "n/a"),
+            row("5", "CCC", "-1%"),
+        ]
+    )
+
+    assert frame["symbol"].tolist() == ["AAA", "CCC"]
+    # The first row of a symbol wins
+    assert frame["volume"].tolist() == [10, 1000]
+
+
+def test_rank_top_k_filters_to_the_bands():
+    frame = normalize_scan(
+        [
+            row("1", "LOW", "1%", price="100", volume="5,000"),
+            row("2", "CHEAP", "8%", price="9", volume="5,000"),
+            row("3", "DEAR", "7%", price="5,000", volume="5,000"),
+            row("4", "THIN", "6%", price="100", volume="50"),
+            row("5", "GOOD", "5%", price="250", volume="1L"),
+        ]
+    )
+
+    ranked = rank_top_k(frame, 5, min_change=2, min_price=10, max_price=1000, min_volume=1000)
+
+    assert ranked["symbol"].tolist() == ["GOOD"]
+
+
+def test_rank_top_k_breaks_ties_with_the_next_column():
+    frame = normalize_scan(
+        [
+            row("1", "AAA", "5%", volume="1,000"),
+            row("2", "BBB", "5%", volume="9,000"),
+            row("3", "CCC", "7%", volume="10"),
+            row("4", "DDD", "5%", volume="9,000"),
+            row("5", "EEE", "2%", volume="1Cr"),
+        ]
+    )
+
+    assert rank_top_k(frame, 4, rank_by=("change", "volume"))["symbol"].tolist() == ["CCC", "BBB", "DDD", "AAA"]
+    assert rank_top_k(frame, 2, rank_by=("volume",))["symbol"].tolist() == ["EEE", "BBB"]
+    assert rank_top_k(frame, 10)["symbol"].tolist() == ["CCC", "AAA", "BBB", "DDD", "EEE"]
+
+
+def test_to_records_returns_plain_values():
+    records = to_records(normalize_scan([row("x", "AAA", "5%", price="", volume="12")]))
+
+    assert records == [
+        {
+            "sr": None,
+            "stock_name": "Aaa",
+            "symbol": "AAA",
+            "links": "P&F | F.A",
+            "change": 5.0,
+            "price": None,
+            "volume": 12,
+        }
+    ]
+    # Not numpy or pandas scalars, so that they can be stored in Mongo as they are
+    assert type(records[0]["volume"]) is int
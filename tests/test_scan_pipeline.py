@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from pymongo import DeleteMany, UpdateOne
+
+from app.models.scanner import ScannerItem
+from app.repositories.stock_repository import StockRepository
+from app.services import scrape_service
+from app.services.scrape_service import fetch_stock_data, scan_all
+
+
+class InMemoryCollection:
+    """Applies the DeleteMany/UpdateOne bulk writes the stock repository sends."""
+
+    name = "test_stock_data"
+
+    def __init__(self, documents):
+        self.documents = [dict(document) for document in documents]
+
+    @staticmethod
+    def _matches(document, query):
+        for field, condition in query.items():
+            if isinstance(condition, dict) and "$nin" in condition:
+                if document.get(field) in condition["$nin"]:
+                    return False
+            elif document.get(field) != condition:
+                return False
+        return True
+
+    async def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            if isinstance(operation, DeleteMany):
+                self.documents = [doc for doc in self.documents if not self._matches(doc, operation._filter)]
+            elif isinstance(operation, UpdateOne):
+                document = next((doc for doc in self.documents if self._matches(doc, operation._filter)), None)
+                if document is None:
+                    document = dict(operation._filter)
+                    document.update(operation._doc.get("$setOnInsert", {}))
+                    self.documents.append(document)
+                document.update(operation._doc.get("$set", {}))
+
+    def find_one(self, **query):
+        return next(doc for doc in self.documents if self._matches(doc, query))
+
+
+def table(*rows):
+    return [
+        {
+            "Sr.": str(i),
+            "Stock Name": symbol,
+            "Symbol": symbol,
+            "Links": "",
+            "% Chg": change,
+            "Price": "100",
+            "Volume": "1,000",
+        }
+        for i, (symbol, change) in enumerate(rows, 1)
+    ]
+
+
+SCANNERS = [ScannerItem(name=name, url=f"https://chartink.com/screener/{name}") for name in ("ok", "slow", "broken")]
+
+
+@pytest.fixture
+def fake_scans(monkeypatch):
+    async def scan_table(scanner):
+        if scanner.name == "slow":
+            await asyncio.sleep(5)
+        if scanner.name == "broken":
+            raise ConnectionError("chartink down")
+        return table(("AAA", "5%"), ("BBB", "3%"))
+
+    monkeypatch.setattr(scrape_service, "scan_table", scan_table)
+    monkeypatch.setattr(scrape_service.settings, "SCANNER_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(scrape_service.settings, "BASKET_SIZE", 2)
+    monkeypatch.setattr(scrape_service.settings, "SCAN_RANK_BY", ["change"])
+    for name in ("SCAN_MIN_CHANGE", "SCAN_MIN_PRICE", "SCAN_MAX_PRICE", "SCAN_MIN_VOLUME"):
+        monkeypatch.setattr(scrape_service.settings, name, None)
+
+
+def test_scan_all_keeps_only_scanners_that_completed(fake_scans):
+    tables = asyncio.run(scan_all(SCANNERS))
+
+    assert list(tables) == ["ok"]
+    assert [row["Symbol"] for row in tables["ok"]] == ["AAA", "BBB"]
+
+
+def test_rescan_keeps_earlier_picks_and_held_positions(fake_scans, monkeypatch):
+    today = datetime.now().strftime("%Y-%m-%d")
+    collection = InMemoryCollection(
+        [
+            # Bought earlier today from the ok scanner
+            {
+                "id": "held",
+                "date": today,
+                "scanner": "ok",
+                "symbol": "AAA",
+                "status": "bought",
+                "quantity": 7,
+                "buy_price": 99.5,
+            },
+            # Dropped by the ok scanner's new scan
+            {"id": "old", "date": today, "scanner": "ok", "symbol": "ZZZ", "status": "scanned"},
+            # Picks of the scanners that fail this time
+            {"id": "slow1", "date": today, "scanner": "slow", "symbol": "SSS", "status": "scanned"},
+            {"id": "broken1", "date": today, "scanner": "broken", "symbol": "KKK", "status": "scanned"},
+        ]
+    )
+    monkeypatch.setattr(scrape_service, "test_stock_repository", StockRepository(collection))
+
+    assert asyncio.run(fetch_stock_data(SCANNERS)) == {"ok": 2}
+
+    held = collection.find_one(scanner="ok", symbol="AAA")
+    assert (held["id"], held["status"], held["quantity"], held["buy_price"]) == ("held", "bought", 7, 99.5)
+    assert held["change"] == 5.0
+    new = collection.find_one(scanner="ok", symbol="BBB")
+    assert (new["status"], new["quantity"], new["buy_price"]) == ("scanned", 0, 0)
+    assert len(new["id"]) == 8
+    assert {(doc["scanner"], doc["symbol"]) for doc in collection.documents} == {
+        ("ok", "AAA"),
+        ("ok", "BBB"),
+        ("slow", "SSS"),
+        ("broken", "KKK"),
+    }
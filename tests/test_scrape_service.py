@@ -0,0 +1,65 @@
+import pytest
+
+from app.services import scrape_service
+from app.services.scrape_service import rank_tables
+
+
+def row(symbol, change, price="100", volume="1,000"):
+    return {
+        "Sr.": "1",
+        "Stock Name": symbol.title(),
+        "Symbol": symbol,
+        "Links": "",
+        "% Chg": change,
+        "Price": price,
+        "Volume": volume,
+    }
+
+
+@pytest.fixture
+def scan_settings(monkeypatch):
+    settings = scrape_service.settings
+    monkeypatch.setattr(settings, "BASKET_SIZE", 2)
+    monkeypatch.setattr(settings, "SCAN_RANK_BY", ["change", "volume"])
+    for name in ("SCAN_MIN_CHANGE", "SCAN_MIN_PRICE", "SCAN_MAX_PRICE", "SCAN_MIN_VOLUME"):
+        monkeypatch.setattr(settings, name, None)
+    return settings
+
+
+def test_rank_tables_keeps_the_basket_of_each_scanner(scan_settings):
+    ranked = rank_tables(
+        {
+            "momentum": [
+                row("AAA", "1.50%"),
+                row("BBB", "6.91%"),
+                row("CCC", "6.91%", volume="5,000"),
+                row("DDD", "3%"),
+            ],
+            "breakout": [row("EEE", "2%"), row("AAA", "1.50%")],
+            "empty": [{"Sr.": "No stocks filtered in the Scan"}],
+        }
+    )
+
+    assert {name: [stock["symbol"] for stock in stocks] for name, stocks in ranked.items()} == {
+        "momentum": ["CCC", "BBB"],
+        "breakout": ["EEE", "AAA"],
+        "empty": [],
+    }
+    assert ranked["momentum"][0] == {
+        "sr": 1,
+        "stock_name": "Ccc",
+        "symbol": "CCC",
+        "links": "",
+        "change": 6.91,
+        "price": 100.0,
+        "volume": 5000,
+    }
+
+
+def test_rank_tables_applies_the_configured_bands(scan_settings, monkeypatch):
+    monkeypatch.setattr(scan_settings, "SCAN_MIN_CHANGE", 2.0)
+    monkeypatch.setattr(scan_settings, "SCAN_MAX_PRICE", 500.0)
+
+    ranked = rank_tables({"momentum": [row("AAA", "9%", price="1,200"), row("BBB", "1%"), row("CCC", "4%")]})
+
+    assert [stock["symbol"] for stock in ranked["momentum"]] == ["CCC"]
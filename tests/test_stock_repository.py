@@ -0,0 +1,61 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.repositories.stock_repository import StockRepository, parse_numeric_strings
+
+
+def test_parse_numeric_strings_reads_what_the_scan_parser_reads():
+    ids = [ObjectId() for _ in range(5)]
+    documents = [
+        {"_id": ids[0], "volume": "6,94,683"},
+        {"_id": ids[1], "volume": "1.2L"},
+        {"_id": ids[2], "volume": "3 Cr"},
+        {"_id": ids[3], "volume": "n/a"},
+        {"_id": ids[4], "volume": ""},
+    ]
+
+    parsed = parse_numeric_strings(documents, "volume", round)
+
+    assert parsed == [(ids[0], "6,94,683", 694683), (ids[1], "1.2L", 120000), (ids[2], "3 Cr", 30000000)]
+    assert all(type(number) is int for _, _, number in parsed)
+    assert parse_numeric_strings([], "price", float) == []
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        return self.documents
+
+
+class FakeCollection:
+    name = "stock_data"
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.writes = []
+
+    def find(self, query, projection=None):
+        field = next(iter(query))
+        return FakeCursor([document for document in self.documents if isinstance(document.get(field), str)])
+
+    async def bulk_write(self, operations, ordered=True):
+        self.writes.append(operations)
+        return type("BulkWriteResult", (), {"modified_count": len(operations)})()
+
+
+def test_unparseable_strings_are_left_alone():
+    collection = FakeCollection(
+        [
+            {"_id": ObjectId(), "price": "₹1,234.50", "volume": 10},
+            {"_id": ObjectId(), "price": "unknown", "volume": "unknown"},
+        ]
+    )
+
+    modified = asyncio.run(StockRepository(collection).convert_numeric_fields())
+
+    # Only the parseable price is written; the unparseable volume is not even part of a write
+    assert modified == 1
+    assert len(collection.writes) == 1 and len(collection.writes[0]) == 1
@@ -0,0 +1,239 @@
+import asyncio
+import operator
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.repositories.trade_repository import TradeRepository
+from app.routes import portfolio
+from app.routes.portfolio import decode_cursor, encode_cursor
+from app.services.trade_sync_service import ASIA_KOLKATA, TradeHistorySync, date_windows
+
+OPERATORS = {"$lt": operator.lt, "$lte": operator.le, "$gt": operator.gt, "$gte": operator.ge}
+
+
+class InMemoryCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        for field, direction in reversed(keys):
+            self.documents.sort(key=lambda doc: doc[field], reverse=direction < 0)
+        return self
+
+    def limit(self, limit):
+        self.documents = self.documents[:limit]
+        return self
+
+    async def to_list(self, length=None):
+        return [dict(doc) for doc in self.documents[:length]]
+
+
+class InMemoryCollection:
+    """Evaluates the queries and writes the trade repository sends."""
+
+    name = "test_trades"
+
+    def __init__(self):
+        self.documents = []
+
+    @classmethod
+    def _matches(cls, document, query):
+        for field, condition in query.items():
+            if field == "$and":
+                if not all(cls._matches(document, part) for part in condition):
+                    return False
+            elif field == "$or":
+                if not any(cls._matches(document, part) for part in condition):
+                    return False
+            elif isinstance(condition, dict):
+                if not all(OPERATORS[op](document.get(field), value) for op, value in condition.items()):
+                    return False
+            elif document.get(field) != condition:
+                return False
+        return True
+
+    def find(self, query):
+        return InMemoryCursor([doc for doc in self.documents if self._matches(doc, query)])
+
+    async def find_one(self, query):
+        return next((dict(doc) for doc in self.documents if self._matches(doc, query)), None)
+
+    async def update_one(self, query, update, upsert=False):
+        document = next((doc for doc in self.documents if self._matches(doc, query)), None)
+        if document is None:
+            document = {"_id": ObjectId(), **query}
+            self.documents.append(document)
+        document.update(update["$set"])
+
+    async def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            await self.update_one(operation._filter, operation._doc, upsert=True)
+        return SimpleNamespace(upserted_count=len(operations), modified_count=0)
+
+
+def success(data):
+    return {"status": "success", "remarks": "", "data": data}
+
+
+def trade(order_id, trade_time):
+    return {"orderId": order_id, "exchangeTradeId": f"T{order_id}", "exchangeTime": trade_time, "tradedQuantity": 1}
+
+
+class FakeGateway:
+    """Serves one trade per history window and fails the windows listed in ``failing``."""
+
+    def __init__(self):
+        self.failing = set()
+        self.requested = []
+        self.trade_book = []
+
+    async def get_trade_history(self, from_date, to_date, page_number=0):
+        if page_number:
+            return success([])
+        self.requested.append((from_date, to_date))
+        if from_date in self.failing:
+            return {"status": "failure", "remarks": "Too many requests", "data": ""}
+        return success([trade(from_date, f"{from_date} 10:00:00")])
+
+    async def get_trade_book(self):
+        return success(self.trade_book)
+
+
+@pytest.mark.parametrize(
+    "start, end, days, expected",
+    [
+        (date(2024, 1, 1), date(2024, 1, 9), 3, [(1, 3), (4, 6), (7, 9)]),
+        (date(2024, 1, 1), date(2024, 1, 10), 4, [(1, 4), (5, 8), (9, 10)]),
+        (date(2024, 1, 5), date(2024, 1, 5), 30, [(5, 5)]),
+        (date(2024, 1, 1), date(2024, 1, 3), 1, [(1, 1), (2, 2), (3, 3)]),
+        (date(2024, 1, 6), date(2024, 1, 5), 30, []),
+    ],
+)
+def test_date_windows_cover_the_range_once(start, end, days, expected):
+    windows = list(date_windows(start, end, days))
+
+    assert [(window_start.day, window_end.day) for window_start, window_end in windows] == expected
+
+
+def test_date_windows_cross_month_ends():
+    windows = list(date_windows(date(2024, 1, 30), date(2024, 2, 2), 2))
+
+    assert windows == [(date(2024, 1, 30), date(2024, 1, 31)), (date(2024, 2, 1), date(2024, 2, 2))]
+
+
+def test_interrupted_sync_resumes_from_the_high_water_mark():
+    repository = TradeRepository(InMemoryCollection(), InMemoryCollection())
+    gateway = FakeGateway()
+    sync = TradeHistorySync(gateway, repository, window_days=4, lookback_days=10)
+    today = datetime.now(ASIA_KOLKATA).date()
+
+    def days_ago(days):
+        return (today - timedelta(days=days)).isoformat()
+
+    gateway.failing = {days_ago(6)}
+
+    with pytest.raises(RuntimeError, match="Too many requests"):
+        asyncio.run(sync.sync())
+
+    # The first window was stored and marked before the second one failed
+    assert asyncio.run(repository.get_sync_state()) == {"synced_through": days_ago(7), "synced_at": None}
+    assert len(repository.collection.documents) == 1
+
+    gateway.failing = set()
+    gateway.requested = []
+    result = asyncio.run(sync.sync())
+
+    assert gateway.requested == [(days_ago(6), days_ago(3)), (days_ago(2), days_ago(1))]
+    assert result["synced_through"] == days_ago(1)
+    assert result["closed_trades"] == 2
+    assert asyncio.run(repository.get_sync_state())["synced_at"] == result["synced_at"]
+
+    # Closed days are not fetched again; only the trade book is
+    gateway.requested = []
+    result = asyncio.run(sync.sync())
+
+    assert gateway.requested == []
+    assert result["closed_trades"] == 0
+    assert len(repository.collection.documents) == 3
+
+
+def test_cursor_round_trip():
+    trade_id = ObjectId()
+
+    cursor = encode_cursor({"trade_time": "2024-03-01 10:00:00", "_id": trade_id})
+
+    assert decode_cursor(cursor) == ("2024-03-01 10:00:00", trade_id)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm90IGpzb24=", "WyJ0aW1lIiwgInh5eiJd"])
+def test_decode_cursor_rejects_tampered_cursors(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+@pytest.fixture
+def trade_client(monkeypatch):
+    repository = TradeRepository(InMemoryCollection(), InMemoryCollection())
+    monkeypatch.setattr(portfolio, "trade_repository", repository)
+    app = FastAPI()
+    app.include_router(portfolio.router, prefix="/portfolio")
+    return TestClient(app), repository
+
+
+def test_cursor_pages_through_every_trade_once(trade_client):
+    client, repository = trade_client
+    # The 10:00 trades share a timestamp and straddle the first page boundary
+    times = [
+        "2024-03-01 09:30:00",
+        "2024-03-01 10:00:00",
+        "2024-03-01 10:00:00",
+        "2024-03-04 09:15:00",
+        "2024-03-01 09:15:00",
+    ]
+    repository.collection.documents = [
+        {"_id": ObjectId(), "orderId": str(i), "trade_time": trade_time} for i, trade_time in enumerate(times)
+    ]
+    asyncio.run(repository.set_synced_through("2024-03-04"))
+    asyncio.run(repository.set_synced_at("2024-03-05T08:00:00+05:30"))
+
+    pages, params = [], {"date_from": "2024-03-01", "date_to": "2024-03-04", "limit": 2}
+    while True:
+        response = client.get("/portfolio/trade_history", params=params)
+        assert response.status_code == 200
+        pages.append([trade["orderId"] for trade in response.json()["tradeHistory"]])
+        if "X-Next-Cursor" not in response.headers:
+            break
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+    by_position = sorted(repository.collection.documents, key=lambda doc: (doc["trade_time"], doc["_id"]), reverse=True)
+    newest_first = [doc["orderId"] for doc in by_position]
+    assert pages == [newest_first[:2], newest_first[2:4], newest_first[4:]]
+    assert response.json()["syncedAt"] == "2024-03-05T08:00:00+05:30"
+    assert response.json()["syncedThrough"] == "2024-03-04"
+
+
+def test_date_range_is_inclusive(trade_client):
+    client, repository = trade_client
+    times = ["2024-02-29 15:29:59", "2024-03-01 09:15:00", "2024-03-02 23:59:59", "2024-03-03 09:15:00"]
+    repository.collection.documents = [
+        {"_id": ObjectId(), "orderId": str(i), "trade_time": trade_time} for i, trade_time in enumerate(times)
+    ]
+
+    response = client.get("/portfolio/trade_history", params={"date_from": "2024-03-01", "date_to": "2024-03-02"})
+
+    assert [trade["orderId"] for trade in response.json()["tradeHistory"]] == ["2", "1"]
+    assert response.json()["syncedAt"] is None
+
+
+@pytest.mark.parametrize("params", [{"cursor": "not base64!"}, {"date_from": "01-03-2024"}])
+def test_invalid_cursor_or_date_is_rejected(trade_client, params):
+    client, _ = trade_client
+
+    response = client.get("/portfolio/trade_history", params=params)
+
+    assert response.status_code == 400